@@ -1,38 +1,353 @@
 import time
-from typing import Any, Dict, Optional, Sequence
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
 import argparse
+import atexit
 import json
+import sqlite3
 import sys
+import threading
+import numpy as np
+import pandas as pd
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import os
 from datetime import datetime
+from urllib.parse import urlsplit
 
 class TTLCache:
-    """Simple in-memory TTL cache for API responses."""
-    def __init__(self):
-        self._store: Dict[str, Any] = {}
-        self._ts: Dict[str, float] = {}
-
-    def get(self, key: str, ttl: int) -> Optional[Any]:
-        ts = self._ts.get(key)
-        if ts is None or time.time() - ts > ttl:
-            self._store.pop(key, None)
-            self._ts.pop(key, None)
-            return None
-        return self._store.get(key)
+    """
+    In-memory LRU cache for API responses, bounded to `max_entries`.
+    Entries keep their store time; freshness is decided by the caller's ttl.
+    """
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._store: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stale_hits = self.evictions = 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, stored_at) regardless of age, or None."""
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                self._store.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._store[key] = (value, time.time())
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+                self.evictions += 1
+
+    def purge(self, max_age: float) -> int:
+        """Drop entries older than `max_age` seconds; returns how many were removed."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [k for k, (_, ts) in self._store.items() if ts < cutoff]
+            for key in expired:
+                del self._store[key]
+        return len(expired)
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: "hit", "stale" or "miss"."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "stale":
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+
+    def _count(self) -> int:
+        # Caller holds self._lock
+        return len(self._store)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": self._count(),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        """Release the cache's resources (nothing to do in memory)."""
+
+class SQLiteCache(TTLCache):
+    """
+    TTLCache stored in a SQLite file, so cached responses survive between
+    runs and are shared by concurrent pipeline processes (WAL journal).
+    Values must be JSON-serializable; counters are per process.
+
+    Reads do not write: access times are buffered and flushed in one
+    transaction every `touch_batch` reads (and before any eviction). The
+    entry count is tracked per process and re-counted only when it may
+    exceed `max_entries`; eviction then frees a tenth of the cache at once.
+    """
+    def __init__(self, path: str, max_entries: int = 10_000, touch_batch: int = 64):
+        super().__init__(max_entries=max_entries)
+        self.touch_batch = touch_batch
+        self._touched: Dict[str, float] = {}
+        self.path = str(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._entries = self._count()
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+        return json.loads(row[0]), row[1]
+
+    def _flush_touched(self) -> None:
+        # Caller holds self._lock
+        if not self._touched:
+            return
+        touched = [(ts, key) for key, ts in self._touched.items()]
+        self._touched.clear()
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?", touched)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
 
     def set(self, key: str, value: Any) -> None:
-        self._store[key] = value
-        self._ts[key] = time.time()
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._touched.pop(key, None)
+            # Upper bound (a replaced key counts as new): exact count only past the limit
+            self._entries += 1
+            if self._entries <= self.max_entries:
+                return
+            self._entries = self._count()
+            excess = self._entries - (self.max_entries - self.max_entries // 10)
+            if excess > 0:
+                # Least recently read entries go first
+                self._flush_touched()
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+                self._entries -= excess
+                self.evictions += excess
+
+    def purge(self, max_age: float) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - max_age,)).rowcount
+            self._entries = max(self._entries - removed, 0)
+            return removed
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.close()
+
+_cache: TTLCache = TTLCache()
+
+# Background refreshes for stale-while-revalidate, at most one per key
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+# Expired entries are dropped at most every PURGE_INTERVAL seconds, once past
+# the longest cache_ttl + stale_ttl requested so far (no caller can use them)
+PURGE_INTERVAL = 60.0
+_purge_state = {"max_age": 0.0, "last": 0.0}
+_purge_lock = threading.Lock()
+
+# Single-flight: requests in progress per cache key, shared by concurrent callers
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def configure_cache(path: Optional[str] = None, max_entries: int = 1024) -> TTLCache:
+    """
+    Replace the module response cache: in-memory LRU by default, or a
+    SQLite file at `path` shared with other processes. The previous cache
+    is closed. Returns the new cache.
+    """
+    global _cache
+    _cache.close()
+    _cache = SQLiteCache(path, max_entries=max_entries) if path else TTLCache(max_entries=max_entries)
+    return _cache
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters of the module response cache."""
+    return _cache.stats()
+
+def _conditional_get(
+    session: requests.Session,
+    url: str,
+    params: Any,
+    timeout: int,
+    validators: Dict[str, str],
+) -> Tuple[Any, Dict[str, str]]:
+    """
+    GET `url` with If-None-Match / If-Modified-Since built from `validators`.
+    Returns (parsed JSON, new validators), or (None, validators) on 304 Not Modified.
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, validators
+    response.raise_for_status()
+    new_validators = {
+        name: response.headers[header]
+        for name, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in response.headers
+    }
+    return response.json(), new_validators
+
+def _single_flight(key: str, fn: Callable[[], Any]) -> Any:
+    """Run `fn` once per key at a time; concurrent callers wait for and share its result."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+    try:
+        result = fn()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def _revalidate(key: str, request: Callable[[Dict[str, str]], Tuple[Any, Dict[str, str]]], ttl: int = 0) -> Any:
+    """
+    Call `request` with the validators of the cached entry (if any) and
+    store the outcome; a 304 keeps the cached data and renews its age.
+    An entry younger than `ttl` is returned without a request: a previous
+    single-flight leader stored it after this caller missed the cache.
+    """
+    entry = _cache.get_entry(key)
+    if entry is not None and time.time() - entry[1] <= ttl:
+        return entry[0]["data"]
+    cached = entry[0] if entry is not None else {"validators": {}}
+    data, validators = request(cached["validators"])
+    if data is None:
+        data = cached["data"]
+    _cache.set(key, {"data": data, "validators": validators})
+    return data
+
+def _refresh(key: str, request: Callable[[Dict[str, str]], Tuple[Any, Dict[str, str]]], ttl: int = 0) -> None:
+    try:
+        _single_flight(key, lambda: _revalidate(key, request, ttl))
+    except Exception:
+        # The stale value stays cached; the next caller will retry the refresh
+        pass
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def _purge_expired(max_age: float) -> None:
+    """Purge the module cache of entries older than every caller's window, throttled."""
+    now = time.time()
+    with _purge_lock:
+        _purge_state["max_age"] = max(_purge_state["max_age"], max_age)
+        if now - _purge_state["last"] < PURGE_INTERVAL:
+            return
+        _purge_state["last"] = now
+        max_age = _purge_state["max_age"]
+    _cache.purge(max_age)
+
+def _cached_call(
+    key: str,
+    cache_ttl: int,
+    stale_ttl: int,
+    request: Callable[[Dict[str, str]], Tuple[Any, Dict[str, str]]],
+) -> Any:
+    """
+    Return the cached data for `key` if younger than `cache_ttl`. Up to
+    `stale_ttl` seconds past expiry, return the stale data at once and
+    refresh it in the background; otherwise fetch it now.
+
+    `request(validators)` performs the HTTP call and returns (data,
+    validators), with data None when the server answered 304. Concurrent
+    callers missing the same key share a single request.
+    """
+    if not cache_ttl:
+        return request({})[0]
+
+    _purge_expired(cache_ttl + stale_ttl)
+    entry = _cache.get_entry(key)
+    if entry is not None:
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age <= cache_ttl:
+            _cache.record("hit")
+            return value["data"]
+        if age <= cache_ttl + stale_ttl:
+            _cache.record("stale")
+            with _refreshing_lock:
+                start = key not in _refreshing
+                _refreshing.add(key)
+            if start:
+                _refresh_pool.submit(_refresh, key, request, cache_ttl)
+            return value["data"]
+
+    _cache.record("miss")
+    return _single_flight(key, lambda: _revalidate(key, request, cache_ttl))
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Connection pools of the shared sessions: one pool per host, sized for the worker threads
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
 
-_cache = TTLCache()
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_pool_config = {"pool_connections": POOL_CONNECTIONS, "pool_maxsize": POOL_MAXSIZE}
 
 def create_session(
     retries: int = 3,
     backoff_factor: float = 0.3,
     status_forcelist: tuple = (500, 502, 504),
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
 ) -> requests.Session:
     """Create a requests.Session with retry strategy."""
     session = requests.Session()
@@ -44,39 +359,67 @@ def create_session(
         status_forcelist=status_forcelist,
         allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS"]),
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
+def get_session(url: str) -> requests.Session:
+    """
+    Process-wide session for the host of `url`, created on first use.
+    Its keep-alive connections are reused by every extract call to that host.
+    """
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = create_session(**_pool_config)
+    return session
+
+def configure_sessions(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE) -> None:
+    """
+    Set the pool sizes of the shared sessions (pool_maxsize should match
+    the number of concurrent workers). Open sessions are closed and rebuilt lazily.
+    """
+    close_sessions()
+    _pool_config.update(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+def close_sessions() -> None:
+    """Close every shared session and its pooled connections."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+atexit.register(close_sessions)
+
 def fetch_weather(
     api_url: str,
     params: Optional[Dict] = None,
     timeout: int = 10,
     session: Optional[requests.Session] = None,
     cache_ttl: int = 0,
+    stale_ttl: int = 0,
 ) -> Any:
     """
     Fetch weather data from api_url.
     Returns parsed JSON or raises an exception.
+    With `stale_ttl`, an expired cached response is still returned for that
+    many seconds while a background refresh runs.
     """
-    session = session or create_session()
+    session = session or get_session(api_url)
     params = params or {}
 
-    if cache_ttl and isinstance(params, dict):
-        key = f"{api_url}|{'&'.join(f'{k}={params[k]}' for k in sorted(params))}"
-        cached = _cache.get(key, cache_ttl)
-        if cached is not None:
-            return cached
-
-    response = session.get(api_url, params=params, timeout=timeout)
-    response.raise_for_status()
-    data = response.json()
-
-    if cache_ttl and isinstance(params, dict):
-        _cache.set(key, data)
+    def request(validators):
+        return _conditional_get(session, api_url, params, timeout, validators)
 
-    return data
+    if not isinstance(params, dict):
+        return request({})[0]
+    key = f"{api_url}|{'&'.join(f'{k}={params[k]}' for k in sorted(params))}"
+    return _cached_call(key, cache_ttl, stale_ttl, request)
 
 def build_open_meteo_params(
     lat: float,
@@ -109,6 +452,136 @@ def save_json(data: Any, filename: Optional[str] = None, directory: str = "energ
         json.dump(data, fh, ensure_ascii=False, indent=2)
     return path
 
+COLUMNAR_BLOCKS = ("hourly", "daily")
+
+def _block_frame(payload: Dict, block: str) -> Optional[pd.DataFrame]:
+    """One Open-Meteo block as a DataFrame with a parsed `time` column, None if absent."""
+    values = payload.get(block)
+    if not values:
+        return None
+    frame = pd.DataFrame(values)
+    if "time" in frame.columns:
+        # Local wall time as returned by the API; the timezone is kept in the metadata
+        frame["time"] = pd.to_datetime(frame["time"], format="ISO8601")
+    return frame
+
+def save_columnar(
+    data: Any,
+    filename: Optional[str] = None,
+    directory: str = "energitic_pipeline",
+    blocks: Sequence[str] = COLUMNAR_BLOCKS,
+) -> List[str]:
+    """
+    Save the `hourly` / `daily` blocks of an Open-Meteo response as Arrow IPC
+    files (`<stem>.<block>.arrow`, one column per variable plus `time`).
+    Scalar fields (latitude, longitude, timezone, ...) and the block units
+    are kept as JSON in the file schema metadata. A multi-location response
+    (list) is stored in one file per block with a `location` column.
+    Returns the written paths.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("save_columnar requires pyarrow (pip install pyarrow)") from exc
+
+    payloads = data if isinstance(data, list) else [data]
+    os.makedirs(directory, exist_ok=True)
+    if filename:
+        filename = "".join(c for c in filename if c.isalnum() or c in ("-", "_", ".")).strip()
+        stem = filename[:-5] if filename.endswith(".json") else filename
+    else:
+        stem = f"response_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}"
+
+    paths = []
+    for block in blocks:
+        frames = []
+        for location, payload in enumerate(payloads):
+            frame = _block_frame(payload, block)
+            if frame is None:
+                continue
+            if isinstance(data, list):
+                frame.insert(0, "location", location)
+            frames.append(frame)
+        if not frames:
+            continue
+        metadata = [
+            {k: v for k, v in payload.items() if k not in COLUMNAR_BLOCKS and not isinstance(v, (dict, list))}
+            for payload in payloads
+        ]
+        units = payloads[0].get(f"{block}_units", {})
+        table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+        table = table.replace_schema_metadata({
+            "block": block,
+            "metadata": json.dumps(metadata if isinstance(data, list) else metadata[0], ensure_ascii=False),
+            "units": json.dumps(units, ensure_ascii=False),
+        })
+        path = os.path.join(directory, f"{stem}.{block}.arrow")
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        paths.append(path)
+    return paths
+
+def _read_columnar(path: str):
+    """Arrow table of a save_columnar file, read through a memory map."""
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+def _columnar_attrs(table) -> Dict[str, Any]:
+    meta = table.schema.metadata or {}
+    return {
+        "block": meta.get(b"block", b"").decode(),
+        "metadata": json.loads(meta.get(b"metadata", b"{}")),
+        "units": json.loads(meta.get(b"units", b"{}")),
+    }
+
+def load_columnar(path: str) -> pd.DataFrame:
+    """
+    Read a block written by save_columnar through a memory map.
+    Returns a DataFrame indexed by `time`; `df.attrs` holds `block`,
+    `metadata` and `units`.
+    """
+    table = _read_columnar(path)
+    df = table.to_pandas()
+    if "time" in df.columns:
+        df = df.set_index("time")
+    df.attrs = _columnar_attrs(table)
+    return df
+
+def load_columnar_dir(directory: str = "energitic_pipeline", block: str = "hourly") -> pd.DataFrame:
+    """
+    Concatenate every saved `block` file of `directory` (e.g. a year of
+    forecasts) into one DataFrame indexed by `time`, with a `source` column
+    naming the file and `latitude` / `longitude` from its metadata (per
+    `location` for multi-location files).
+    Files are concatenated as Arrow tables and converted to pandas once.
+    """
+    import pyarrow as pa
+
+    suffix = f".{block}.arrow"
+    tables = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(suffix):
+            continue
+        table = _read_columnar(os.path.join(directory, name))
+        metadata = _columnar_attrs(table)["metadata"]
+        if isinstance(metadata, dict):
+            for field in ("latitude", "longitude"):
+                table = table.append_column(field, pa.array(np.full(table.num_rows, metadata.get(field, np.nan), dtype=np.float64)))
+        elif "location" in table.column_names:
+            # Multi-location file: coordinates of each row's location
+            location = table.column("location").to_numpy()
+            for field in ("latitude", "longitude"):
+                values = np.array([m.get(field, np.nan) for m in metadata], dtype=np.float64)
+                table = table.append_column(field, pa.array(values[location]))
+        table = table.append_column("source", pa.array([name[: -len(suffix)]] * table.num_rows, pa.string()))
+        tables.append(table.replace_schema_metadata(None))
+    if not tables:
+        return pd.DataFrame()
+    df = pa.concat_tables(tables, promote_options="default").to_pandas()
+    return df.set_index("time") if "time" in df.columns else df
+
 def fetch_open_meteo(
     lat: float,
     lon: float,
@@ -117,29 +590,88 @@ def fetch_open_meteo(
     timeout: int = 10,
     session: Optional[requests.Session] = None,
     cache_ttl: int = 300,
+    stale_ttl: int = 0,
 ) -> Any:
     """
     Convenience wrapper for Open-Meteo API.
     Returns parsed JSON.
     """
-    base = "https://api.open-meteo.com/v1/forecast"
-    session = session or create_session()
+    base = OPEN_METEO_URL
+    session = session or get_session(OPEN_METEO_URL)
     params = build_open_meteo_params(lat, lon, hourly=hourly, daily=daily)
 
+    def request(validators):
+        return _conditional_get(session, base, params, timeout, validators)
+
     key = f"open-meteo|{lat}|{lon}|{','.join(hourly) if hourly else ''}|{','.join(daily) if daily else ''}"
-    if cache_ttl:
-        cached = _cache.get(key, cache_ttl)
-        if cached is not None:
-            return cached
+    return _cached_call(key, cache_ttl, stale_ttl, request)
 
-    response = session.get(base, params=params, timeout=timeout)
-    response.raise_for_status()
-    data = response.json()
+def _fetch_open_meteo_batch(
+    coords: Sequence[Tuple[float, float]],
+    hourly: Optional[Sequence[str]],
+    daily: Optional[Sequence[str]],
+    timeout: int,
+    session: requests.Session,
+    cache_ttl: int,
+    stale_ttl: int = 0,
+) -> List[Dict]:
+    """One multi-location Open-Meteo request; always returns one payload per coordinate."""
+    lats = ",".join(str(lat) for lat, _ in coords)
+    lons = ",".join(str(lon) for _, lon in coords)
+    params = build_open_meteo_params(lats, lons, hourly=hourly, daily=daily)
 
-    if cache_ttl:
-        _cache.set(key, data)
+    def request(validators):
+        data, validators = _conditional_get(session, OPEN_METEO_URL, params, timeout, validators)
+        # Open-Meteo returns a bare object for a single location, a list otherwise
+        if data is not None and not isinstance(data, list):
+            data = [data]
+        return data, validators
 
-    return data
+    key = f"open-meteo|{lats}|{lons}|{','.join(hourly) if hourly else ''}|{','.join(daily) if daily else ''}"
+    return _cached_call(key, cache_ttl, stale_ttl, request)
+
+def fetch_open_meteo_bulk(
+    coords: Sequence[Tuple[float, float]],
+    hourly: Optional[Sequence[str]] = ("temperature_2m",),
+    daily: Optional[Sequence[str]] = None,
+    block: str = "hourly",
+    batch_size: int = 50,
+    max_concurrency: int = 4,
+    timeout: int = 10,
+    session: Optional[requests.Session] = None,
+    cache_ttl: int = 300,
+    stale_ttl: int = 0,
+) -> pd.DataFrame:
+    """
+    Fetch Open-Meteo forecasts for many (lat, lon) sites at once.
+
+    Coordinates are grouped into multi-location requests of `batch_size`
+    sites, fetched on at most `max_concurrency` threads sharing one session.
+    Returns the `block` ("hourly" or "daily") of every site as one long
+    DataFrame with `location` (index in `coords`), `latitude`, `longitude`,
+    `time` and one column per variable.
+    """
+    coords = list(coords)
+    if not coords:
+        return pd.DataFrame(columns=["location", "latitude", "longitude", "time"])
+    session = session or get_session(OPEN_METEO_URL)
+    batches = [coords[i:i + batch_size] for i in range(0, len(coords), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as pool:
+        results = pool.map(
+            lambda batch: _fetch_open_meteo_batch(batch, hourly, daily, timeout, session, cache_ttl, stale_ttl),
+            batches,
+        )
+        payloads = [payload for batch_payloads in results for payload in batch_payloads]
+
+    frames = []
+    for location, ((lat, lon), payload) in enumerate(zip(coords, payloads)):
+        frame = pd.DataFrame(payload.get(block) or {})
+        frame.insert(0, "location", location)
+        frame.insert(1, "latitude", lat)
+        frame.insert(2, "longitude", lon)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
 
 def main(argv=None):
     """Simple test of weather extraction functions."""
@@ -154,6 +686,12 @@ def main(argv=None):
     parser.add_argument("--lon", type=float, default=2.3522, help="Longitude for open-meteo (default Paris)")
     parser.add_argument("--url", type=str, help="URL to call for fetch_weather (mode 'url')")
     parser.add_argument("--out", type=str, help="Output filename (saved in energitic_pipeline)")
+    parser.add_argument(
+        "--format",
+        choices=("json", "arrow"),
+        default="json",
+        help="Storage format: pretty-printed JSON (default) or Arrow IPC files per hourly/daily block",
+    )
 
     args = parser.parse_args(argv)
 
@@ -173,7 +711,10 @@ def main(argv=None):
 
         # Save response to energitic_pipeline
         try:
-            path = save_json(data, filename=filename, directory="energitic_pipeline")
+            if args.format == "arrow":
+                path = ", ".join(save_columnar(data, filename=filename, directory="energitic_pipeline"))
+            else:
+                path = save_json(data, filename=filename, directory="energitic_pipeline")
             print(f"Saved API response to: {path}")
         except Exception as e:
             print(f"Failed to save response: {e}", file=sys.stderr)
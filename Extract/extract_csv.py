@@ -7,10 +7,13 @@ Entrées : année (AAAA) et mois (MM).
 Sortie  : production_YYYY_MM.csv dans le dossier courant.
 Exemple pour lancer le script : python nom-fichier.py 2025 10
 
+Flotte et longues périodes (génération vectorisée, écriture par chunks) :
+python extract_csv.py 2023 1 --nb-mois 36 --turbines 5000 --format parquet
+
 Spécifications colonnes :
 date;turbin_id;energie_kWh;arret_planifie;arret_non_planifie
 
-- turbin_id ∈ {T001, T002}
+- turbin_id ∈ {T001, T002} (ou T001..Tnnn avec --turbines)
 - energie_kWh : valeur réaliste (aléatoire) de production journalière
 - arret_planifie, arret_non_planifie : 0/1 (mutuellement exclusifs)
 - Certaines lignes peuvent contenir des valeurs manquantes (champs vides)
@@ -22,7 +25,10 @@ import calendar
 from datetime import date
 from pathlib import Path
 import random
-from typing import Tuple
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
 
 # Capacités nominales (MW) par turbine — valeurs plausibles modernes
 RATED_MW = {
@@ -96,11 +102,158 @@ def compute_daily_energy_kwh(turbine: str, y: int, m: int, planned: int, unplann
     energy *= jitter
     return int(round(energy))
 
+# ---------------------------------------------------------
+# Génération vectorisée pour une flotte (NumPy)
+# ---------------------------------------------------------
+
+# Probabilités journalières, identiques à la génération ligne par ligne
+P_PLANNED = 0.02
+P_UNPLANNED = 0.01
+P_MISSING_ENERGY = 0.05
+P_MISSING_FLAG = 0.02
+CF_SIGMA = 0.10
+RATED_MW_RANGE = (2.0, 4.5)
+CHUNK_ROWS = 1_000_000
+
+PRODUCTION_COLUMNS = ["date", "turbin_id", "energie_kWh", "arret_planifie", "arret_non_planifie"]
+
+# Capacités nominales de la flotte vectorisée, par indice de turbine (T001 -> 0) :
+# indépendantes de la largeur des identifiants
+RATED_MW_BY_INDEX = tuple(RATED_MW.values())
+
+def turbine_ids(n_turbines: int, first: int = 0, fleet_size: int = None) -> list:
+    """
+    Identifiants T001..Tnnn des turbines first..first+n_turbines-1 ; largeur
+    étendue au-delà de 999 turbines selon la taille de la flotte entière
+    (`fleet_size`, par défaut first + n_turbines) : une tranche de flotte
+    porte les mêmes identifiants qu'une génération complète.
+    """
+    width = max(3, len(str(fleet_size or n_turbines + first)))
+    return [f"T{i:0{width}d}" for i in range(first + 1, first + n_turbines + 1)]
+
+def turbine_rng(seed: int, index: int) -> np.random.Generator:
+    """
+    Flux aléatoire indépendant de la turbine `index` : il ne dépend que de
+    (seed, index), pas de la taille de la flotte ni du découpage en chunks
+    ou en workers.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+def simulate_turbine(rng: np.random.Generator, rated_mw: float, months: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tire en une fois les jours d'une turbine (`months` : mois de chaque jour).
+    Retourne (valeurs, manquants) : tableaux (3, jours) pour energie_kWh,
+    arret_planifie et arret_non_planifie (arrêts mutuellement exclusifs).
+    """
+    n = len(months)
+    mean = np.array([MONTHLY_CF_MEAN.get(m, 0.33) for m in range(13)])[months]
+    cf = np.clip(rng.normal(mean, CF_SIGMA), 0.0, 1.0)
+    u = rng.random((6, n))
+    planned = u[0] < P_PLANNED
+    unplanned = ~planned & (u[1] < P_UNPLANNED)
+    jitter = 0.97 + 0.06 * u[2]
+    energy = np.where(planned | unplanned, 0.0, np.rint(cf * rated_mw * 24.0 * 1000.0 * jitter))
+    values = np.stack([energy.astype(np.int64), planned, unplanned])
+    missing = u[3:] < np.array([[P_MISSING_ENERGY], [P_MISSING_FLAG], [P_MISSING_FLAG]])
+    return values, missing
+
+def generate_production(
+    start: date,
+    end: date,
+    n_turbines: int = len(RATED_MW),
+    seed: int = 0,
+    first_turbine: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+    fleet_size: int = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Production journalière de `n_turbines` turbines (à partir de l'indice
+    `first_turbine`) sur [start, end[, par DataFrames d'au plus ~`chunk_rows`
+    lignes regroupant des turbines entières : la mémoire reste bornée et un
+    worker qui génère une tranche de turbines obtient les mêmes lignes
+    qu'une génération complète, à condition de passer la taille de la flotte
+    entière `fleet_size` (largeur des identifiants au-delà de 999 turbines).
+    Valeurs manquantes : <NA> (entiers nullables).
+    """
+    days = pd.date_range(start, end, freq="D", inclusive="left")
+    if not len(days):
+        return
+    dates = days.strftime("%Y-%m-%d").to_numpy()
+    months = days.month.to_numpy()
+    ids = turbine_ids(n_turbines, first_turbine, fleet_size)
+    per_chunk = max(1, chunk_rows // len(days))
+
+    for lo in range(0, n_turbines, per_chunk):
+        block = ids[lo:lo + per_chunk]
+        draws = []
+        for index in range(first_turbine + lo, first_turbine + lo + len(block)):
+            rng = turbine_rng(seed, index)
+            if index < len(RATED_MW_BY_INDEX):
+                rated_mw = RATED_MW_BY_INDEX[index]
+            else:
+                rated_mw = round(rng.uniform(*RATED_MW_RANGE), 1)
+            draws.append(simulate_turbine(rng, rated_mw, months))
+        values = np.concatenate([v for v, _ in draws], axis=1)
+        missing = np.concatenate([m for _, m in draws], axis=1)
+        yield pd.DataFrame({
+            "date": np.tile(dates, len(block)),
+            "turbin_id": np.repeat(block, len(days)),
+            "energie_kWh": pd.arrays.IntegerArray(values[0], missing[0]),
+            "arret_planifie": pd.arrays.IntegerArray(values[1].astype(np.int8), missing[1]),
+            "arret_non_planifie": pd.arrays.IntegerArray(values[2].astype(np.int8), missing[2]),
+        })
+
+def write_production(chunks, out_path: Path, fmt: str = "csv") -> int:
+    """Écrit les chunks au fil de l'eau (CSV ';' ou Parquet) ; retourne le nombre de lignes."""
+    rows = 0
+    writer = None
+    try:
+        for i, chunk in enumerate(chunks):
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(out_path), table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(out_path, sep=";", mode="w" if i == 0 else "a", header=(i == 0), index=False, lineterminator="\n")
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def read_production(path, chunk_rows: int = None):
+    """
+    Relit un fichier de production (CSV ';' ou Parquet) au schéma
+    PRODUCTION_SCHEMA : date en datetime64, turbin_id en category,
+    energie_kWh en float32, drapeaux d'arrêt en Int8 nullable.
+    Avec `chunk_rows`, itère sur des DataFrames d'au plus `chunk_rows` lignes (CSV).
+    """
+    # Import différé : le script reste exécutable seul (python extract_csv.py 2025 10)
+    from Extract.schema import PRODUCTION_SCHEMA, apply_schema, csv_dtypes
+
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return apply_schema(pd.read_parquet(path), PRODUCTION_SCHEMA)
+    dtypes = csv_dtypes(PRODUCTION_SCHEMA)
+    if chunk_rows:
+        chunks = pd.read_csv(path, sep=";", dtype=dtypes, chunksize=chunk_rows)
+        return (apply_schema(chunk, PRODUCTION_SCHEMA) for chunk in chunks)
+    return apply_schema(pd.read_csv(path, sep=";", dtype=dtypes), PRODUCTION_SCHEMA)
+
 def main():
     parser = argparse.ArgumentParser(description="Génère un CSV de production journalière par turbine.")
     parser.add_argument("annee", type=int, help="Année au format AAAA (ex: 2025)")
     parser.add_argument("mois", type=int, help="Mois au format MM (1-12)")
     parser.add_argument("--seed", type=int, default=None, help="Graine aléatoire (optionnelle) pour reproductibilité")
+    parser.add_argument("--nb-mois", type=int, default=1, help="Nombre de mois générés à partir de annee/mois")
+    parser.add_argument("--turbines", type=int, default=None, help="Taille de flotte : génération vectorisée T001..Tnnn")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv", help="Format de sortie (mode vectorisé)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Lignes par chunk écrit (mode vectorisé)")
+    parser.add_argument("--out", type=str, default=None, help="Fichier de sortie")
     args = parser.parse_args()
 
     y = args.annee
@@ -114,8 +267,21 @@ def main():
     if y < 1:
         raise SystemExit("L'année doit être un entier positif (AAAA).")
 
+    # Flotte ou plusieurs mois : génération vectorisée par chunks
+    if args.turbines is not None or args.nb_mois != 1 or args.format != "csv":
+        start = date(y, m, 1)
+        end = (pd.Timestamp(start) + pd.DateOffset(months=args.nb_mois)).date()
+        ext = "parquet" if args.format == "parquet" else "csv"
+        out_path = Path(args.out or f"production_{y:04d}_{m:02d}_{args.nb_mois}m.{ext}")
+        seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+        chunks = generate_production(start, end, n_turbines=args.turbines or len(RATED_MW), seed=seed,
+                                     chunk_rows=args.chunk_rows)
+        rows = write_production(chunks, out_path, fmt=args.format)
+        print(f"Fichier généré : {out_path.resolve()} ({rows} lignes)")
+        return
+
     # Prépare la sortie
-    out_name = f"production_{y:04d}_{m:02d}.csv"
+    out_name = args.out or f"production_{y:04d}_{m:02d}.csv"
     out_path = Path(out_name)
 
     # Génération des dates du mois
@@ -1,40 +1,240 @@
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
 import os
-from supabase import create_client, Client
-from supabase.client import ClientOptions
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 
-# Charger les variables d'environnement
+from Extract.schema import MEASUREMENT_SCHEMA, apply_schema, concat_frames, csv_dtypes, empty_frame
+
 env_path = Path(__file__).with_name(".env")
-load_dotenv(env_path)
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(
-    url,
-    key,
-    options=ClientOptions(
-        postgrest_client_timeout=10,
-        storage_client_timeout=10,
-        schema="public",
+CLIENT_TIMEOUT = 10
+
+# Extraction incrémentale : cache local de la fenêtre + watermark (dernier meas_id / ts_utc vus)
+PIPELINE_DIR = Path(__file__).with_name("energitic_pipeline")
+WATERMARK_PATH = PIPELINE_DIR / "raw_measurements_watermark.json"
+CACHE_PATH = PIPELINE_DIR / "raw_measurements_cache.csv"
+WINDOW = timedelta(hours=24)
+PAGE_SIZE = 1000  # limite de lignes par réponse côté Supabase (db-max-rows)
+MAX_WORKERS = 4
+
+# Client Supabase créé à la première requête puis réutilisé (aucun effet de bord à l'import)
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+
+# Colonnes utiles au pipeline et leur type (Extract.schema), appliqué dès le parsing des pages ;
+# ts_utc est lu en texte puis converti en datetime64 UTC par apply_schema
+MEASUREMENT_DTYPES = csv_dtypes(MEASUREMENT_SCHEMA)
+
+
+def get_client():
+    """
+    Client Supabase partagé du processus, créé au premier appel. Son pool
+    httpx garde les connexions ouvertes (keep-alive) entre les requêtes et
+    accepte MAX_WORKERS requêtes simultanées.
+    """
+    global _client, _http_client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Imports différés : importer le module ne charge pas le SDK Supabase
+                import httpx
+                from supabase import create_client
+                from supabase.client import ClientOptions
+
+                # Charger les variables d'environnement
+                load_dotenv(env_path)
+                _http_client = httpx.Client(
+                    timeout=CLIENT_TIMEOUT,
+                    limits=httpx.Limits(max_connections=MAX_WORKERS * 2, max_keepalive_connections=MAX_WORKERS),
+                )
+                _client = create_client(
+                    os.environ.get("SUPABASE_URL"),
+                    os.environ.get("SUPABASE_KEY"),
+                    options=ClientOptions(
+                        postgrest_client_timeout=CLIENT_TIMEOUT,
+                        storage_client_timeout=CLIENT_TIMEOUT,
+                        schema="public",
+                        httpx_client=_http_client,
+                    ),
+                )
+    return _client
+
+
+def close_client() -> None:
+    """Ferme les connexions du pool ; le prochain appel recrée un client."""
+    global _client, _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client, _http_client = None, None
+
+
+def _iter_pages(since: datetime = None, after_id: int = None, page_size: int = PAGE_SIZE):
+    """
+    Pagination par clé (keyset) sur meas_id : chaque page reprend après le
+    dernier meas_id reçu, sans OFFSET qui oblige le serveur à relire les pages précédentes.
+    """
+    while True:
+        query = get_client().table("raw_measurements").select("*")
+        if after_id is not None:
+            query = query.gt("meas_id", after_id)
+        if since is not None:
+            query = query.gt("ts_utc", since.isoformat())
+        page = query.order("meas_id").limit(page_size).execute()
+        if not page.data:
+            return
+        yield apply_schema(pd.DataFrame(page.data))
+        if len(page.data) < page_size:
+            return
+        after_id = page.data[-1]["meas_id"]
+
+
+def iter_df_chunks(chunk_size: int = 10_000, since: datetime = None):
+    """
+    Itère sur les mesures depuis `since` (24 h par défaut) par pages de
+    `chunk_size` lignes, triées sur meas_id, sans tout charger en mémoire.
+    """
+    since = since or datetime.now(timezone.utc) - WINDOW
+    yield from _iter_pages(since=since, page_size=chunk_size)
+
+
+def _meas_id_bound(since: datetime, until: datetime = None, after_id: int = None, desc: bool = False):
+    """Premier (ou dernier si desc) meas_id de la fenêtre, None si la fenêtre est vide."""
+    query = get_client().table("raw_measurements").select("meas_id").gt("ts_utc", since.isoformat())
+    if until is not None:
+        query = query.lt("ts_utc", until.isoformat())
+    if after_id is not None:
+        query = query.gt("meas_id", after_id)
+    rows = query.order("meas_id", desc=desc).limit(1).execute().data
+    return rows[0]["meas_id"] if rows else None
+
+
+def _fetch_page(columns, dtypes, start_id: int, end_id: int, since: datetime, until: datetime = None, limit: int = PAGE_SIZE) -> pd.DataFrame:
+    """Au plus `limit` lignes de [start_id, end_id[ demandées en CSV : colonnes typées directement, sans liste de dicts."""
+    query = (
+        get_client().table("raw_measurements")
+        .select(",".join(columns))
+        .gte("meas_id", start_id)
+        .lt("meas_id", end_id)
+        .gt("ts_utc", since.isoformat())
     )
-)
-
-# Calculer la date et l'heure d'il y a 24 heures
-yesterday = datetime.now() - timedelta(hours=24)
-
-# Récupérer les mesures des dernières 24 heures
-response = (
-    supabase.table("raw_measurements")
-    .select("*")
-    .gt("ts_utc", yesterday.isoformat())
-    .execute()
-)
-
-if response.data:
-    # Créer un DataFrame à partir des données
-    df = pd.DataFrame(response.data)
-    print("Data successfully stored in DataFrame")
-else:
-    print("No data found for the last 24 hours.")
+    if until is not None:
+        query = query.lt("ts_utc", until.isoformat())
+    payload = query.order("meas_id").limit(limit).csv().execute().data
+    if not payload:
+        return empty_frame(columns)
+    return apply_schema(pd.read_csv(io.StringIO(payload), dtype=dtypes))
+
+
+def _fetch_range(columns, dtypes, start_id: int, end_id: int, since: datetime, until: datetime = None, page_size: int = PAGE_SIZE) -> pd.DataFrame:
+    """
+    Lignes de [start_id, end_id[ par pages de `page_size` en keyset : chaque
+    page reprend après le dernier meas_id reçu, quels que soient les trous
+    dans les identifiants (`columns` doit contenir meas_id).
+    """
+    pages = []
+    while True:
+        page = _fetch_page(columns, dtypes, start_id, end_id, since, until, limit=page_size)
+        pages.append(page)
+        if len(page) < page_size:
+            return concat_frames(pages)
+        start_id = int(page["meas_id"].iloc[-1]) + 1
+
+
+def fetch_df(
+    since: datetime = None,
+    until: datetime = None,
+    after_id: int = None,
+    columns=tuple(MEASUREMENT_SCHEMA),
+    page_size: int = PAGE_SIZE,
+    max_workers: int = MAX_WORKERS,
+) -> pd.DataFrame:
+    """
+    Mesures de ]since, until[ (24 h par défaut), limitées à meas_id > after_id
+    si fourni, en ne sélectionnant que `columns`. La plage de meas_id est
+    découpée en au plus `max_workers` tranches récupérées en parallèle avec
+    le client partagé, chacune paginée par clé en pages de `page_size`
+    (jamais plus de lignes que la limite serveur) : des identifiants
+    clairsemés ne coûtent pas de requêtes vides.
+    """
+    since = since or datetime.now(timezone.utc) - WINDOW
+    columns = list(columns)
+    # meas_id sert de curseur de pagination, même s'il n'est pas demandé
+    selected = columns if "meas_id" in columns else ["meas_id", *columns]
+    dtypes = {c: MEASUREMENT_DTYPES[c] for c in selected if c in MEASUREMENT_DTYPES}
+
+    first_id = _meas_id_bound(since, until, after_id)
+    if first_id is None:
+        return empty_frame(columns)
+    last_id = _meas_id_bound(since, until, after_id, desc=True)
+
+    span = last_id - first_id + 1
+    shards = max(1, min(max_workers, -(-span // page_size)))
+    width = -(-span // shards)
+    starts = range(first_id, last_id + 1, width)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        ranges = list(pool.map(lambda a: _fetch_range(selected, dtypes, a, a + width, since, until, page_size), starts))
+    return concat_frames(ranges)[columns]
+
+
+def _utc_timestamp(value) -> pd.Timestamp:
+    """Horodatage UTC : converti s'il porte un fuseau, supposé UTC s'il est naïf."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def load_watermark(path: Path = WATERMARK_PATH) -> dict:
+    """Watermark de la dernière extraction ({'meas_id': ..., 'ts_utc': ...}), {} si absent."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_watermark(watermark: dict, path: Path = WATERMARK_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(watermark), encoding="utf-8")
+
+
+def fetch_incremental(
+    window: timedelta = WINDOW,
+    page_size: int = PAGE_SIZE,
+    cache_path: Path = CACHE_PATH,
+    watermark_path: Path = WATERMARK_PATH,
+) -> pd.DataFrame:
+    """
+    Retourne les mesures de la fenêtre `window` en ne téléchargeant que les
+    lignes postérieures au watermark, fusionnées dans le cache local.
+    Le cache est purgé des lignes sorties de la fenêtre puis réécrit.
+    """
+    since = datetime.now(timezone.utc) - window
+    watermark = load_watermark(watermark_path)
+    cache_path = Path(cache_path)
+
+    cached = apply_schema(pd.read_csv(cache_path, dtype=MEASUREMENT_DTYPES)) if watermark and cache_path.exists() else pd.DataFrame()
+    after_id = watermark.get("meas_id") if not cached.empty else None
+    new_rows = fetch_df(since=since, after_id=after_id, page_size=page_size)
+    print(f"{len(new_rows)} nouvelles lignes depuis le watermark {after_id}")
+
+    frames = [f for f in (cached, new_rows) if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    window_df = concat_frames(frames)
+    window_df = window_df.drop_duplicates("meas_id", keep="last")
+    window_df = window_df[window_df["ts_utc"] > _utc_timestamp(since)]
+    window_df = window_df.sort_values("meas_id").reset_index(drop=True)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    window_df.to_csv(cache_path, index=False)
+    if not window_df.empty:
+        save_watermark(
+            {"meas_id": int(window_df["meas_id"].max()), "ts_utc": window_df["ts_utc"].max().isoformat()},
+            watermark_path,
+        )
+    return window_df
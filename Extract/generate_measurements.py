@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Génère des mesures minute synthétiques au schéma de la table raw_measurements
+(meas_id, turbine_id, ts_utc, wind_speed_mps, temperature_k, vibration_mm_s,
+consumption_kwh), pour N turbines x M jours, en fichiers partitionnés par jour :
+
+    <out>/date=AAAA-MM-JJ/part-<première turbine>.parquet   (ou .csv)
+
+- Vent : moyenne journalière par turbine (Weibull) + composante commune au parc
+  + bruit AR(1) minute + cycle diurne ; la vibration suit le vent, la
+  consommation suit la température.
+- Anomalies injectées (pics de vibration, sauts de température, capteur de vent
+  bloqué à 0), trous de données (arrêts de quelques minutes à quelques heures),
+  doublons (ligne renvoyée avec un nouveau meas_id) et valeurs manquantes.
+- Chaque fichier (jour x bloc de turbines) a son propre flux aléatoire :
+  la sortie est reproductible quel que soit le nombre de workers.
+
+Exemple (100M+ lignes) :
+python -m Extract.generate_measurements --turbines 1000 --days 70 --workers 8 --out measurements_synth
+"""
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 1440
+MEASUREMENT_COLUMNS = [
+    "meas_id", "turbine_id", "ts_utc",
+    "wind_speed_mps", "temperature_k", "vibration_mm_s", "consumption_kwh",
+]
+
+# Paramètres par défaut du générateur (taux par ligne sauf indication)
+DEFAULTS = {
+    "anomaly_rate": 0.001,
+    "gaps_per_day": 0.3,        # arrêts par turbine et par jour
+    "gap_minutes": 45,          # durée moyenne d'un arrêt
+    "duplicate_rate": 0.002,
+    "missing_rate": 0.002,
+}
+TURBINES_PER_FILE = 1000
+
+
+# ---------------------------------------------------------
+# 1. Simulation d'un bloc (jour x turbines)
+# ---------------------------------------------------------
+
+def _ar1(rng: np.random.Generator, shape, phi: float, sigma: float) -> np.ndarray:
+    """Bruit AR(1) stationnaire d'écart-type `sigma` le long du dernier axe (minutes)."""
+    eps = rng.standard_normal(shape) * sigma * np.sqrt(1 - phi ** 2)
+    out = np.empty(shape)
+    out[..., 0] = rng.standard_normal(shape[:-1]) * sigma
+    for t in range(1, shape[-1]):
+        out[..., t] = phi * out[..., t - 1] + eps[..., t]
+    return out
+
+
+def simulate_block(
+    day: date,
+    day_index: int,
+    first_turbine: int,
+    n_block: int,
+    n_turbines: int,
+    seed: int = 0,
+    anomaly_rate: float = DEFAULTS["anomaly_rate"],
+    gaps_per_day: float = DEFAULTS["gaps_per_day"],
+    gap_minutes: float = DEFAULTS["gap_minutes"],
+    duplicate_rate: float = DEFAULTS["duplicate_rate"],
+    missing_rate: float = DEFAULTS["missing_rate"],
+) -> pd.DataFrame:
+    """
+    Mesures minute du jour `day` pour les turbines [first_turbine,
+    first_turbine + n_block[, triées par minute puis turbine. meas_id est
+    dérivé de (minute globale, turbine) : croissant et unique sur tout le jeu.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(day_index, first_turbine)))
+    shape = (n_block, MINUTES_PER_DAY)
+    minutes = np.arange(MINUTES_PER_DAY)
+    hour = minutes / 60.0
+    doy = pd.Timestamp(day).dayofyear
+
+    # Vent : régime du jour par turbine, composante commune du parc, turbulence minute
+    park = _ar1(np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(day_index,))), (1, MINUTES_PER_DAY), 0.995, 1.5)
+    daily = rng.weibull(2.0, (n_block, 1)) * 9.0
+    diurnal = 0.8 * np.sin((hour - 9.0) / 24.0 * 2 * np.pi)
+    wind = np.clip(daily + park + diurnal + _ar1(rng, shape, 0.97, 0.12 * daily.mean() + 0.5), 0.0, 35.0)
+
+    # Température : saison + cycle diurne (minimum vers 5 h) + décalage de site
+    season = 284.0 - 8.0 * np.cos((doy - 20) / 365.25 * 2 * np.pi)
+    temperature = (season + 4.0 * np.sin((hour - 11.0) / 24.0 * 2 * np.pi)
+                   + rng.normal(0.0, 1.5, (n_block, 1)) + rng.normal(0.0, 0.3, shape))
+
+    vibration = np.clip(0.8 + 0.55 * wind + 0.01 * wind ** 2 + rng.normal(0.0, 1.5, shape), 0.01, None)
+    consumption = 1000.0 + 6.0 * (285.0 - temperature) + 3.0 * wind + rng.normal(0.0, 40.0, shape)
+
+    # Anomalies ponctuelles
+    kind = rng.random(shape)
+    hit = rng.random(shape) < anomaly_rate
+    vibration = np.where(hit & (kind < 0.5), vibration * rng.uniform(3.0, 6.0, shape), vibration)
+    temperature = np.where(hit & (kind >= 0.5) & (kind < 0.8), temperature + rng.choice([-40.0, 40.0], shape), temperature)
+    wind = np.where(hit & (kind >= 0.8), 0.0, wind)
+
+    # Trous : arrêts de durée géométrique, par turbine
+    keep = np.ones(shape, dtype=bool)
+    n_gaps = rng.poisson(gaps_per_day, n_block)
+    for t in np.flatnonzero(n_gaps):
+        starts = rng.integers(0, MINUTES_PER_DAY, n_gaps[t])
+        lengths = rng.geometric(1.0 / gap_minutes, n_gaps[t])
+        for s, length in zip(starts, lengths):
+            keep[t, s:s + length] = False
+
+    # Ordre minute puis turbine, comme l'insertion en base
+    turbine_idx = first_turbine + np.arange(n_block)
+    global_minute = day_index * MINUTES_PER_DAY + minutes
+    ids = 1 + 2 * (global_minute[None, :] * n_turbines + turbine_idx[:, None])
+    take = keep.T.ravel()
+    width = max(3, len(str(n_turbines)))
+    names = np.array([f"T{i + 1:0{width}d}" for i in turbine_idx])
+    # Horodatages formatés une fois par jour (1440 chaînes) puis répétés
+    stamps = (pd.Timestamp(day) + pd.to_timedelta(minutes, unit="min")).strftime("%Y-%m-%dT%H:%M:%S").to_numpy()
+    columns = {
+        "meas_id": ids.T.ravel()[take],
+        "turbine_id": np.tile(names, MINUTES_PER_DAY)[take],
+        "ts_utc": np.repeat(stamps, n_block)[take],
+    }
+    # Mesures arrondies comme en base, avec quelques valeurs manquantes
+    for name, values in (("wind_speed_mps", wind), ("temperature_k", temperature),
+                         ("vibration_mm_s", vibration), ("consumption_kwh", consumption)):
+        values = values.T.ravel()[take].round(2)
+        values[rng.random(len(values)) < missing_rate] = np.nan
+        columns[name] = values
+
+    df = pd.DataFrame(columns, columns=MEASUREMENT_COLUMNS)
+
+    # Doublons : ligne renvoyée juste après l'originale avec meas_id + 1
+    dup = np.flatnonzero(rng.random(len(df)) < duplicate_rate)
+    if len(dup):
+        copies = df.iloc[dup].assign(meas_id=df["meas_id"].to_numpy()[dup] + 1)
+        df = pd.concat([df, copies]).sort_values("meas_id", kind="stable", ignore_index=True)
+    return df
+
+
+# ---------------------------------------------------------
+# 2. Fichiers partitionnés, workers parallèles
+# ---------------------------------------------------------
+
+def _write_block(task) -> int:
+    out_dir, fmt, day, day_index, first_turbine, n_block, n_turbines, seed, params = task
+    df = simulate_block(day, day_index, first_turbine, n_block, n_turbines, seed, **params)
+    part = Path(out_dir) / f"date={day:%Y-%m-%d}"
+    part.mkdir(parents=True, exist_ok=True)
+    path = part / f"part-{first_turbine:06d}.{fmt}"
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return len(df)
+
+
+def generate_measurements(
+    out_dir,
+    turbines: int = 100,
+    days: int = 1,
+    start: str = "2025-01-01",
+    seed: int = 0,
+    workers: int = None,
+    fmt: str = "parquet",
+    turbines_per_file: int = TURBINES_PER_FILE,
+    **params,
+) -> dict:
+    """
+    Écrit `turbines` x `days` x 1440 mesures (moins les trous, plus les
+    doublons) dans `out_dir`, un fichier par (jour, bloc de
+    `turbines_per_file` turbines), générés par `workers` processus.
+    `params` : taux de DEFAULTS. Retourne {"files": ..., "rows": ...}.
+    """
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Format inconnu : {fmt}")
+    params = {**DEFAULTS, **params}
+    start = pd.Timestamp(start).date()
+    tasks = [
+        (str(out_dir), fmt, (pd.Timestamp(start) + pd.Timedelta(days=d)).date(), d,
+         first, min(turbines_per_file, turbines - first), turbines, seed, params)
+        for d in range(days)
+        for first in range(0, turbines, turbines_per_file)
+    ]
+    if workers == 1:
+        rows = sum(map(_write_block, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = sum(pool.map(_write_block, tasks))
+    return {"files": len(tasks), "rows": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures minute synthétiques (schéma raw_measurements)")
+    parser.add_argument("--turbines", type=int, default=100)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--start", default="2025-01-01", help="Premier jour (AAAA-MM-JJ)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : nombre de CPU)")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    parser.add_argument("--turbines-per-file", type=int, default=TURBINES_PER_FILE)
+    parser.add_argument("--anomaly-rate", type=float, default=DEFAULTS["anomaly_rate"])
+    parser.add_argument("--duplicate-rate", type=float, default=DEFAULTS["duplicate_rate"])
+    parser.add_argument("--gaps-per-day", type=float, default=DEFAULTS["gaps_per_day"])
+    parser.add_argument("--out", default="measurements_synth")
+    args = parser.parse_args(argv)
+
+    summary = generate_measurements(
+        args.out, turbines=args.turbines, days=args.days, start=args.start, seed=args.seed,
+        workers=args.workers, fmt=args.format, turbines_per_file=args.turbines_per_file,
+        anomaly_rate=args.anomaly_rate, duplicate_rate=args.duplicate_rate, gaps_per_day=args.gaps_per_day,
+    )
+    print(f"{summary['rows']:,} lignes écrites dans {summary['files']} fichiers sous {Path(args.out).resolve()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
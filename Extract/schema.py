@@ -0,0 +1,112 @@
+# schema.py
+"""
+Schémas déclarés des sources (table raw_measurements, CSV de production
+journalière) et leur application aux DataFrames : chaque lecteur (pages
+Supabase, cache CSV, fichiers partitionnés, CSV de repli) produit les mêmes
+dtypes compacts, conservés par les étapes Transform.
+
+- identifiants de turbine en category (codes int8/int16 + une chaîne par turbine) ;
+- horodatages en datetime64 (8 octets au lieu d'une chaîne) ;
+- mesures en float32 (arrondies à 0,01 en base : la précision float32 suffit) ;
+- drapeaux d'arrêt en Int8 nullable (1 octet + masque).
+"""
+
+from functools import reduce
+from typing import Dict, Iterable
+
+import pandas as pd
+
+MEASUREMENT_SCHEMA = {
+    "meas_id": "int64",
+    "turbine_id": "category",
+    "ts_utc": "datetime64[ns, UTC]",
+    "wind_speed_mps": "float32",
+    "temperature_k": "float32",
+    "vibration_mm_s": "float32",
+    "consumption_kwh": "float32",
+}
+
+PRODUCTION_SCHEMA = {
+    "date": "datetime64[ns]",
+    "turbin_id": "category",
+    "energie_kWh": "float32",
+    "arret_planifie": "Int8",
+    "arret_non_planifie": "Int8",
+}
+
+
+def csv_dtypes(schema: Dict[str, str] = MEASUREMENT_SCHEMA) -> Dict[str, str]:
+    """dtype= de pd.read_csv : le schéma sans les horodatages (parsés ensuite par apply_schema)."""
+    return {c: dtype for c, dtype in schema.items() if not dtype.startswith("datetime64")}
+
+
+def _parse_datetimes(values: pd.Series, dtype: pd.api.extensions.ExtensionDtype) -> pd.Series:
+    # Peu d'horodatages distincts (une minute pour toute la flotte) : parsing des seules valeurs uniques
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    utc = isinstance(dtype, pd.DatetimeTZDtype)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format="ISO8601", errors="coerce", utc=utc)
+    if not utc and parsed.tz is not None:
+        parsed = parsed.tz_convert("UTC").tz_localize(None)
+    parsed = parsed.as_unit("ns")
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index)
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = MEASUREMENT_SCHEMA) -> pd.DataFrame:
+    """
+    Convertit en place les colonnes présentes de `df` vers les dtypes de
+    `schema` et retourne `df` ; les colonnes déjà conformes ne sont pas
+    recopiées, les colonnes hors schéma sont laissées telles quelles.
+    Valeurs non numériques -> NaN, horodatages invalides -> NaT.
+    """
+    for column, name in schema.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        dtype = pd.api.types.pandas_dtype(name)
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.astype("category")
+        elif series.dtype == dtype:
+            continue
+        elif name.startswith("datetime64"):
+            if pd.api.types.is_datetime64_any_dtype(series):
+                tz = series.dt.tz
+                if isinstance(dtype, pd.DatetimeTZDtype):
+                    series = series.dt.tz_localize("UTC") if tz is None else series.dt.tz_convert("UTC")
+                elif tz is not None:
+                    series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+                df[column] = series.dt.as_unit("ns")
+            else:
+                df[column] = _parse_datetimes(series, dtype)
+        else:
+            if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                series = pd.to_numeric(series, errors="coerce")
+            df[column] = series.astype(dtype)
+    return df
+
+
+def empty_frame(columns: Iterable[str], schema: Dict[str, str] = MEASUREMENT_SCHEMA) -> pd.DataFrame:
+    """DataFrame vide aux dtypes du schéma (object pour les colonnes hors schéma)."""
+    return pd.DataFrame({c: pd.Series(dtype=schema.get(c, "object")) for c in columns})
+
+
+def concat_frames(frames, schema: Dict[str, str] = MEASUREMENT_SCHEMA) -> pd.DataFrame:
+    """
+    pd.concat(frames, ignore_index=True) en gardant les colonnes category :
+    chaque chunk a ses propres catégories, réalignées sur leur union
+    (pd.concat retomberait sinon sur des chaînes object).
+    """
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    for column, name in schema.items():
+        if name != "category" or not all(isinstance(f.dtypes.get(column), pd.CategoricalDtype) for f in frames):
+            continue
+        categories = reduce(lambda a, b: a.union(b, sort=False), (f[column].cat.categories for f in frames))
+        frames = [f.assign(**{column: f[column].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_per_million(df: pd.DataFrame) -> float:
+    """Octets (deep=True, chaînes comprises) par million de lignes."""
+    return float(df.memory_usage(deep=True, index=False).sum()) / max(len(df), 1) * 1e6
@@ -1,11 +1,281 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import hashlib
+import html
 import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # rendu fichier uniquement, sans affichage
+from matplotlib.figure import Figure
+
+from Graphics.figure_cache import render_figures
+
+# Taille du dashboard indépendante du volume : aperçu et échantillon plafonnés,
+# courbes réduites à CHART_POINTS points
+PREVIEW_ROWS = 10
+SAMPLE_ROWS = 500
+PAGE_ROWS = 50
+CHART_POINTS = 1000
+MAX_TURBINE_CHARTS = 12
+GROUP_COLUMNS = ("turbine_id", "station_id")
+TIME_COLUMN = "ts_utc"
+WIND_COLUMNS = ("wind_speed", "wind_speed_mps")
+NON_MEASURES = {"meas_id", "station_id"}
+
+
+# ---------------------------------------------------------
+# 1. Réduction des séries temporelles
+# ---------------------------------------------------------
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int = CHART_POINTS) -> np.ndarray:
+    """
+    Indices des `n_out` points retenus par Largest-Triangle-Three-Buckets :
+    premier et dernier point, puis dans chaque bucket le point formant le plus
+    grand triangle avec le point retenu précédent et la moyenne du bucket suivant.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Moyennes des buckets suivants, précalculées par sommes cumulées (le dernier : dernier point)
+    nlo = np.append(edges[1:], n - 1)
+    nhi = np.append(edges[2:], [n, n])[:len(nlo)]
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    cx = (cum_x[nhi] - cum_x[nlo]) / (nhi - nlo)
+    cy = (cum_y[nhi] - cum_y[nlo]) / (nhi - nlo)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - cx[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy[i] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_buckets(x: np.ndarray, y: np.ndarray, n_buckets: int = CHART_POINTS):
+    """(x de début, min, max) de `n_buckets` buckets de taille égale : enveloppe des extrêmes."""
+    if len(x) <= n_buckets:
+        return x, y, y
+    starts = np.linspace(0, len(x), n_buckets + 1).astype(np.int64)[:-1]
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+
+# ---------------------------------------------------------
+# 2. Statistiques en une passe
+# ---------------------------------------------------------
+
+def _time_axis(values: pd.Series):
+    """Horodatages en datetime64 UTC naïfs ; seules les valeurs distinctes sont parsées."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = pd.Series(uniques)
+    if not pd.api.types.is_datetime64_any_dtype(uniques):
+        uniques = pd.to_datetime(uniques, errors="coerce", utc=True, format="ISO8601")
+    elif uniques.dt.tz is None:
+        uniques = uniques.dt.tz_localize("UTC")
+    parsed = np.append(uniques.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ms]"),
+                       np.datetime64("NaT", "ms"))
+    return parsed[codes]
+
+
+def _columns(df: pd.DataFrame, by):
+    measures = [c for c in df.columns
+                if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+                and c not in NON_MEASURES and c != by]
+    flags = [c for c in df.columns if pd.api.types.is_bool_dtype(df[c])]
+    return measures, flags
+
+
+def summarize(df: pd.DataFrame, by=None, measures=None, flags=None, times=None):
+    """
+    Agrégats par turbine (lignes, premier / dernier horodatage, moyenne, min,
+    max et valeurs manquantes de chaque mesure, nombre d'anomalies) calculés
+    en une passe par colonne (bincount / minimum.at), puis statistiques
+    globales dérivées des agrégats sans relire les données.
+    Retourne (par_turbine, global).
+    """
+    if measures is None or flags is None:
+        measures, flags = _columns(df, by)
+    codes, groups = pd.factorize(df[by]) if by else (np.zeros(len(df), dtype=np.int64), pd.Index(["flotte"]))
+    codes = np.where(codes < 0, len(groups), codes)  # turbine manquante : groupe à part
+    k = len(groups) + 1
+    rows = np.bincount(codes, minlength=k)
+    per_group = {"rows": rows}
+    if times is not None:
+        t = times.astype(np.int64)
+        valid = ~np.isnat(times)
+        first = np.full(k, np.iinfo(np.int64).max)
+        last = np.full(k, np.iinfo(np.int64).min)
+        np.minimum.at(first, codes[valid], t[valid])
+        np.maximum.at(last, codes[valid], t[valid])
+        per_group["first_ts"] = np.where(first < np.iinfo(np.int64).max, first, np.iinfo(np.int64).min).astype("datetime64[ms]")
+        per_group["last_ts"] = last.astype("datetime64[ms]")
+
+    overall = {}
+    for column in measures:
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        c, v = codes[valid], values[valid]
+        count = np.bincount(c, minlength=k)
+        total = np.bincount(c, weights=v, minlength=k)
+        squares = np.bincount(c, weights=v * v, minlength=k)
+        low, high = np.full(k, np.inf), np.full(k, -np.inf)
+        np.minimum.at(low, c, v)
+        np.maximum.at(high, c, v)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            per_group[f"{column}_mean"] = total / count
+        per_group[f"{column}_min"] = np.where(count > 0, low, np.nan)
+        per_group[f"{column}_max"] = np.where(count > 0, high, np.nan)
+        per_group[f"{column}_missing"] = rows - count
+        n = count.sum()
+        mean = total.sum() / n if n else np.nan
+        overall[column] = {
+            "count": int(n),
+            "missing": int(len(values) - n),
+            "mean": mean,
+            "std": np.sqrt(max(squares.sum() / n - mean * mean, 0.0)) * np.sqrt(n / (n - 1)) if n > 1 else np.nan,
+            "min": low.min() if n else np.nan,
+            "max": high.max() if n else np.nan,
+        }
+    for column in flags:
+        hits = np.bincount(codes, weights=df[column].to_numpy(dtype=bool, na_value=False), minlength=k).astype(np.int64)
+        per_group[column] = hits
+        overall[column] = {"count": int(len(df)), "anomalies": int(hits.sum())}
+
+    index = groups.append(pd.Index([None])) if by else pd.Index(["flotte", None])
+    table = pd.DataFrame(per_group, index=pd.Index(index, name=by or "groupe"))
+    table = table[table["rows"] > 0]
+    if flags:
+        table = table.assign(anomalies=table[flags].sum(axis=1)).sort_values("anomalies", ascending=False, kind="stable")
+    return table, pd.DataFrame(overall).T
+
+
+# ---------------------------------------------------------
+# 3. Séries et figures
+# ---------------------------------------------------------
+
+def fleet_series(times: np.ndarray, values: np.ndarray):
+    """Moyenne de la flotte par horodatage, triée dans le temps : (t, moyenne)."""
+    valid = ~np.isnat(times) & ~np.isnan(values)
+    codes, uniques = pd.factorize(times[valid], sort=True)
+    count = np.bincount(codes, minlength=len(uniques))
+    total = np.bincount(codes, weights=values[valid], minlength=len(uniques))
+    return np.asarray(uniques, dtype="datetime64[ms]"), total / count
+
+
+def reduce_series(t: np.ndarray, y: np.ndarray):
+    """
+    Série prête à tracer : valeurs manquantes retirées, réduite par LTTB à
+    CHART_POINTS points, avec l'enveloppe min/max des buckets (None si la
+    série est déjà assez courte). Retourne (t, y, enveloppe).
+    """
+    valid = ~np.isnan(y)
+    t, y = t[valid], y[valid]
+    envelope = minmax_buckets(t, y) if len(t) > CHART_POINTS else None
+    keep = lttb(t.astype(np.int64), y)
+    return t[keep], y[keep], envelope
+
+
+def histogram_spec(values: np.ndarray, title: str, xlabel: str, bins: int = 20) -> dict:
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return {"counts": counts, "edges": edges, "title": title, "xlabel": xlabel}
 
-def generate_dashboard(df, output_html="dashboard.html"):
+
+def draw_series(spec: dict, path) -> None:
+    """
+    Figure de séries temporelles, spec = {"title", "panels": [(nom, t, y)]}.
+    La réduction (reduce_series) a lieu ici, dans le processus de rendu :
+    une figure reprise du cache ne coûte que le hash de ses données.
+    Figure objet, sans l'état global de pyplot.
+    """
+    panels = spec["panels"]
+    fig = Figure(figsize=(10, 2.2 * len(panels)))
+    axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)
+    for ax, (name, t, y) in zip(axes[:, 0], panels):
+        t, y, envelope = reduce_series(t, y)
+        if envelope is not None:
+            ax.fill_between(*envelope, color="#9ecae1", alpha=0.5, linewidth=0)
+        ax.plot(t, y, color="#08519c", linewidth=0.8)
+        ax.set_ylabel(name, fontsize=8)
+    axes[0, 0].set_title(spec["title"])
+    # Marges fixes : tight_layout coûterait un rendu supplémentaire par figure
+    fig.subplots_adjust(left=0.08, right=0.98, top=0.93, bottom=0.08, hspace=0.12)
+    fig.savefig(path, dpi=80, format="png")
+
+
+def draw_histogram(spec: dict, path) -> None:
+    fig = Figure()
+    ax = fig.subplots()
+    ax.stairs(spec["counts"], spec["edges"], fill=True)
+    ax.set_title(spec["title"])
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel("Fréquence")
+    fig.savefig(path, format="png")
+
+
+def _turbine_slices(codes: np.ndarray, n_groups: int):
+    """Ordre des lignes groupées par turbine (tri stable) et bornes de chaque groupe."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_groups))])
+    return order, bounds
+
+
+# ---------------------------------------------------------
+# 4. Page HTML
+# ---------------------------------------------------------
+
+STYLE = """
+    body { font-family: Arial, sans-serif; margin: 30px; background: #fafafa; }
+    h1, h2 { color: #333; }
+    table { border-collapse: collapse; margin-top: 10px; font-size: 12px; }
+    th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+    th { background: #eee; }
+    img { margin-top: 10px; max-width: 900px; display: block; }
+    details { margin-top: 6px; }
+"""
+
+
+def _sample_pages(df: pd.DataFrame) -> str:
+    """Échantillon aléatoire reproductible de SAMPLE_ROWS lignes, en pages repliables de PAGE_ROWS."""
+    sample = df.sample(n=min(SAMPLE_ROWS, len(df)), random_state=0).sort_index() if len(df) else df
+    pages = []
+    for start in range(0, len(sample), PAGE_ROWS):
+        page = sample.iloc[start:start + PAGE_ROWS]
+        pages.append(f"<details><summary>Lignes {start + 1}–{start + len(page)}</summary>"
+                     f"{page.to_html(index=False)}</details>")
+    return "\n".join(pages)
+
+
+def _images(paths) -> str:
+    return "\n".join(f'<img src="{html.escape(p)}">' for p in paths) or "<p>Aucun graphique disponible.</p>"
+
+
+def _slug(name) -> str:
     """
-    Génère un dashboard HTML à partir d’un DataFrame.
-    Aucun fichier CSV n’est lu dans cette version.
+    Nom de fichier sûr et unique par turbine : un nom réécrit (« T 1 » et
+    « T/1 » -> « T_1 ») reçoit le hash du nom brut, stable d'un run à l'autre.
+    """
+    raw = str(name)
+    slug = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in raw)
+    if slug == raw:
+        return slug
+    return f"{slug}_{hashlib.blake2b(raw.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def generate_dashboard(df, output_html="dashboard.html", turbine_charts=MAX_TURBINE_CHARTS, workers=None):
+    """
+    Génère un dashboard HTML à partir d’un DataFrame : statistiques globales,
+    agrégats par turbine, aperçu et échantillon plafonnés, courbes de la
+    flotte et des `turbine_charts` turbines les plus anomaliques (None :
+    toutes) réduites à CHART_POINTS points.
+    Les images sont écrites dans `<nom>_files/` à côté du HTML, nommées par
+    le hash de leurs données : une figure inchangée depuis le run précédent
+    n'est pas redessinée, les autres sont rendues sur `workers` processus.
     """
 
     # Vérification du type
@@ -14,76 +284,90 @@ def generate_dashboard(df, output_html="dashboard.html"):
 
     print("📄 DataFrame reçu, génération du dashboard...\n")
 
+    output_html = Path(output_html)
+    assets = output_html.with_name(f"{output_html.stem}_files")
+    assets.mkdir(parents=True, exist_ok=True)
+
+    by = next((c for c in GROUP_COLUMNS if c in df.columns), None)
+    measures, flags = _columns(df, by)
+    times = _time_axis(df[TIME_COLUMN]) if TIME_COLUMN in df.columns and len(df) else None
+    per_turbine, overall = summarize(df, by, measures, flags, times)
+
     # Aperçu
     print("=== Aperçu du DataFrame ===")
     print(df.head())
 
     # Statistiques
     print("\n=== Statistiques ===")
-    print(df.describe(include="all"))
-
-    # Histogramme
-    hist_path = "wind_speed_hist.png"
-    if "wind_speed" in df.columns:
-        plt.figure()
-        plt.hist(df["wind_speed"].dropna(), bins=20)
-        plt.title("Répartition de la vitesse du vent")
-        plt.xlabel("Vitesse du vent")
-        plt.ylabel("Fréquence")
-        plt.savefig(hist_path)
-        plt.close()
-        print(f"📊 Histogramme généré : {hist_path}")
+    print(overall)
+
+    # Figures décrites par leurs données, rendues ensuite en une fois : (nom, rendu, données)
+    jobs = []
+    wind = next((c for c in WIND_COLUMNS if c in df.columns), None)
+    if wind is not None:
+        jobs.append(("wind_speed_hist", draw_histogram,
+                     histogram_spec(df[wind].to_numpy(dtype=np.float64, na_value=np.nan),
+                                    "Répartition de la vitesse du vent", "Vitesse du vent")))
     else:
         print("⚠️ Aucune colonne 'wind_speed' → histogramme non généré.")
 
-    # Construction du tableau HTML
+    # Courbes : moyenne de la flotte, puis turbines les plus anomaliques
+    if times is not None and measures:
+        arrays = {c: df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in measures}
+        panels = [(c, *fleet_series(times, arrays[c])) for c in measures]
+        jobs.append(("fleet", draw_series, {"title": "Moyenne de la flotte", "panels": panels}))
+        if by is not None:
+            codes, groups = pd.factorize(df[by])
+            order, bounds = _turbine_slices(np.where(codes < 0, len(groups), codes), len(groups) + 1)
+            position = {name: i for i, name in enumerate(groups)}
+            for name in [g for g in per_turbine.index if g in position][:turbine_charts]:
+                i = position[name]
+                rows = order[bounds[i]:bounds[i + 1]]
+                rows = rows[np.argsort(times[rows], kind="stable")]
+                panels = [(c, times[rows], arrays[c][rows]) for c in measures]
+                jobs.append((f"turbine_{_slug(name)}", draw_series, {"title": f"Turbine {name}", "panels": panels}))
+
+    images, rendering = render_figures(jobs, assets, workers=workers)
+    print(f"📊 Figures : {rendering['rendered']} rendues, {rendering['cached']} reprises du cache")
+    hist_path = images.pop("wind_speed_hist", None)
+    charts = list(images.values())
+
+    rel = lambda p: os.path.relpath(p, output_html.parent)
+    per_turbine_html = per_turbine.reset_index().to_html(index=False, float_format=lambda v: f"{v:.2f}", na_rep="")
+
+    # Construction de la page HTML : taille bornée quel que soit le nombre de lignes
     with open(output_html, "w", encoding="utf-8") as f:
-        f.write(f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Dashboard Qualité des Données</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 30px;
-                    background: #fafafa;
-                }}
-                h1, h2 {{
-                    color: #333;
-                }}
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                    margin-top: 20px;
-                }}
-                th, td {{
-                    border: 1px solid #ccc;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                th {{
-                    background: #eee;
-                }}
-                img {{
-                    margin-top: 20px;
-                    max-width: 600px;
-                }}
-            </style>
-        </head>
-        <body>
-
-            <h1>Dashboard Qualité des Données</h1>
-
-            <h2>Aperçu du Dataset</h2>
-            {df.to_html(index=False)}
-
-            <h2>Histogramme — Vitesse du vent</h2>
-            {f'<img src="{hist_path}">' if os.path.exists(hist_path) else "<p>Aucun histogramme disponible.</p>"}
-
-        </body>
-        </html>
-        """)
+        f.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Dashboard Qualité des Données</title>
+    <style>{STYLE}</style>
+</head>
+<body>
+    <h1>Dashboard Qualité des Données</h1>
+    <p>{len(df):,} lignes, {len(per_turbine):,} turbines.</p>
+
+    <h2>Statistiques globales</h2>
+    {overall.to_html(float_format=lambda v: f"{v:.3f}", na_rep="")}
+
+    <h2>Agrégats par turbine</h2>
+    {per_turbine_html}
+
+    <h2>Aperçu du Dataset</h2>
+    {df.head(PREVIEW_ROWS).to_html(index=False)}
+
+    <h2>Échantillon ({min(SAMPLE_ROWS, len(df))} lignes)</h2>
+    {_sample_pages(df)}
+
+    <h2>Histogramme — Vitesse du vent</h2>
+    {_images([rel(hist_path)]) if hist_path else "<p>Aucun histogramme disponible.</p>"}
+
+    <h2>Séries temporelles</h2>
+    {_images([rel(p) for p in charts])}
+</body>
+</html>
+""")
 
     print(f"\n📁 Dashboard généré : {output_html}")
+    return str(output_html)
@@ -0,0 +1,80 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# À incrémenter quand le rendu change (style, taille) : invalide toutes les images en cache
+RENDER_VERSION = "1"
+DIGEST_SIZE = 8  # octets -> 16 caractères hexadécimaux dans le nom de fichier
+RENDER_WORKERS = None  # None : nombre de CPU
+
+
+def _feed(h, value) -> None:
+    """Ajoute `value` (tableaux numpy, séquences, dicts, scalaires) au hash, type compris."""
+    if isinstance(value, np.ndarray):
+        h.update(f"nd{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"d")
+        for key in sorted(value):
+            _feed(h, key)
+            _feed(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"l{len(value)}".encode())
+        for item in value:
+            _feed(h, item)
+    else:
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def spec_digest(draw, spec) -> str:
+    """Hash du contenu d'une figure : fonction de rendu, version et données tracées."""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    _feed(h, (RENDER_VERSION, draw.__module__, draw.__qualname__, spec))
+    return h.hexdigest()
+
+
+def _render(job) -> str:
+    """Rend une figure dans un fichier temporaire puis le renomme : jamais d'image partielle en cache."""
+    draw, spec, path = job
+    tmp = f"{path}.{os.getpid()}.tmp"
+    draw(spec, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def render_figures(jobs, directory, workers=RENDER_WORKERS, prune: bool = True):
+    """
+    Rend les figures `jobs` = [(nom, draw, spec)] dans `directory`, chacune
+    nommée `<nom>-<hash>.png` d'après spec_digest. Une image dont le fichier
+    existe déjà est réutilisée telle quelle ; les autres sont rendues par
+    `draw(spec, chemin)` dans un pool de `workers` processus (en série s'il
+    n'y en a qu'une ou si workers=1). `prune` supprime les images des runs
+    précédents qui ne sont plus référencées.
+    Retourne ({nom: chemin}, {"rendered": ..., "cached": ...}).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths, missing = {}, []
+    for name, draw, spec in jobs:
+        path = directory / f"{name}-{spec_digest(draw, spec)}.png"
+        paths[name] = str(path)
+        if not path.exists():
+            missing.append((draw, spec, str(path)))
+
+    workers = workers or os.cpu_count() or 1
+    if len(missing) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            list(pool.map(_render, missing))
+    else:
+        for job in missing:
+            _render(job)
+
+    if prune:
+        current = set(paths.values())
+        for old in directory.glob("*.png"):
+            if str(old) not in current:
+                old.unlink()
+    return paths, {"rendered": len(missing), "cached": len(paths) - len(missing)}
@@ -0,0 +1,313 @@
+"""
+Chargement des mesures nettoyées dans PostgreSQL.
+
+Le DataFrame est envoyé par chunks avec COPY ... FROM STDIN (format texte ou
+binaire, buffer en mémoire) dans une table de staging UNLOGGED, puis fusionné
+dans la table cible par un seul INSERT ... ON CONFLICT (unique_id) DO UPDATE :
+recharger une fenêtre déjà chargée met les lignes à jour sans doublon.
+
+Exemple :
+python -m Load.load_db --input transformed_measurements.csv --table measurements_clean
+"""
+
+import argparse
+import csv
+import io
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+env_path = Path(__file__).with_name(".env")
+
+TARGET_TABLE = "measurements_clean"
+KEY_COLUMN = "unique_id"
+CHUNK_ROWS = 100_000
+DUPLICATE_POLICIES = ("warn", "error")
+COPY_FORMATS = ("text", "binary")
+
+# Types Postgres imposés par colonne ; les autres sont déduits du dtype (pg_type)
+COLUMN_TYPES = {
+    "ts_utc": "timestamptz",
+    "unique_id": "text",
+}
+
+# Format binaire COPY : en-tête, fin de flux, encodage big-endian des types fixes
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+BINARY_CODECS = {
+    "bigint": ">i8",
+    "integer": ">i4",
+    "smallint": ">i2",
+    "double precision": ">f8",
+    "real": ">f4",
+    "boolean": "u1",
+    "timestamptz": ">i8",
+    "timestamp": ">i8",
+}
+PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+
+# ---------------------------------------------------------
+# 1. Connexion et schéma
+# ---------------------------------------------------------
+
+def get_connection(dsn: str = None):
+    """Connexion psycopg2 vers `dsn`, sinon DATABASE_URL (variables d'environnement ou Load/.env)."""
+    import psycopg2  # import différé : importer le module ne charge pas le driver
+
+    if dsn is None:
+        load_dotenv(env_path)
+        dsn = os.environ.get("DATABASE_URL")
+    if not dsn:
+        raise RuntimeError("DATABASE_URL absent : renseigner Load/.env ou passer dsn=.")
+    return psycopg2.connect(dsn)
+
+
+def pg_type(series: pd.Series) -> str:
+    """Type Postgres d'une colonne d'après son dtype pandas."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return {1: "smallint", 2: "smallint", 4: "integer"}.get(dtype.itemsize, "bigint")
+    if pd.api.types.is_float_dtype(dtype):
+        return "real" if dtype.itemsize == 4 else "double precision"
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return "timestamptz"
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return "timestamp"
+    return "text"
+
+
+def column_types(df: pd.DataFrame) -> dict:
+    return {c: COLUMN_TYPES.get(c) or pg_type(df[c]) for c in df.columns}
+
+
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def create_table_sql(table: str, types: dict, key: str = KEY_COLUMN) -> str:
+    columns = ", ".join(f"{_ident(c)} {t}" for c, t in types.items())
+    return f"CREATE TABLE IF NOT EXISTS {_ident(table)} ({columns}, PRIMARY KEY ({_ident(key)}))"
+
+
+def upsert_sql(table: str, staging: str, columns, key: str = KEY_COLUMN) -> str:
+    names = ", ".join(_ident(c) for c in columns)
+    updates = ", ".join(f"{_ident(c)} = EXCLUDED.{_ident(c)}" for c in columns if c != key)
+    action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    return (f"INSERT INTO {_ident(table)} ({names}) SELECT {names} FROM {_ident(staging)} "
+            f"ON CONFLICT ({_ident(key)}) {action}")
+
+
+def prepare_frame(df: pd.DataFrame, key: str = KEY_COLUMN, duplicates: str = "warn") -> pd.DataFrame:
+    """
+    Une ligne par clé (ON CONFLICT refuse deux lignes de même clé dans un
+    INSERT) et colonnes typées timestamptz parsées si texte.
+    Clés répétées : duplicates="warn" garde la dernière ligne et signale le
+    nombre de lignes écartées, duplicates="error" lève une ValueError.
+    """
+    if key not in df.columns:
+        raise KeyError(f"Colonne clé absente : {key}")
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Politique de doublons inconnue : {duplicates}")
+    repeated = df.duplicated(key, keep="last")
+    if repeated.any():
+        message = f"{int(repeated.sum())} lignes sur {len(df)} partagent une clé {key} avec une ligne suivante"
+        if duplicates == "error":
+            raise ValueError(message)
+        print(f"⚠️ {message} : seule la dernière est chargée")
+        df = df[~repeated.to_numpy()]
+    for column, kind in COLUMN_TYPES.items():
+        if kind == "timestamptz" and column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            from Transform.date_normalization import parse_timestamps
+            df = df.assign(**{column: parse_timestamps(df[column])})
+    return df
+
+
+# ---------------------------------------------------------
+# 2. Buffers COPY
+# ---------------------------------------------------------
+
+def _escape_text(series: pd.Series) -> pd.Series:
+    for raw, esc in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+        series = series.str.replace(raw, esc, regex=False)
+    return series
+
+
+def copy_text_buffer(df: pd.DataFrame) -> io.BytesIO:
+    """
+    Chunk au format texte de COPY : tabulations, \\N pour NULL, antislash,
+    tabulation et fins de ligne échappés dans les colonnes texte. Les
+    horodatages et les float32 sont formatés une fois par valeur distincte.
+    """
+    escaped = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            codes, uniques = pd.factorize(series)
+            if isinstance(series.dtype, pd.DatetimeTZDtype):
+                uniques = uniques.tz_convert("UTC").strftime("%Y-%m-%d %H:%M:%S.%f+00")
+            else:
+                uniques = uniques.strftime("%Y-%m-%d %H:%M:%S.%f")
+            escaped[column] = pd.Series(np.append(np.asarray(uniques, dtype=object), None)[codes], index=series.index)
+        elif series.dtype == np.float32:
+            # Le module csv écrirait le repr float64 (17.030000686645508) : formatage des valeurs distinctes
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            escaped[column] = pd.Series(np.append(np.asarray(uniques, dtype=np.float32).astype(str).astype(object), None)[codes], index=series.index)
+        elif isinstance(series.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(series.cat.categories):
+            # Échappement des seules catégories (une chaîne par turbine)
+            escaped[column] = series.cat.rename_categories(_escape_text(series.cat.categories.to_series()))
+        elif pd.api.types.is_string_dtype(series):
+            escaped[column] = _escape_text(series)
+    frame = df.assign(**escaped) if escaped else df
+    text = frame.to_csv(sep="\t", header=False, index=False, na_rep="\\N", quoting=csv.QUOTE_NONE, lineterminator="\n")
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def _binary_field(series: pd.Series, kind: str):
+    """(longueurs int64 avec -1 pour NULL, octets) d'une colonne au format binaire de COPY."""
+    if kind in BINARY_CODECS:
+        if kind in ("timestamptz", "timestamp"):
+            values = series.dt.tz_convert("UTC").dt.tz_localize(None) if kind == "timestamptz" else series
+            values = values.to_numpy(dtype="datetime64[us]")
+            null = np.isnat(values)
+            values = (values - PG_EPOCH).astype(np.int64)
+        else:
+            null = series.isna().to_numpy()
+            values = series.to_numpy(dtype=np.dtype(BINARY_CODECS[kind]).newbyteorder("="), na_value=0)
+        data = np.ascontiguousarray(values.astype(BINARY_CODECS[kind])).view(np.uint8)
+        width = np.dtype(BINARY_CODECS[kind]).itemsize
+        lengths = np.where(null, -1, width)
+        return lengths, data.reshape(len(series), width)[~null].ravel()
+
+    import pyarrow as pa
+    array = pa.array(series.astype(object), type=pa.large_string(), from_pandas=True)
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64, count=len(array) + 1, offset=array.offset * 8)
+    data = np.frombuffer(array.buffers()[2], dtype=np.uint8) if array.buffers()[2] else np.empty(0, np.uint8)
+    lengths = np.diff(offsets)
+    lengths = np.where(series.isna().to_numpy(), -1, lengths)
+    return lengths, data[offsets[0]:offsets[-1]]
+
+
+def copy_binary_buffer(df: pd.DataFrame, types: dict = None) -> io.BytesIO:
+    """
+    Chunk au format binaire de COPY, assemblé sans boucle par ligne : la
+    position de chaque champ est calculée par sommes cumulées des longueurs,
+    puis les octets de chaque colonne sont placés en une affectation.
+    """
+    types = types or column_types(df)
+    n = len(df)
+    if n == 0:
+        return io.BytesIO(PGCOPY_HEADER + PGCOPY_TRAILER)
+    fields = [_binary_field(df[c], types[c]) for c in df.columns]
+    sizes = 2 + sum((4 + np.maximum(lengths, 0) for lengths, _ in fields), np.zeros(n, dtype=np.int64))
+    row_start = len(PGCOPY_HEADER) + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    total = len(PGCOPY_HEADER) + int(np.sum(sizes)) + len(PGCOPY_TRAILER)
+
+    out = np.zeros(total, dtype=np.uint8)
+    out[:len(PGCOPY_HEADER)] = np.frombuffer(PGCOPY_HEADER, dtype=np.uint8)
+    out[-len(PGCOPY_TRAILER):] = np.frombuffer(PGCOPY_TRAILER, dtype=np.uint8)
+    count = np.frombuffer(struct.pack(">h", len(fields)), dtype=np.uint8)
+    out[row_start[:, None] + np.arange(2)] = count
+
+    position = row_start + 2
+    for lengths, data in fields:
+        out[position[:, None] + np.arange(4)] = lengths.astype(">i4").view(np.uint8).reshape(n, 4)
+        present = lengths > 0
+        if present.any():
+            sizes_present = lengths[present]
+            starts = position[present] + 4
+            # Indice de destination de chaque octet : début du champ + rang dans le champ
+            shift = np.repeat(starts - np.concatenate([[0], np.cumsum(sizes_present)[:-1]]), sizes_present)
+            out[shift + np.arange(len(shift))] = data
+        position = position + 4 + np.maximum(lengths, 0)
+    return io.BytesIO(out.tobytes())
+
+
+# ---------------------------------------------------------
+# 3. Chargement
+# ---------------------------------------------------------
+
+def load_dataframe(
+    df: pd.DataFrame,
+    table: str = TARGET_TABLE,
+    key: str = KEY_COLUMN,
+    conn=None,
+    chunk_rows: int = CHUNK_ROWS,
+    fmt: str = "binary",
+    duplicates: str = "warn",
+) -> dict:
+    """
+    Upsert de `df` dans `table` (créée si absente, clé primaire `key`) :
+    COPY par chunks de `chunk_rows` lignes dans `<table>_staging` (UNLOGGED,
+    sans index), puis INSERT ... ON CONFLICT vers la cible, le tout dans une
+    transaction. Le TRUNCATE du staging verrouille la table : deux chargements
+    simultanés de la même cible s'exécutent l'un après l'autre.
+    `duplicates` : traitement des clés répétées (cf. prepare_frame).
+    Retourne {"rows", "duplicates", "chunks", "seconds"}.
+    """
+    if fmt not in COPY_FORMATS:
+        raise ValueError(f"Format COPY inconnu : {fmt}")
+    start = time.perf_counter()
+    received = len(df)
+    df = prepare_frame(df, key, duplicates)
+    types = column_types(df)
+    staging = f"{table}_staging"
+    columns = ", ".join(_ident(c) for c in df.columns)
+    copy = f"COPY {_ident(staging)} ({columns}) FROM STDIN WITH (FORMAT {fmt})"
+
+    own = conn is None
+    conn = conn or get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(create_table_sql(table, types, key))
+            cur.execute(f"CREATE UNLOGGED TABLE IF NOT EXISTS {_ident(staging)} (LIKE {_ident(table)} INCLUDING DEFAULTS)")
+            cur.execute(f"TRUNCATE {_ident(staging)}")
+            chunks = 0
+            for first in range(0, len(df), chunk_rows):
+                chunk = df.iloc[first:first + chunk_rows]
+                buffer = copy_binary_buffer(chunk, types) if fmt == "binary" else copy_text_buffer(chunk)
+                cur.copy_expert(copy, buffer)
+                chunks += 1
+            cur.execute(upsert_sql(table, staging, df.columns, key))
+            cur.execute(f"TRUNCATE {_ident(staging)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own:
+            conn.close()
+    return {"rows": len(df), "duplicates": received - len(df), "chunks": chunks, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chargement des mesures nettoyées dans PostgreSQL (COPY + upsert)")
+    parser.add_argument("--input", default="transformed_measurements.csv", help="CSV produit par run_transform.py")
+    parser.add_argument("--table", default=TARGET_TABLE)
+    parser.add_argument("--dsn", default=None, help="Chaîne de connexion (défaut : DATABASE_URL)")
+    parser.add_argument("--format", choices=COPY_FORMATS, default="binary")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--duplicates", choices=DUPLICATE_POLICIES, default="warn", help="Clés unique_id répétées")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input)
+    conn = get_connection(args.dsn)
+    try:
+        summary = load_dataframe(df, args.table, conn=conn, chunk_rows=args.chunk_rows, fmt=args.format,
+                                  duplicates=args.duplicates)
+    finally:
+        conn.close()
+    print(f"✅ {summary['rows']:,} lignes chargées dans {args.table} ({summary['chunks']} chunks, {summary['seconds']}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,142 @@
 # data_cleaning.py
 import pandas as pd
 import numpy as np
+from typing import Dict, Mapping, Optional
+
+# Colonnes corrigées par imputation de la médiane (médianes collectées par QuantileSketches en streaming)
+IMPUTED_COLUMNS = ("wind_speed", "wind_speed_ms", "temperature")
+
+# Signaux surveillés par la détection glissante par turbine (colonnes présentes uniquement)
+ROLLING_SIGNALS = ("wind_speed_ms", "wind_speed_mps", "temperature", "temperature_k", "vibration_mm_s")
+
+# Seuils fixes : colonne -> (bas, haut, colonne d'anomalie)
+THRESHOLDS = {
+    "wind_speed": (None, 150, "wind_anomaly"),      # km/h
+    "wind_speed_ms": (None, 41.67, "wind_anomaly"),  # m/s
+    "temperature": (-80, 60, "temp_anomaly"),       # °C
+}
+ANOMALY_COLUMNS = ("wind_anomaly", "temp_anomaly")
 
 
 # ---------------------------------------------------------
 # 1. Détection d'anomalies (outliers)
 # ---------------------------------------------------------
 
-def detect_outliers(df: pd.DataFrame) -> pd.DataFrame:
+def _values(series: pd.Series) -> np.ndarray:
+    """Tableau NumPy de la colonne : vue sans copie pour les dtypes numériques natifs."""
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "fiu":
+        return series.to_numpy()
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def outlier_masks(values: Mapping[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """
+    Masques {colonne d'anomalie: bool[n]} des seuils THRESHOLDS, calculés en
+    une passe sur les tableaux `values` ({colonne: tableau}, colonnes
+    présentes uniquement). NaN n'est jamais anormal.
+    """
+    masks = {flag: np.zeros(n, dtype=bool) for flag in ANOMALY_COLUMNS}
+    with np.errstate(invalid="ignore"):
+        for column, (low, high, flag) in THRESHOLDS.items():
+            if column not in values:
+                continue
+            x = values[column]
+            masks[flag] |= x > high
+            if low is not None:
+                masks[flag] |= x < low
+    return masks
+
+
+def detect_outliers(df: pd.DataFrame, rolling_window: Optional[str] = None, **rolling_kwargs) -> pd.DataFrame:
     """
     Ajoute des colonnes 'wind_anomaly' et 'temp_anomaly'
-    pour repérer les valeurs aberrantes.
+    pour repérer les valeurs aberrantes (seuils THRESHOLDS).
+    `rolling_window` (ex: "1h") ajoute aussi la détection glissante par
+    turbine (cf. detect_rolling_outliers).
     """
+    values = {c: _values(df[c]) for c in THRESHOLDS if c in df.columns}
+    for flag, mask in outlier_masks(values, len(df)).items():
+        df[flag] = mask
 
-    # Création des colonnes par défaut
-    df["wind_anomaly"] = False
-    df["temp_anomaly"] = False
+    # si tu veux détecter plus (humidité, pression, etc.), je peux l’ajouter
 
-    # --- Détection anomalies vent ---
-    # km/h > 150
-    if "wind_speed" in df.columns:
-        df.loc[df["wind_speed"] > 150, "wind_anomaly"] = True
+    if rolling_window is not None:
+        df = detect_rolling_outliers(df, window=rolling_window, **rolling_kwargs)
 
-    # m/s > 41.67
-    if "wind_speed_ms" in df.columns:
-        df.loc[df["wind_speed_ms"] > 41.67, "wind_anomaly"] = True
+    return df
 
-    # --- Détection anomalies température ---
-    if "temperature" in df.columns:
-        df.loc[(df["temperature"] < -80) | (df["temperature"] > 60), "temp_anomaly"] = True
 
-    # si tu veux détecter plus (humidité, pression, etc.), je peux l’ajouter
+def detect_rolling_outliers(
+    df: pd.DataFrame,
+    columns=ROLLING_SIGNALS,
+    window: str = "1h",
+    method: str = "zscore",
+    threshold: float = 3.5,
+    by: str = "turbine_id",
+    time_column: str = "ts_utc",
+    min_periods: int = 10,
+) -> pd.DataFrame:
+    """
+    Détection glissante par turbine : ajoute '<signal>_anomaly' pour chaque
+    signal présent, vrai quand |x - centre| / échelle > threshold sur la
+    fenêtre temporelle `window` précédant la mesure, mesure exclue : incluse,
+    elle tirerait centre et échelle vers elle (z-score plafonné à
+    (n-1)/√n, jamais au-delà de 3.5 sur une fenêtre de moins de 14 points).
+
+    method="zscore" : moyenne / écart-type glissants (rapide).
+    method="mad"    : médiane / MAD glissantes (robuste, ~10x plus lent).
+
+    Les turbines sont mises bout à bout sur un axe temporel décalé (chaque
+    turbine au-delà de la fenêtre de la précédente) : un seul noyau rolling
+    pour toutes les turbines, sans boucle Python ni groupby.
+    """
+    columns = [c for c in columns if c in df.columns]
+    if not columns or time_column not in df.columns or len(df) == 0:
+        return df
+    if method not in ("zscore", "mad"):
+        raise ValueError(f"Méthode inconnue : {method}")
+
+    ts = df[time_column]
+    if not pd.api.types.is_datetime64_any_dtype(ts):
+        # Import local : le module reste exécutable seul (python data_cleaning.py)
+        from .date_normalization import parse_timestamps
+        ts = parse_timestamps(ts)
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    ts_ms = ts.to_numpy(dtype="datetime64[ms]")
+
+    valid = ~np.isnat(ts_ms)
+    rows = np.flatnonzero(valid)
+    times = ts_ms[valid].astype(np.int64)
+    if by in df.columns:
+        codes = pd.factorize(df[by].to_numpy()[valid])[0].astype(np.int64)
+    else:
+        codes = np.zeros(len(rows), dtype=np.int64)
 
+    window_ms = int(pd.Timedelta(window) / pd.Timedelta(milliseconds=1))
+    span = int(times.max() - times.min()) + window_ms + 1 if len(times) else 0
+    shifted = (times - (times.min() if len(times) else 0)) + codes * span
+    order = np.argsort(shifted, kind="stable")
+
+    frame = pd.DataFrame(
+        {c: df[c].to_numpy(dtype=np.float64, na_value=np.nan)[rows[order]] for c in columns},
+        index=pd.DatetimeIndex(shifted[order].astype("datetime64[ms]")),
+    )
+    rolling = frame.rolling(window, min_periods=min_periods, closed="left")
+    if method == "zscore":
+        center, scale = rolling.mean(), rolling.std()
+    else:
+        center = rolling.median()
+        # Écarts des mesures précédentes à leur propre centre (définis dès min_periods points)
+        scale = (frame - center).abs().rolling(window, min_periods=1, closed="left").median() * 1.4826
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flags = ((frame - center).abs() / scale).to_numpy() > threshold
+
+    for i, column in enumerate(columns):
+        out = np.zeros(len(df), dtype=bool)
+        out[rows[order]] = flags[:, i]
+        df[f"{column}_anomaly"] = out
     return df
 
 
@@ -39,34 +144,97 @@ def detect_outliers(df: pd.DataFrame) -> pd.DataFrame:
 # 2. Nettoyage & correction des anomalies
 # ---------------------------------------------------------
 
-def clean_data(df: pd.DataFrame, drop_anomalies: bool = False) -> pd.DataFrame:
+def _fill_value(column: str, x: np.ndarray, mask: np.ndarray, stats: Mapping[str, object], turbines):
     """
-    Corrige les valeurs aberrantes en remplaçant par la médiane.
-    Option : supprimer totalement les lignes anormales.
+    Valeur d'imputation de `column` : médiane de `stats` si fournie (valeur
+    globale, ou {turbine_id: médiane} -> tableau aligné sur les lignes
+    masquées), sinon médiane de la colonne (avant correction).
+    """
+    value = stats[column] if column in stats else None
+    if not isinstance(value, Mapping) and value is not None:
+        return value
+    median = float(np.nanmedian(x)) if x.dtype.kind == "f" else float(np.median(x))
+    if value is None:
+        return median
+    # Médiane par turbine ; turbine inconnue -> médiane de la colonne
+    codes, uniques = pd.factorize(turbines[mask])
+    per_turbine = pd.Series(uniques.astype(str)).map(value).fillna(median).to_numpy(dtype=np.float64)
+    return per_turbine[codes]
+
+
+def _fill_for(dtype, fill, n: int):
+    """
+    (dtype d'écriture, valeurs) pour une colonne de dtype `dtype` : les
+    médianes (float64) sont converties au dtype de la colonne — pandas refuse
+    un float64 dans du float32 ou dans une colonne nullable — et une colonne
+    entière passe en float (Float64 si nullable) quand une médiane est décimale.
     """
+    if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return dtype, fill
+    values = np.asarray(fill, dtype=np.float64)
+    if pd.api.types.is_integer_dtype(dtype) and not np.all(values == np.round(values)):
+        dtype = np.dtype(np.float64) if isinstance(dtype, np.dtype) else pd.Float64Dtype()
+    if isinstance(dtype, np.dtype):
+        return dtype, values.astype(dtype)
+    return dtype, pd.array(np.broadcast_to(values, (n,)), dtype=dtype)
 
-    # S'assurer que les colonnes d'anomalies existent
-    if "wind_anomaly" not in df.columns or "temp_anomaly" not in df.columns:
-        df = detect_outliers(df)
 
-    # --- Correction vent (km/h) ---
-    if "wind_speed" in df.columns and df["wind_anomaly"].any():
-        median_wind = df["wind_speed"].median()
-        df.loc[df["wind_anomaly"], "wind_speed"] = median_wind
+def clean_arrays(values: Mapping[str, np.ndarray], masks: Mapping[str, np.ndarray], stats, turbines=None):
+    """
+    Noyau de clean_data : {colonne: (positions, valeurs)} des corrections à
+    écrire, pour chaque colonne de `values` ayant au moins une anomalie
+    (valeurs aberrantes -> médiane). Ne modifie pas les tableaux d'entrée.
+    """
+    patches = {}
+    for column, x in values.items():
+        mask = masks[THRESHOLDS[column][2]]
+        rows = np.flatnonzero(mask)
+        if len(rows):
+            patches[column] = (rows, _fill_value(column, x, mask, stats, turbines))
+    return patches
+
+
+def clean_data(
+    df: pd.DataFrame,
+    drop_anomalies: bool = False,
+    stats: Optional[Dict[str, object]] = None,
+) -> pd.DataFrame:
+    """
+    Corrige les valeurs aberrantes en remplaçant par la médiane.
+    Option : supprimer totalement les lignes anormales.
+    `stats` : médianes déjà calculées ({colonne: médiane} ou
+    {colonne: {turbine_id: médiane}}, cf. QuantileSketches), utilisées à la
+    place des médianes du DataFrame (mode streaming par chunks).
+
+    Mutation : `df` est modifié en place (colonnes 'wind_anomaly' /
+    'temp_anomaly' ajoutées si absentes, seules les cellules aberrantes
+    réécrites) et retourné. Avec drop_anomalies, le résultat est une
+    nouvelle frame (une seule sélection des lignes saines, index 0..n-1).
+    """
+    stats = stats or {}
 
-    # --- Correction vent (m/s) ---
-    if "wind_speed_ms" in df.columns and df["wind_anomaly"].any():
-        median_wind_ms = df["wind_speed_ms"].median()
-        df.loc[df["wind_anomaly"], "wind_speed_ms"] = median_wind_ms
+    # Une passe : tableaux des colonnes contrôlées, masques, valeurs corrigées
+    values = {c: _values(df[c]) for c in THRESHOLDS if c in df.columns}
+    if all(flag in df.columns for flag in ANOMALY_COLUMNS):
+        masks = {flag: df[flag].to_numpy(dtype=bool, na_value=False) for flag in ANOMALY_COLUMNS}
+    else:
+        masks = outlier_masks(values, len(df))
+        for flag, mask in masks.items():
+            df[flag] = mask
 
-    # --- Correction température ---
-    if "temperature" in df.columns and df["temp_anomaly"].any():
-        median_temp = df["temperature"].median()
-        df.loc[df["temp_anomaly"], "temperature"] = median_temp
+    turbines = df["turbine_id"] if "turbine_id" in df.columns else None
+    for column, (rows, fill) in clean_arrays(values, masks, stats, turbines).items():
+        dtype, fill = _fill_for(df[column].dtype, fill, len(rows))
+        if dtype != df[column].dtype:
+            df[column] = df[column].astype(dtype)
+        df.iloc[rows, df.columns.get_loc(column)] = fill
 
     # --- Option : suppression lignes anormales ---
     if drop_anomalies:
-        df = df[(df["wind_anomaly"] == False) & (df["temp_anomaly"] == False)].reset_index(drop=True)
+        bad = masks["wind_anomaly"] | masks["temp_anomaly"]
+        if bad.any():
+            df = df.take(np.flatnonzero(~bad))
+        df = df.set_axis(pd.RangeIndex(len(df)), axis=0)
 
     return df
 
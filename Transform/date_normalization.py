@@ -1,49 +1,105 @@
-# test_date_normalization.py
+from datetime import datetime
+import numpy as np
 import pandas as pd
-import pytest
-from date_normalization import normalize_timestamp_column, normalize_dates
-
-def test_normalize_timestamp_column():
-    # Test avec des timestamps valides
-    df = pd.DataFrame({
-        "ts_utc": [
-            "2025-01-01T12:00:00Z",
-            "2025-01-01 15:30:00+00:00",
-            "2025-01-01T18:45:00+02:00"
-        ]
-    })
-    result = normalize_timestamp_column(df, "ts_utc")
-
-    # Vérifie que la colonne est bien formatée et convertie en Europe/Paris
-    assert all(isinstance(ts, str) for ts in result["ts_utc"])
-    assert all("+" in ts or ts.endswith("Z") for ts in result["ts_utc"])  # Format ISO avec offset
-    assert all(ts.endswith("0100") or ts.endswith("0200") for ts in result["ts_utc"])  # Offset Europe/Paris
-
-    # Test avec des timestamps invalides
-    df_with_invalid = pd.DataFrame({
-        "ts_utc": [
-            "2025-01-01T12:00:00Z",
-            "invalid date",
-            "2025-01-01 15:30:00+00:00"
-        ]
-    })
-    result_with_invalid = normalize_timestamp_column(df_with_invalid, "ts_utc")
-
-    # Vérifie que les timestamps invalides deviennent NaT (puis sont formatés en chaîne vide ou NaT)
-    assert pd.isna(pd.to_datetime(result_with_invalid["ts_utc"].iloc[1], errors="coerce"))
-
-def test_normalize_dates():
-    # Test que normalize_dates est un wrapper pour normalize_timestamp_column
-    df = pd.DataFrame({
-        "ts_utc": [
-            "2025-01-01T12:00:00Z",
-            "2025-01-01 15:30:00+00:00",
-            "invalid date"
-        ]
-    })
-    result = normalize_dates(df, "ts_utc")
-
-    # Vérifie que la colonne est bien formatée et convertie en Europe/Paris
-    assert all(isinstance(ts, str) for ts in result["ts_utc"])
-    assert all("+" in ts or ts.endswith("Z") for ts in result["ts_utc"])  # Format ISO avec offset
-    assert pd.isna(pd.to_datetime(result["ts_utc"].iloc[2], errors="coerce"))  # Timestamp invalide
+import pytz
+from typing import Dict, Optional
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+ISO_OUTPUT_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Formats ISO-8601 testés (dans l'ordre) pour une source homogène
+ISO_CANDIDATE_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M",
+)
+
+# source -> format détecté (None = formats mélangés, parsing ISO8601 générique)
+_format_cache: Dict[str, Optional[str]] = {}
+
+def guess_timestamp_format(values: pd.Series, source: Optional[str] = None, sample_size: int = 200) -> Optional[str]:
+    """
+    Détecte un format unique sur un échantillon de `values`.
+    Le résultat est mis en cache par `source` (table, fichier...) pour les lots suivants.
+    """
+    if source is not None and source in _format_cache:
+        return _format_cache[source]
+
+    sample = values.dropna()
+    sample = sample.iloc[:sample_size].astype(str)
+    fmt = None
+    if len(sample):
+        for candidate in ISO_CANDIDATE_FORMATS:
+            try:
+                pd.to_datetime(sample, format=candidate, utc=True)
+            except (ValueError, TypeError):
+                continue
+            fmt = candidate
+            break
+
+    if source is not None:
+        _format_cache[source] = fmt
+    return fmt
+
+def parse_timestamps(values: pd.Series, source: Optional[str] = None) -> pd.Series:
+    """Parse en datetime64[ns, UTC] ; les valeurs invalides deviennent NaT."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        series = values.dt.tz_localize("UTC") if values.dt.tz is None else values.dt.tz_convert("UTC")
+        return series.dt.as_unit("ns")
+
+    fmt = guess_timestamp_format(values, source=source)
+    series = pd.to_datetime(values, format=fmt or "ISO8601", errors="coerce", utc=True)
+    if fmt is not None:
+        # Lignes hors du format détecté : second essai avec le parseur ISO générique
+        missed = series.isna() & values.notna()
+        if missed.any():
+            series[missed] = pd.to_datetime(values[missed], format="ISO8601", errors="coerce", utc=True)
+    return series.dt.as_unit("ns")
+
+def format_timestamps(series: pd.Series, fmt: str = ISO_OUTPUT_FORMAT) -> pd.Series:
+    """
+    Formate une colonne datetime tz-aware en chaînes (à réserver à l'export).
+    Le format par défaut est construit sans strftime ligne à ligne ; NaT -> NaN.
+    """
+    if fmt != ISO_OUTPUT_FORMAT or series.dt.tz is None:
+        return series.dt.strftime(fmt)
+
+    local = series.dt.tz_localize(None).to_numpy(dtype="datetime64[s]")
+    offsets = (local - series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[s]")).astype(np.int64)
+    # Peu de décalages distincts (+0100 / +0200) : formatage une fois par valeur
+    labels = {}
+    for off in np.unique(offsets[~series.isna().to_numpy()]).tolist():
+        sign = "+" if off >= 0 else "-"
+        hours, minutes = divmod(abs(off) // 60, 60)
+        labels[off] = f"{sign}{hours:02d}{minutes:02d}"
+    text = pd.Series(np.datetime_as_string(local, unit="s"), index=series.index, dtype=object)
+    text = text + pd.Series(offsets, index=series.index).map(labels)
+    return text.where(series.notna(), np.nan)
+
+def normalize_timestamp_column(
+    df: pd.DataFrame,
+    column: str = "ts_utc",
+    as_string: bool = True,
+    source: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Convertit `column` en heure Europe/Paris.
+    as_string=False garde une colonne datetime64[ns, Europe/Paris] native
+    (beaucoup plus rapide ; formater avec format_timestamps à l'export).
+    """
+    series = parse_timestamps(df[column], source=source).dt.tz_convert(PARIS_TZ)
+    df[column] = format_timestamps(series) if as_string else series
+    return df
+
+def normalize_dates(
+    df: pd.DataFrame,
+    column: str = "ts_utc",
+    as_string: bool = True,
+    source: Optional[str] = None,
+) -> pd.DataFrame:
+    return normalize_timestamp_column(df, column=column, as_string=as_string, source=source)
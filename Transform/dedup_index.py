@@ -0,0 +1,200 @@
+# dedup_index.py
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Index persistant des unique_id déjà chargés : filtre de Bloom (rejette sans
+# lecture disque la plupart des nouveaux IDs) + tableaux triés d'empreintes
+# 64 bits (vérification exacte des candidats du filtre), tous mappés en mémoire.
+HASH_KEY = "energitech-dedup"  # 16 caractères : clé SipHash de hash_pandas_object
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_FP_RATE = 0.01
+MAX_SEGMENTS = 8
+META_FILE = "meta.json"
+BLOOM_FILE = "bloom.bin"
+
+
+def id_keys(ids) -> np.ndarray:
+    """Empreintes uint64 (SipHash) des identifiants."""
+    return pd.util.hash_pandas_object(pd.Series(ids), index=False, hash_key=HASH_KEY, categorize=False).to_numpy()
+
+
+def bloom_parameters(capacity: int, fp_rate: float):
+    """(bits, fonctions de hachage) optimaux pour `capacity` éléments au taux `fp_rate`."""
+    bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)))
+    bits = (bits + 7) // 8 * 8
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    """Second hash (finaliseur splitmix64), impair pour parcourir tout le filtre."""
+    z = keys + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (z ^ (z >> np.uint64(31))) | np.uint64(1)
+
+
+class DedupIndex:
+    """
+    Index de déduplication stocké dans `directory` :
+
+    - bloom.bin : filtre de Bloom de `bits` bits, k positions par double
+      hachage (h1 + i * h2) ;
+    - seg-*.npy : segments triés d'empreintes uint64, un par add(), fusionnés
+      en un seul au-delà de MAX_SEGMENTS (le filtre est alors reconstruit,
+      deux fois plus grand, si la capacité est dépassée) ;
+    - meta.json : paramètres et compteurs.
+
+    contains() ne consulte les segments que pour les candidats du filtre.
+    L'égalité est exacte sur l'empreinte 64 bits (collision improbable :
+    ~N² / 2^65 pour N identifiants).
+    """
+
+    def __init__(self, directory, capacity: int = DEFAULT_CAPACITY, fp_rate: float = DEFAULT_FP_RATE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path = self.directory / META_FILE
+        if meta_path.exists():
+            self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        else:
+            bits, hashes = bloom_parameters(capacity, fp_rate)
+            self.meta = {"capacity": capacity, "fp_rate": fp_rate, "bits": bits, "hashes": hashes,
+                         "count": 0, "segments": [], "next_segment": 0}
+            self._create_bloom(bits)
+            self._save_meta()
+        self._bloom = np.memmap(self.directory / BLOOM_FILE, dtype=np.uint8, mode="r+")
+        self._segments = [np.load(self.directory / name, mmap_mode="r") for name in self.meta["segments"]]
+        self.lookups = 0
+        self.false_positives = 0
+        self.known = 0
+
+    # --- Filtre de Bloom ---
+
+    def _create_bloom(self, bits: int) -> None:
+        tmp = self.directory / f"{BLOOM_FILE}.tmp"
+        np.memmap(tmp, dtype=np.uint8, mode="w+", shape=(bits // 8,)).flush()
+        os.replace(tmp, self.directory / BLOOM_FILE)
+
+    def _positions(self, keys: np.ndarray):
+        bits = np.uint64(self.meta["bits"])
+        h2 = _mix(keys)
+        for i in range(self.meta["hashes"]):
+            yield (keys + np.uint64(i) * h2) % bits
+
+    def _bloom_add(self, keys: np.ndarray) -> None:
+        for pos in self._positions(keys):
+            np.bitwise_or.at(self._bloom, pos >> np.uint64(3), (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+
+    def _bloom_contains(self, keys: np.ndarray) -> np.ndarray:
+        maybe = np.ones(len(keys), dtype=bool)
+        for pos in self._positions(keys):
+            byte = self._bloom[pos >> np.uint64(3)]
+            maybe &= ((byte >> (pos & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return maybe
+
+    # --- Appartenance et mise à jour ---
+
+    def _exact_contains(self, keys: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(keys), dtype=bool)
+        for segment in self._segments:
+            if len(segment) == 0:
+                continue
+            pos = np.minimum(np.searchsorted(segment, keys), len(segment) - 1)
+            found |= segment[pos] == keys
+        return found
+
+    def contains_keys(self, keys: np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.uint64)
+        maybe = self._bloom_contains(keys)
+        found = np.zeros(len(keys), dtype=bool)
+        found[maybe] = self._exact_contains(keys[maybe])
+        self.lookups += len(keys)
+        self.known += int(found.sum())
+        self.false_positives += int((maybe & ~found).sum())
+        return found
+
+    def contains(self, ids) -> np.ndarray:
+        """Masque booléen : True pour les identifiants déjà présents dans l'index."""
+        return self.contains_keys(id_keys(ids))
+
+    def add(self, ids) -> int:
+        """Ajoute les identifiants absents de l'index ; retourne le nombre ajouté."""
+        keys = np.unique(id_keys(ids))
+        keys = keys[~self._exact_contains(keys)] if self._segments else keys
+        if len(keys) == 0:
+            return 0
+        name = f"seg-{self.meta['next_segment']:06d}.npy"
+        self._write_segment(name, keys)
+        self.meta["segments"].append(name)
+        self.meta["next_segment"] += 1
+        self.meta["count"] += len(keys)
+        self._segments.append(np.load(self.directory / name, mmap_mode="r"))
+        self._bloom_add(keys)
+        self._bloom.flush()
+        if len(self._segments) > MAX_SEGMENTS:
+            self.compact()
+        self._save_meta()
+        return len(keys)
+
+    def compact(self) -> None:
+        """Fusionne les segments en un seul ; agrandit le filtre si la capacité est dépassée."""
+        merged = np.sort(np.concatenate([np.asarray(s) for s in self._segments]))
+        name = f"seg-{self.meta['next_segment']:06d}.npy"
+        self._write_segment(name, merged)
+        old = self.meta["segments"]
+        self.meta["segments"], self.meta["next_segment"] = [name], self.meta["next_segment"] + 1
+        self._segments = [np.load(self.directory / name, mmap_mode="r")]
+        if self.meta["count"] > self.meta["capacity"]:
+            self.meta["capacity"] = 2 * self.meta["count"]
+            self.meta["bits"], self.meta["hashes"] = bloom_parameters(self.meta["capacity"], self.meta["fp_rate"])
+            del self._bloom
+            self._create_bloom(self.meta["bits"])
+            self._bloom = np.memmap(self.directory / BLOOM_FILE, dtype=np.uint8, mode="r+")
+            self._bloom_add(merged)
+            self._bloom.flush()
+        self._save_meta()
+        for stale in old:
+            (self.directory / stale).unlink(missing_ok=True)
+
+    def _write_segment(self, name: str, keys: np.ndarray) -> None:
+        tmp = self.directory / f"{name}.tmp.npy"
+        np.save(tmp, np.sort(keys))
+        os.replace(tmp, self.directory / name)
+
+    def _save_meta(self) -> None:
+        tmp = self.directory / f"{META_FILE}.tmp"
+        tmp.write_text(json.dumps(self.meta), encoding="utf-8")
+        os.replace(tmp, self.directory / META_FILE)
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    def stats(self) -> dict:
+        """Taille, taux de faux positifs (théorique et mesuré) et mémoire par million d'IDs."""
+        count, bits, hashes = self.meta["count"], self.meta["bits"], self.meta["hashes"]
+        negatives = self.lookups - self.known
+        bloom_bytes, exact_bytes = bits // 8, 8 * count
+        return {
+            "count": count,
+            "segments": len(self._segments),
+            "bloom_bytes": bloom_bytes,
+            "exact_bytes": exact_bytes,
+            "bytes_per_million": round((bloom_bytes + exact_bytes) / count * 1e6) if count else None,
+            "expected_fp_rate": (1 - math.exp(-hashes * count / bits)) ** hashes,
+            "measured_fp_rate": self.false_positives / negatives if negatives else None,
+        }
+
+
+def drop_known(df: pd.DataFrame, index: DedupIndex, column: str = "unique_id") -> pd.DataFrame:
+    """Retire les lignes dont l'identifiant est déjà dans l'index (déjà chargées)."""
+    if len(df) == 0 or column not in df.columns:
+        return df
+    known = index.contains(df[column])
+    if not known.any():
+        return df
+    print(f"♻️ {int(known.sum())} lignes déjà chargées ignorées")
+    return df[~known]
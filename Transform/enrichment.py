@@ -1,94 +1,122 @@
-# test_enrichment.py
 import pandas as pd
-import pytest
-from enrichment import (
-    normalize_wind_direction,
-    generate_unique_id,
-    add_turbine_id,
-    enrich_dataframe,
-    enrich_data,
-    WIND_DIRECTIONS,
-)
-
-def test_normalize_wind_direction():
-    # Test avec des directions connues
-    assert normalize_wind_direction("N") == "North"
-    assert normalize_wind_direction("S") == "South"
-    assert normalize_wind_direction("NE") == "Northeast"
-    assert normalize_wind_direction("SW") == "Southwest"
-
-    # Test avec des directions en minuscules
-    assert normalize_wind_direction("ne") == "Northeast"
-    assert normalize_wind_direction(" s ") == "South"
-
-    # Test avec une direction inconnue
-    assert normalize_wind_direction("XYZ") == "XYZ"
-
-    # Test avec une valeur nulle
-    assert normalize_wind_direction(None) is None
-    assert pd.isna(normalize_wind_direction(pd.NA))
-
-def test_generate_unique_id():
-    # Test avec un dictionnaire contenant les clés attendues
-    row = {"ts_utc": "2025-01-01T12:00:00Z", "station_id": 1}
-    unique_id = generate_unique_id(row)
-    assert len(unique_id) == 32  # MD5 produit un hash de 32 caractères
-
-    # Test avec une clé manquante
-    row_missing = {"ts_utc": "2025-01-01T12:00:00Z"}
-    unique_id_missing = generate_unique_id(row_missing)
-    assert len(unique_id_missing) == 32
-
-def test_add_turbine_id():
-    # Test avec un DataFrame contenant 'station_id'
-    df = pd.DataFrame({"station_id": [1, 2, 3]})
-    result = add_turbine_id(df)
-    assert "turbine_id" in result.columns
-    assert result["turbine_id"].tolist() == [1, 2, 3]
-
-    # Test avec un DataFrame sans 'station_id'
-    df_no_id = pd.DataFrame({"other_col": [1, 2, 3]})
-    result_no_id = add_turbine_id(df_no_id)
-    assert "turbine_id" in result_no_id.columns
-    assert result_no_id["turbine_id"].tolist() == [1, 2, 3]  # fallback
-
-def test_enrich_dataframe():
-    # Test avec un DataFrame contenant toutes les colonnes attendues
-    df = pd.DataFrame({
-        "ts_utc": ["2025-01-01T12:00:00Z", "2025-01-01T14:00:00Z"],
-        "station_id": [1, 2],
-        "wind_direction": ["NE", "s"]
-    })
-    result = enrich_dataframe(df)
-    assert "wind_direction_full" in result.columns
-    assert "turbine_id" in result.columns
-    assert "unique_id" in result.columns
-    assert result["wind_direction_full"].tolist() == ["Northeast", "South"]
-    assert result["turbine_id"].tolist() == [1, 2]
-    assert len(result["unique_id"].iloc[0]) == 32
-
-    # Test avec un DataFrame contenant des valeurs nulles
-    df_with_nan = pd.DataFrame({
-        "ts_utc": ["2025-01-01T12:00:00Z", None],
-        "station_id": [1, None],
-        "wind_direction": ["NE", None]
-    })
-    result_with_nan = enrich_dataframe(df_with_nan)
-    assert pd.isna(result_with_nan["wind_direction_full"].iloc[1])
-    assert result_with_nan["turbine_id"].tolist() == [1, 2]  # fallback
-    assert len(result_with_nan["unique_id"].iloc[0]) == 32
-
-def test_enrich_data():
-    # Test que la fonction enrich_data est un wrapper pour enrich_dataframe
-    df = pd.DataFrame({
-        "ts_utc": ["2025-01-01T12:00:00Z", "2025-01-01T14:00:00Z"],
-        "station_id": [1, 2],
-        "wind_direction": ["NE", "s"]
-    })
-    result = enrich_data(df)
-    assert "wind_direction_full" in result.columns
-    assert "turbine_id" in result.columns
-    assert "unique_id" in result.columns
-    assert result["wind_direction_full"].tolist() == ["Northeast", "South"]
-    assert result["turbine_id"].tolist() == [1, 2]
-    assert len(result["unique_id"].iloc[0]) == 32
+import numpy as np
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .date_normalization import ISO_OUTPUT_FORMAT, format_timestamps
+
+WIND_DIRECTIONS = {
+    "N": "North",
+    "S": "South",
+    "E": "East",
+    "W": "West",
+    "NE": "Northeast",
+    "NW": "Northwest",
+    "SE": "Southeast",
+    "SW": "Southwest",
+}
+
+def normalize_wind_direction(direction):
+    if pd.isnull(direction):
+        return None
+    direction = str(direction).upper().strip()
+    return WIND_DIRECTIONS.get(direction, direction)
+
+def _ts_key(ts):
+    # Un ts_utc datetime donne le même ID que sa forme texte normalisée
+    if ts is pd.NaT:
+        return np.nan
+    if isinstance(ts, pd.Timestamp):
+        return ts.strftime(ISO_OUTPUT_FORMAT)
+    return ts
+
+# Colonnes identifiant la source d'une mesure, par priorité : station_id
+# (flux météo historiques), sinon turbine_id (flux raw_measurements, sans
+# station_id : plusieurs turbines partagent chaque horodatage)
+SOURCE_ID_COLUMNS = ("station_id", "turbine_id")
+
+def _source_column(columns) -> str:
+    return next((c for c in SOURCE_ID_COLUMNS if c in columns), SOURCE_ID_COLUMNS[0])
+
+def generate_unique_id(row):
+    base = f"{_ts_key(row.get('ts_utc', ''))}-{row.get(_source_column(row.keys()), '')}"
+    return hashlib.md5(base.encode()).hexdigest()
+
+def _column_values(df: pd.DataFrame, column: str) -> list:
+    # Même convention que row.get(column, '') : colonne absente -> chaîne vide
+    if column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            return format_timestamps(df[column]).tolist()
+        return df[column].tolist()
+    return [""] * len(df)
+
+def _md5_slices(buffer: memoryview, starts: np.ndarray, ends: np.ndarray) -> List[str]:
+    md5 = hashlib.md5
+    return [md5(buffer[a:b]).hexdigest() for a, b in zip(starts.tolist(), ends.tolist())]
+
+def generate_unique_ids(df: pd.DataFrame, workers: Optional[int] = None, source: Optional[str] = None) -> pd.Series:
+    """
+    Version colonne de generate_unique_id : mêmes identifiants, sans df.apply.
+    `source` : colonne identifiant la source (défaut : station_id, sinon turbine_id).
+
+    Les clés 'ts_utc-station_id' sont concaténées dans un seul buffer encodé
+    une fois, puis chaque tranche est hachée en MD5 sans copie. `workers`
+    découpe le hachage sur un pool de threads (hashlib ne relâche le GIL
+    qu'au-delà de 2 Ko par appel, le gain reste donc limité sur des clés courtes).
+    """
+    n = len(df)
+    if n == 0:
+        return pd.Series([], index=df.index, dtype=object)
+
+    source = source or _source_column(df.columns)
+    keys = [f"{ts}-{sid}" for ts, sid in zip(_column_values(df, "ts_utc"), _column_values(df, source))]
+    joined = "".join(keys)
+    if not joined.isascii():
+        # Longueurs en caractères != longueurs en octets : repli élément par élément
+        md5 = hashlib.md5
+        return pd.Series([md5(k.encode()).hexdigest() for k in keys], index=df.index, dtype=object)
+
+    buffer = memoryview(joined.encode("ascii"))
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=n)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    if not workers or workers <= 1:
+        ids = _md5_slices(buffer, starts, ends)
+    else:
+        bounds = np.linspace(0, n, workers + 1, dtype=np.int64)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(
+                lambda k: _md5_slices(buffer, starts[bounds[k]:bounds[k + 1]], ends[bounds[k]:bounds[k + 1]]),
+                range(workers),
+            )
+            ids = [uid for part in parts for uid in part]
+    return pd.Series(ids, index=df.index, dtype=object)
+
+def add_turbine_id(df: pd.DataFrame) -> pd.DataFrame:
+    fallback = pd.Series(df.index + 1, index=df.index)
+    if "station_id" in df.columns:
+        df["turbine_id"] = df["station_id"].fillna(fallback)
+    elif "turbine_id" in df.columns:
+        # Flux raw_measurements : turbine_id déjà fourni (T001, T002...), category selon le schéma
+        ids = df["turbine_id"]
+        if ids.hasnans:
+            if isinstance(ids.dtype, pd.CategoricalDtype):
+                ids = ids.cat.add_categories(pd.Index(fallback[ids.isna()]).difference(ids.cat.categories))
+            df["turbine_id"] = ids.fillna(fallback)
+    else:
+        df["turbine_id"] = fallback
+    return df
+
+def enrich_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    if "wind_direction" in df.columns:
+        df["wind_direction_full"] = df["wind_direction"].apply(normalize_wind_direction)
+    # Source choisie avant add_turbine_id : un turbine_id de repli (numéro de ligne) n'identifie rien
+    source = _source_column(df.columns)
+    df = add_turbine_id(df)
+    df["unique_id"] = generate_unique_ids(df, source=source)
+    return df
+
+def enrich_data(df: pd.DataFrame) -> pd.DataFrame:
+    return enrich_dataframe(df)
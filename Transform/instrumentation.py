@@ -0,0 +1,176 @@
+# instrumentation.py
+import cProfile
+import json
+import logging
+import os
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger("energitech.pipeline")
+
+# Métriques exportées au format textfile Prometheus (node_exporter) : (nom, champ, aide)
+PROMETHEUS_METRICS = [
+    ("energitech_stage_duration_seconds", "duration_s", "Durée cumulée de l'étape"),
+    ("energitech_stage_calls_total", "calls", "Nombre d'appels de l'étape (chunks en streaming)"),
+    ("energitech_stage_rows_in_total", "rows_in", "Lignes en entrée de l'étape"),
+    ("energitech_stage_rows_out_total", "rows_out", "Lignes en sortie de l'étape"),
+    ("energitech_stage_memory_delta_bytes", "memory_delta_bytes", "Variation de RSS pendant l'étape"),
+    ("energitech_stage_bytes_read_total", "bytes_read", "Octets lus par l'étape"),
+]
+
+
+# Valeur retournée par next() sur un itérateur épuisé dans track_iter (appel non compté)
+_EXHAUSTED = object()
+
+
+def current_rss() -> Optional[int]:
+    """RSS courante du processus en octets (Linux, /proc), None si indisponible."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _rows(value) -> Optional[int]:
+    return len(value) if isinstance(value, pd.DataFrame) else None
+
+
+class PipelineInstrumentation:
+    """
+    Mesure chaque étape du pipeline : durée, lignes en entrée / sortie,
+    variation de mémoire (RSS) et octets lus.
+
+    Chaque appel produit une ligne JSON (logger "energitech.pipeline" et
+    `log_path` si fourni) ; les totaux par étape sont exportés à la fin
+    (finish) en textfile Prometheus si `prometheus_path` est fourni.
+    `profile_dir` active cProfile + tracemalloc : un `<étape>.prof` et un
+    `<étape>.tracemalloc.txt` par étape (cumulés sur les chunks). Une trace
+    tracemalloc déjà active (ex: benchmarks.suite) est réutilisée et laissée
+    active : le snapshot inclut alors les allocations antérieures et le pic
+    par étape n'est pas mesuré.
+    """
+
+    def __init__(self, log_path=None, prometheus_path=None, profile_dir=None, run_id: Optional[str] = None):
+        self.log_path = Path(log_path) if log_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._started = time.time()
+        if self.profile_dir:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def track(self, name: str, fn: Callable, *args, bytes_read: Optional[int] = None, **kwargs):
+        """
+        Exécute fn(*args, **kwargs) comme étape `name` et retourne son résultat.
+        Sans `bytes_read`, un DataFrame résultat peut le porter dans
+        attrs["bytes_read"] (retiré au passage).
+        """
+        rows_in = _rows(args[0]) if args else None
+        rss_before = current_rss()
+        profile = self._profiles.setdefault(name, cProfile.Profile()) if self.profile_dir else None
+        own_trace = profile is not None and not tracemalloc.is_tracing()
+        if own_trace:
+            tracemalloc.start()
+        if profile is not None:
+            profile.enable()
+        status, error, result = "ok", None, None
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            # KeyboardInterrupt / SystemExit compris : étape enregistrée en erreur, exception propagée
+            status, error, result = "error", repr(exc), None
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            peak = None
+            if profile is not None:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot()
+                if own_trace:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                self._dump_profile(name, profile, snapshot)
+            # Lecture qui épuise l'itérateur (track_iter) : pas un appel de l'étape
+            if result is not _EXHAUSTED:
+                rss_after = current_rss()
+                if bytes_read is None and isinstance(result, pd.DataFrame):
+                    bytes_read = result.attrs.pop("bytes_read", None)
+                self._record(name, {
+                    "duration_s": round(duration, 6),
+                    "rows_in": rows_in,
+                    "rows_out": _rows(result),
+                    "memory_delta_bytes": rss_after - rss_before if rss_after is not None and rss_before is not None else None,
+                    "rss_bytes": rss_after,
+                    "bytes_read": bytes_read,
+                    "tracemalloc_peak_bytes": peak,
+                    "status": status,
+                    "error": error,
+                })
+        return result
+
+    def track_iter(self, name: str, iterable):
+        """
+        Itère sur `iterable` en mesurant chaque lecture comme un appel de
+        l'étape `name` ; la lecture finale qui épuise l'itérateur n'est pas comptée.
+        """
+        iterator = iter(iterable)
+        while True:
+            item = self.track(name, next, iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item
+
+    def _record(self, name: str, record: Dict[str, Any]) -> None:
+        totals = self.stages.setdefault(name, {"calls": 0})
+        totals["calls"] += 1
+        for field in ("duration_s", "rows_in", "rows_out", "memory_delta_bytes", "bytes_read"):
+            if record[field] is not None:
+                totals[field] = totals.get(field, 0) + record[field]
+        self._emit({"event": "stage", "stage": name, "call": totals["calls"], **record})
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        line = json.dumps({"run_id": self.run_id, "ts": round(time.time(), 3), **record}, ensure_ascii=False)
+        logger.info(line)
+        if self.log_path:
+            with self.log_path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+    def _dump_profile(self, name: str, profile: cProfile.Profile, snapshot) -> None:
+        profile.dump_stats(str(self.profile_dir / f"{name}.prof"))
+        top = snapshot.statistics("lineno")[:25]
+        (self.profile_dir / f"{name}.tracemalloc.txt").write_text("\n".join(str(s) for s in top), encoding="utf-8")
+
+    def finish(self) -> Dict[str, Dict[str, Any]]:
+        """Émet le résumé du run, écrit le textfile Prometheus et retourne les totaux par étape."""
+        self._emit({"event": "run", "duration_s": round(time.time() - self._started, 3), "stages": self.stages})
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+        return self.stages
+
+    def write_prometheus(self, path) -> None:
+        """Textfile Prometheus, écrit puis renommé pour ne jamais être lu à moitié."""
+        lines = []
+        for metric, field, help_text in PROMETHEUS_METRICS:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for stage, totals in self.stages.items():
+                if totals.get(field) is not None:
+                    lines.append(f'{metric}{{stage="{stage}"}} {totals[field]}')
+        lines += [
+            "# HELP energitech_pipeline_last_run_timestamp_seconds Fin du dernier run",
+            "# TYPE energitech_pipeline_last_run_timestamp_seconds gauge",
+            f"energitech_pipeline_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
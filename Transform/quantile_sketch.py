@@ -0,0 +1,230 @@
+# quantile_sketch.py
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from Transform.data_cleaning import IMPUTED_COLUMNS
+
+# Tampon des digests par turbine : des centaines de turbines x colonnes, chacune
+# avec le tampon de 50 000 valeurs d'un digest global, dépasseraient la
+# mémoire bornée du mode streaming (~2 000 valeurs, soit ~16 Ko par digest)
+TURBINE_BUFFER_SIZE = 2_000
+
+
+# ---------------------------------------------------------
+# 1. t-digest fusionnable (quantiles approchés, mémoire bornée)
+# ---------------------------------------------------------
+
+class TDigest:
+    """
+    Résumé de distribution à ~compression/2 centroïdes.
+    Fusionnable (merge) et sérialisable (to_dict/from_dict) ; l'erreur sur
+    les quantiles est la plus faible aux extrémités et autour de la médiane
+    reste de l'ordre de 1/compression en rang.
+    """
+
+    def __init__(self, compression: int = 200, buffer_size: int = 50_000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return float(self._weights.sum())
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._flush()
+
+    def merge(self, other: "TDigest") -> None:
+        other._flush()
+        if not len(other._means):
+            return
+        self._flush()
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self._means, other._means]), np.concatenate([self._weights, other._weights]))
+
+    def quantile(self, q: float) -> float:
+        self._flush()
+        if not len(self._means):
+            return float("nan")
+        total = self._weights.sum()
+        centers = np.cumsum(self._weights) - self._weights / 2
+        xp = np.concatenate([[0.0], centers, [total]])
+        fp = np.concatenate([[self.min], self._means, [self.max]])
+        return float(np.interp(q * total, xp, fp))
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        values = np.concatenate(self._buffer)
+        self._buffer, self._buffered = [], 0
+        self._compress(np.concatenate([self._means, values]), np.concatenate([self._weights, np.ones(len(values))]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2) / cum[-1]
+        # Fonction d'échelle k1 : centroïdes étroits aux extrémités, larges au centre
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        group_weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / group_weights
+        self._weights = group_weights
+
+    def to_dict(self) -> dict:
+        self._flush()
+        return {
+            "compression": self.compression,
+            "min": self.min if np.isfinite(self.min) else None,
+            "max": self.max if np.isfinite(self.max) else None,
+            "means": self._means.tolist(),
+            "weights": self._weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, buffer_size: int = 50_000) -> "TDigest":
+        digest = cls(compression=data["compression"], buffer_size=buffer_size)
+        digest._means = np.asarray(data["means"], dtype=np.float64)
+        digest._weights = np.asarray(data["weights"], dtype=np.float64)
+        digest.min = data["min"] if data["min"] is not None else np.inf
+        digest.max = data["max"] if data["max"] is not None else -np.inf
+        return digest
+
+
+# ---------------------------------------------------------
+# 2. Sketches par colonne et par turbine pour clean_data
+# ---------------------------------------------------------
+
+class QuantileSketches:
+    """
+    Un TDigest par colonne (global) et, si `per_turbine`, par (colonne,
+    turbine_id) avec un tampon réduit (TURBINE_BUFFER_SIZE).
+    Accumulateur de clean_data (update / merge / result) en mode streaming
+    ou parallèle, fusionnable d'un chunk ou d'un worker à l'autre, et
+    persistable entre deux exécutions (save / load).
+    """
+
+    def __init__(
+        self,
+        columns: Iterable[str] = IMPUTED_COLUMNS,
+        by: str = "turbine_id",
+        per_turbine: bool = False,
+        compression: int = 200,
+    ):
+        self.columns = tuple(columns)
+        self.by = by
+        self.per_turbine = per_turbine
+        self.compression = compression
+        self.global_: Dict[str, TDigest] = {}
+        self.groups: Dict[str, Dict[str, TDigest]] = {}
+
+    def _digest(self, column: str, group: Optional[str] = None) -> TDigest:
+        if group is None:
+            return self.global_.setdefault(column, TDigest(self.compression))
+        groups = self.groups.setdefault(column, {})
+        if group not in groups:
+            groups[group] = TDigest(self.compression, buffer_size=TURBINE_BUFFER_SIZE)
+        return groups[group]
+
+    def update(self, df: pd.DataFrame) -> None:
+        keys = None
+        if self.per_turbine and self.by in df.columns:
+            codes, uniques = pd.factorize(df[self.by].astype(str), sort=False)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            keys = (uniques, order, bounds)
+
+        for column in self.columns:
+            if column not in df.columns:
+                continue
+            values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            self._digest(column).update(values)
+            if keys is not None:
+                uniques, order, bounds = keys
+                sorted_values = values[order]
+                for i, group in enumerate(uniques):
+                    self._digest(column, group).update(sorted_values[bounds[i]:bounds[i + 1]])
+
+    def merge(self, other: "QuantileSketches") -> None:
+        for column, digest in other.global_.items():
+            self._digest(column).merge(digest)
+        for column, groups in other.groups.items():
+            for group, digest in groups.items():
+                self._digest(column, group).merge(digest)
+
+    def median(self, column: str, turbine_id=None) -> float:
+        if turbine_id is not None and str(turbine_id) in self.groups.get(column, {}):
+            return self.groups[column][str(turbine_id)].median()
+        if column in self.global_:
+            return self.global_[column].median()
+        return float("nan")
+
+    def result(self) -> Dict[str, object]:
+        """
+        Statistiques pour clean_data(stats=...) : médiane globale par colonne,
+        ou {turbine_id: médiane} par colonne si per_turbine=True.
+        """
+        stats = {}
+        for column, digest in self.global_.items():
+            if digest.count == 0:
+                continue
+            if self.per_turbine and column in self.groups:
+                stats[column] = {group: d.median() for group, d in self.groups[column].items() if d.count}
+            else:
+                stats[column] = digest.median()
+        return stats
+
+    def to_dict(self) -> dict:
+        return {
+            "columns": list(self.columns),
+            "by": self.by,
+            "compression": self.compression,
+            "global": {column: d.to_dict() for column, d in self.global_.items()},
+            "groups": {
+                column: {group: d.to_dict() for group, d in groups.items()}
+                for column, groups in self.groups.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, per_turbine: bool = False) -> "QuantileSketches":
+        sketches = cls(columns=data["columns"], by=data["by"], per_turbine=per_turbine, compression=data["compression"])
+        sketches.global_ = {column: TDigest.from_dict(d) for column, d in data["global"].items()}
+        sketches.groups = {
+            column: {group: TDigest.from_dict(d, TURBINE_BUFFER_SIZE) for group, d in groups.items()}
+            for column, groups in data["groups"].items()
+        }
+        return sketches
+
+    def save(self, path) -> str:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        return str(path)
+
+    @classmethod
+    def load(cls, path, per_turbine: bool = False) -> "QuantileSketches":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")), per_turbine=per_turbine)
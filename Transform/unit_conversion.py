@@ -1,59 +1,153 @@
-# test_unit_conversion.py
+import numpy as np
 import pandas as pd
-import pytest
-from unit_conversion import celsius_to_kelvin, kmh_to_ms, normalize_units, convert_units
-
-def test_celsius_to_kelvin():
-    # Test avec des valeurs normales
-    assert celsius_to_kelvin(20) == 293.15
-    assert celsius_to_kelvin(0) == 273.15
-    assert celsius_to_kelvin(-10) == 263.15
-
-    # Test avec une valeur nulle (NaN)
-    assert celsius_to_kelvin(None) is None
-    assert celsius_to_kelvin(pd.NA) is None
-    assert pd.isna(celsius_to_kelvin(pd.NA))
-
-def test_kmh_to_ms():
-    # Test avec des valeurs normales
-    assert kmh_to_ms(36) == 10.0
-    assert kmh_to_ms(10) == pytest.approx(2.777777778)
-    assert kmh_to_ms(90) == 25.0
-
-    # Test avec une valeur nulle (NaN)
-    assert kmh_to_ms(None) is None
-    assert kmh_to_ms(pd.NA) is None
-    assert pd.isna(kmh_to_ms(pd.NA))
-
-def test_normalize_units():
-    # Test avec un DataFrame contenant des valeurs normales
-    df = pd.DataFrame({
-        "temperature": [20, 0, -10],
-        "wind_speed": [36, 10, 90]
-    })
-    result = normalize_units(df)
-    assert "temperature_K" in result.columns
-    assert "wind_speed_ms" in result.columns
-    assert result["temperature_K"].tolist() == [293.15, 273.15, 263.15]
-    assert result["wind_speed_ms"].tolist() == [10.0, pytest.approx(2.777777778), 25.0]
-
-    # Test avec un DataFrame contenant des valeurs nulles
-    df_with_nan = pd.DataFrame({
-        "temperature": [20, None, -10],
-        "wind_speed": [36, pd.NA, 90]
-    })
-    result_with_nan = normalize_units(df_with_nan)
-    assert pd.isna(result_with_nan["temperature_K"].iloc[1])
-    assert pd.isna(result_with_nan["wind_speed_ms"].iloc[1])
-
-def test_convert_units():
-    # Test que la fonction convert_units est un wrapper pour normalize_units
-    df = pd.DataFrame({
-        "temperature": [20, 0, -10],
-        "wind_speed": [36, 10, 90]
-    })
-    result = convert_units(df)
-    assert "temperature_K" in result.columns
-    assert "wind_speed_ms" in result.columns
-    assert result["temperature_K"].tolist() == [293.15, 273.15, 263.15]
-    assert result["wind_speed_ms"].tolist() == [10.0, pytest.approx(2.777777778), 25.0]
+from typing import Dict, Optional, Tuple
+
+def celsius_to_kelvin(c):
+    return c + 273.15 if pd.notnull(c) else None
+
+def kmh_to_ms(v):
+    return v / 3.6 if pd.notnull(v) else None
+
+# ---------------------------------------------------------
+# Registre des conversions colonne par colonne
+# ---------------------------------------------------------
+
+# Grandeur physique de chaque unité connue
+UNITS = {
+    "K": "temperature",
+    "degC": "temperature",
+    "degF": "temperature",
+    "m/s": "speed",
+    "km/h": "speed",
+    "kn": "speed",
+    "kWh": "energy",
+    "MWh": "energy",
+}
+
+# Unité cible du pipeline par grandeur
+TARGET_UNITS = {"temperature": "K", "speed": "m/s", "energy": "kWh"}
+
+# Suffixe donné à la colonne produite selon son unité
+UNIT_SUFFIXES = {
+    "K": "_K",
+    "degC": "_c",
+    "degF": "_f",
+    "m/s": "_ms",
+    "km/h": "_kmh",
+    "kn": "_kn",
+    "kWh": "_kwh",
+    "MWh": "_mwh",
+}
+
+# Suffixes de colonnes reconnus (insensibles à la casse) -> unité source
+SUFFIX_UNITS = {
+    "k": "K",
+    "c": "degC",
+    "f": "degF",
+    "mps": "m/s",
+    "ms": "m/s",
+    "kmh": "km/h",
+    "kn": "kn",
+    "kwh": "kWh",
+    "mwh": "MWh",
+}
+
+# Colonnes historiques sans suffixe : unité implicite
+DEFAULT_SOURCE_UNITS = {"temperature": "degC", "wind_speed": "km/h"}
+
+# (source, cible) -> suite d'étapes (ufunc, constante) appliquées dans le même buffer
+CONVERSIONS: Dict[Tuple[str, str], Tuple[Tuple[np.ufunc, float], ...]] = {}
+
+def register_conversion(src: str, dst: str, *steps: Tuple[np.ufunc, float]) -> None:
+    CONVERSIONS[(src, dst)] = tuple(steps)
+
+register_conversion("degC", "K", (np.add, 273.15))
+register_conversion("K", "degC", (np.subtract, 273.15))
+register_conversion("degF", "K", (np.subtract, 32.0), (np.multiply, 5.0 / 9.0), (np.add, 273.15))
+register_conversion("km/h", "m/s", (np.divide, 3.6))
+register_conversion("m/s", "km/h", (np.multiply, 3.6))
+register_conversion("kn", "m/s", (np.multiply, 1852.0 / 3600.0))
+register_conversion("MWh", "kWh", (np.multiply, 1000.0))
+register_conversion("kWh", "MWh", (np.divide, 1000.0))
+
+def detect_unit(column: str) -> Optional[str]:
+    """Unité source déduite du nom de colonne (suffixe '_k', '_mps', ...), sinon None."""
+    if column in DEFAULT_SOURCE_UNITS:
+        return DEFAULT_SOURCE_UNITS[column]
+    if "_" not in column:
+        return None
+    return SUFFIX_UNITS.get(column.rsplit("_", 1)[1].lower())
+
+def _base_name(column: str) -> str:
+    if column in DEFAULT_SOURCE_UNITS:
+        return column
+    return column.rsplit("_", 1)[0]
+
+def _as_float_array(values, dtype) -> np.ndarray:
+    # pd.NA / None -> NaN ; pas de copie si la colonne est déjà du bon dtype
+    if isinstance(values, pd.Series):
+        if values.dtype == dtype:
+            return values.to_numpy()
+        return values.to_numpy(dtype=dtype, na_value=np.nan)
+    return np.asarray(values, dtype=dtype)
+
+def convert_array(values, src: str, dst: str, out: Optional[np.ndarray] = None, dtype=np.float64) -> np.ndarray:
+    """
+    Convertit `values` de `src` vers `dst` en une passe de ufuncs NumPy.
+    `out` permet de réutiliser un buffer (y compris `values` lui-même) ;
+    les valeurs manquantes restent NaN.
+    """
+    if (src, dst) not in CONVERSIONS and src != dst:
+        raise KeyError(f"Conversion non supportée : {src} -> {dst}")
+    arr = _as_float_array(values, out.dtype if out is not None else dtype)
+    steps = CONVERSIONS.get((src, dst), ())
+    if out is None:
+        if not steps:
+            return arr.copy()
+        out = np.empty_like(arr)
+    elif not steps:
+        np.copyto(out, arr)
+        return out
+    first_ufunc, first_const = steps[0]
+    first_ufunc(arr, first_const, out=out)
+    for ufunc, const in steps[1:]:
+        ufunc(out, const, out=out)
+    return out
+
+def _output_dtype(values: pd.Series):
+    # Une mesure float32 (schéma Extract.schema) reste en float32 ; le reste en float64
+    return np.float32 if values.dtype == np.float32 else np.float64
+
+def convert_columns(df: pd.DataFrame, targets: Optional[Dict[str, str]] = None, dtype=None) -> pd.DataFrame:
+    """
+    Convertit plusieurs colonnes en un seul passage chacune.
+    `targets` : {colonne source: unité cible} ; par défaut, toutes les colonnes
+    dont l'unité est détectée sont ramenées à TARGET_UNITS. La colonne produite
+    prend le suffixe de l'unité cible (ex: temperature_c -> temperature_K).
+    `dtype` : type des colonnes produites ; par défaut celui de la source
+    si elle est en float32, sinon float64.
+    """
+    if targets is None:
+        targets = {}
+        for column in df.columns:
+            src = detect_unit(str(column))
+            numeric = pd.api.types.is_numeric_dtype(df[column]) or df[column].dtype == object
+            if src is not None and numeric:
+                targets[column] = TARGET_UNITS[UNITS[src]]
+
+    for column, dst in targets.items():
+        if column not in df.columns:
+            continue
+        src = detect_unit(str(column))
+        if src is None or src == dst:
+            continue
+        df[_base_name(column) + UNIT_SUFFIXES[dst]] = convert_array(
+            df[column], src, dst, dtype=dtype or _output_dtype(df[column])
+        )
+    return df
+
+def normalize_units(df: pd.DataFrame, dtype=None) -> pd.DataFrame:
+    return convert_columns(df, dtype=dtype)
+
+def convert_units(df: pd.DataFrame, dtype=None) -> pd.DataFrame:
+    return normalize_units(df, dtype=dtype)
@@ -0,0 +1,134 @@
+# weather_join.py
+import numpy as np
+import pandas as pd
+from typing import Mapping, Optional, Sequence
+
+# Écart maximal entre une mesure et le point météo retenu (prévisions horaires)
+DEFAULT_TOLERANCE = "1h"
+JOIN_METHODS = ("backward", "nearest", "linear")
+
+
+# ---------------------------------------------------------
+# 1. Préparation des axes temporels
+# ---------------------------------------------------------
+
+def _to_utc_ms(values, tz: str = "UTC") -> np.ndarray:
+    """Horodatages -> datetime64[ms] UTC naïfs ; les valeurs naïves sont lues dans `tz`."""
+    ts = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(ts):
+        from .date_normalization import parse_timestamps
+        ts = parse_timestamps(ts)
+    elif ts.dt.tz is None:
+        ts = ts.dt.tz_localize(tz, ambiguous="NaT", nonexistent="shift_forward")
+    return ts.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ms]")
+
+
+# ---------------------------------------------------------
+# 2. Jointure as-of vectorisée
+# ---------------------------------------------------------
+
+def join_weather(
+    df: pd.DataFrame,
+    weather: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    by: str = "turbine_id",
+    sites: Optional[Mapping] = None,
+    weather_by: Optional[str] = None,
+    time_column: str = "ts_utc",
+    weather_time: str = "time",
+    weather_tz: str = "UTC",
+    method: str = "nearest",
+    tolerance: str = DEFAULT_TOLERANCE,
+) -> pd.DataFrame:
+    """
+    Ajoute à chaque mesure les variables météo (`columns`, par défaut toutes
+    les colonnes numériques de `weather`) de son site.
+
+    Le site d'une mesure est `sites[df[by]]` si `sites` est fourni, sinon
+    `df[by]` lui-même, comparé à `weather[weather_by]`. Sans `weather_by`,
+    la météo est celle d'un site unique, commune à toutes les turbines.
+    `weather_time` peut être l'index de `weather` ; ses horodatages naïfs
+    sont lus dans `weather_tz` (heure locale Open-Meteo).
+
+    method="backward" : dernier point météo <= mesure (merge_asof).
+    method="nearest"  : point le plus proche.
+    method="linear"   : interpolation linéaire entre les deux points encadrants,
+                        point le plus proche en bord de série.
+    Un point à plus de `tolerance` de la mesure est ignoré (NaN).
+
+    Les sites sont placés bout à bout sur un axe temporel décalé : une seule
+    recherche dichotomique (searchsorted) pour toutes les mesures, sans
+    boucle par turbine.
+    """
+    if method not in JOIN_METHODS:
+        raise ValueError(f"Méthode inconnue : {method}")
+    if len(df) == 0 or time_column not in df.columns:
+        return df
+
+    weather = weather.reset_index() if weather_time not in weather.columns else weather
+    if columns is None:
+        skip = {weather_time, weather_by, "location", "latitude", "longitude"}
+        columns = [c for c in weather.columns if c not in skip and pd.api.types.is_numeric_dtype(weather[c])]
+    columns = list(columns)
+    # Prévisions qui se recouvrent : le dernier fichier chargé l'emporte
+    keys = [weather_by, weather_time] if weather_by else [weather_time]
+    weather = weather.drop_duplicates(keys, keep="last")
+
+    # Codes de site communs aux deux tables (-1 : site sans météo)
+    if weather_by:
+        categories = pd.Index(pd.unique(weather[weather_by]))
+        # Factorisation des turbines puis correspondance sur les seules valeurs distinctes
+        turbine_codes, turbines = pd.factorize(df[by], use_na_sentinel=True)
+        site_of_turbine = pd.Index(turbines).map(sites) if sites is not None else turbines
+        lookup = np.append(categories.get_indexer(site_of_turbine), -1)
+        m_codes = lookup[turbine_codes].astype(np.int64)
+        w_codes = categories.get_indexer(weather[weather_by]).astype(np.int64)
+    else:
+        m_codes = np.zeros(len(df), dtype=np.int64)
+        w_codes = np.zeros(len(weather), dtype=np.int64)
+
+    m_ms = _to_utc_ms(df[time_column])
+    w_ms = _to_utc_ms(weather[weather_time], tz=weather_tz)
+    m_valid = ~np.isnat(m_ms) & (m_codes >= 0)
+    w_valid = ~np.isnat(w_ms)
+    m_t, w_t = m_ms.astype(np.int64), w_ms[w_valid].astype(np.int64)
+    w_codes = w_codes[w_valid]
+    values = np.column_stack([weather[c].to_numpy(dtype=np.float64, na_value=np.nan)[w_valid] for c in columns]) \
+        if columns else np.empty((len(w_t), 0))
+
+    out = np.full((len(df), len(columns)), np.nan)
+    if len(w_t) and m_valid.any():
+        tol = int(pd.Timedelta(tolerance) / pd.Timedelta(milliseconds=1))
+        origin = min(int(w_t.min()), int(m_t[m_valid].min()))
+        span = max(int(w_t.max()), int(m_t[m_valid].max())) - origin + 2 * tol + 1
+        w_key = (w_t - origin) + w_codes * span
+        order = np.argsort(w_key, kind="stable")
+        w_key, w_t, w_codes, values = w_key[order], w_t[order], w_codes[order], values[order]
+
+        rows = np.flatnonzero(m_valid)
+        t, codes = m_t[rows], m_codes[rows]
+        pos = np.searchsorted(w_key, (t - origin) + codes * span, side="right")
+        prev = np.clip(pos - 1, 0, len(w_key) - 1)
+        nxt = np.clip(pos, 0, len(w_key) - 1)
+        d_prev = t - w_t[prev]
+        d_next = w_t[nxt] - t
+        has_prev = (pos > 0) & (w_codes[prev] == codes) & (d_prev <= tol)
+        has_next = (pos < len(w_key)) & (w_codes[nxt] == codes) & (d_next <= tol)
+
+        if method == "backward":
+            pick = np.where(has_prev, prev, -1)
+        else:
+            use_next = has_next & (~has_prev | (d_next < d_prev))
+            pick = np.where(use_next, nxt, np.where(has_prev, prev, -1))
+        result = np.where((pick >= 0)[:, None], values[np.maximum(pick, 0)], np.nan)
+
+        if method == "linear":
+            both = has_prev & has_next & (d_prev > 0)
+            gap = (w_t[nxt] - w_t[prev])[both]
+            weight = np.divide(d_prev[both], gap, out=np.zeros(len(gap)), where=gap > 0)[:, None]
+            result[both] = values[prev[both]] + (values[nxt[both]] - values[prev[both]]) * weight
+        out[rows] = result
+
+    for i, column in enumerate(columns):
+        df[column] = out[:, i]
+    return df
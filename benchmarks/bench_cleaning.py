@@ -0,0 +1,83 @@
+"""
+Benchmark de detect_outliers + clean_data (imputation par la médiane, avec
+ou sans suppression des lignes anormales, médianes globales ou par turbine)
+sur des mesures générées complétées des colonnes vent / température
+contrôlées par les seuils, avec une fraction de valeurs aberrantes.
+
+Temps (meilleur de --repeat) et pic mémoire tracemalloc (passe séparée).
+
+Exemple : python -m benchmarks.bench_cleaning --rows 1000000 --outliers 0.01
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.suite import make_dataset
+from Transform.data_cleaning import clean_data, detect_outliers
+
+
+def make_frame(rows: int, outliers: float, seed: int = 0) -> pd.DataFrame:
+    """Mesures brutes + wind_speed (km/h), wind_speed_ms et temperature (°C), `outliers` aberrantes."""
+    rng = np.random.default_rng(seed)
+    df = make_dataset(rows)
+    df["wind_speed_ms"] = df["wind_speed_mps"].to_numpy(dtype=np.float64)
+    df["wind_speed"] = df["wind_speed_ms"] * 3.6
+    df["temperature"] = df["temperature_k"].to_numpy(dtype=np.float64) - 273.15
+    for column, value in (("wind_speed", 200.0), ("wind_speed_ms", 60.0), ("temperature", -100.0)):
+        rows_out = rng.random(len(df)) < outliers / 3
+        df.loc[rows_out, column] = value
+    return df
+
+
+def _measure(fn, df: pd.DataFrame, repeat: int):
+    best = math.inf
+    for _ in range(repeat):
+        data = df.copy()
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    data = df.copy()
+    tracemalloc.start()
+    fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Détection des seuils et imputation de clean_data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--outliers", type=float, default=0.01, help="Fraction de lignes aberrantes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for n in args.rows:
+        df = make_frame(n, args.outliers)
+        per_turbine = {
+            column: df.groupby("turbine_id")[column].median().to_dict()
+            for column in ("wind_speed", "wind_speed_ms", "temperature")
+        }
+        cases = [
+            ("detect_outliers", detect_outliers),
+            ("clean_data", clean_data),
+            ("clean_data(drop_anomalies)", lambda d: clean_data(d, drop_anomalies=True)),
+            ("clean_data(stats par turbine)", lambda d: clean_data(d, stats=per_turbine)),
+        ]
+        print(f"{len(df):,} lignes, {len(df.columns)} colonnes, {args.outliers:.1%} aberrantes")
+        for label, fn in cases:
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds, peak = _measure(fn, df, args.repeat)
+            print(f"  {label:<30} {seconds:7.3f}s  {n / seconds:>13,.0f} lignes/s  pic {peak / 1e6:7.1f} Mo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
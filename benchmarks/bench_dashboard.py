@@ -0,0 +1,58 @@
+"""
+Benchmark du dashboard : premier rendu d'une flotte (toutes les turbines
+tracées), puis rafraîchissement après un incrément où seule une fraction
+des turbines a reçu de nouvelles données (images reprises du cache).
+
+Exemple : python -m benchmarks.bench_dashboard --turbines 200 --changed 0.05 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.suite import make_dataset
+from Graphics.dashboard_generator import generate_dashboard
+
+
+def _timed(df, output, workers) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_dashboard(df, output, turbine_charts=None, workers=workers)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rendu du dashboard : complet puis incrémental")
+    parser.add_argument("--turbines", type=int, default=200)
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction des turbines modifiées par l'incrément")
+    parser.add_argument("--workers", type=int, default=None, help="Processus de rendu (défaut : nombre de CPU)")
+    args = parser.parse_args(argv)
+
+    df = make_dataset(args.turbines * 1440)
+    turbines = df["turbine_id"].unique()
+    changed = turbines[:max(1, int(len(turbines) * args.changed))]
+    increment = df.copy()
+    rows = increment["turbine_id"].isin(changed).to_numpy()
+    increment.loc[rows, "wind_speed_mps"] = increment.loc[rows, "wind_speed_mps"] + np.float64(0.1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "dashboard.html"
+        cold = _timed(df, output, args.workers)
+        warm = _timed(df, output, args.workers)
+        refresh = _timed(increment, output, args.workers)
+
+    print(f"{len(df):,} lignes, {len(turbines)} turbines tracées")
+    print(f"  rendu complet                        : {cold:6.2f}s")
+    print(f"  relance sans changement              : {warm:6.2f}s")
+    print(f"  incrément ({len(changed)} turbines modifiées)     : {refresh:6.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Benchmark de normalize_dates : sortie texte (historique) vs datetime64 natif.
+
+Exemple : python -m benchmarks.bench_date_normalization --rows 1000000
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from Transform.date_normalization import format_timestamps, normalize_dates
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    ts = pd.date_range("2025-01-01", periods=n, freq="min")
+    return pd.DataFrame({"ts_utc": ts.strftime("%Y-%m-%dT%H:%M:%S")})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit de normalize_dates")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args(argv)
+
+    for n in args.rows:
+        raw = make_frame(n)
+
+        start = time.perf_counter()
+        pd.to_datetime(raw["ts_utc"], errors="coerce", utc=True).dt.tz_convert("Europe/Paris").dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+        t_legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        normalize_dates(raw.copy(), as_string=True, source="bench")
+        t_string = time.perf_counter() - start
+
+        start = time.perf_counter()
+        native = normalize_dates(raw.copy(), as_string=False, source="bench")
+        t_native = time.perf_counter() - start
+
+        start = time.perf_counter()
+        format_timestamps(native["ts_utc"])
+        t_export = time.perf_counter() - start
+
+        print(f"{n:>11,} lignes | strftime historique : {t_legacy:6.2f}s")
+        print(f"{n:>11,} lignes | texte (format rapide): {t_string:6.2f}s (x{t_legacy / t_string:.1f})")
+        print(f"{n:>11,} lignes | datetime64 natif    : {t_native:6.2f}s (x{t_legacy / t_native:.1f}) + export {t_export:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
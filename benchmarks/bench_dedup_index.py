@@ -0,0 +1,63 @@
+"""
+Benchmark de l'index de dédoublonnage (Transform.dedup_index) : N
+identifiants déjà chargés, puis une fenêtre de M lignes dont une fraction
+recouvre la précédente. Mesure débit, taux de faux positifs du filtre de
+Bloom (mesuré / théorique) et mémoire par million d'IDs.
+
+Exemple : python -m benchmarks.bench_dedup_index --ids 10000000 --batch 2000000 --overlap 0.9
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Transform.dedup_index import DEFAULT_FP_RATE, DedupIndex
+
+
+def make_ids(start: int, stop: int) -> pd.Series:
+    """Identifiants au format de generate_unique_ids (MD5 hexadécimal)."""
+    return pd.Series([hashlib.md5(str(i).encode()).hexdigest() for i in range(start, stop)], dtype="str")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index Bloom + empreintes triées des unique_id chargés")
+    parser.add_argument("--ids", type=int, default=10_000_000, help="IDs déjà chargés")
+    parser.add_argument("--batch", type=int, default=2_000_000, help="Lignes de la nouvelle fenêtre")
+    parser.add_argument("--overlap", type=float, default=0.9, help="Fraction de la fenêtre déjà chargée")
+    parser.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE)
+    args = parser.parse_args(argv)
+
+    known = int(args.batch * args.overlap)
+    loaded = make_ids(0, args.ids)
+    batch = make_ids(args.ids - known, args.ids - known + args.batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DedupIndex(tmp, capacity=args.ids + args.batch, fp_rate=args.fp_rate)
+        start = time.perf_counter()
+        index.add(loaded)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mask = index.contains(batch)
+        lookup = time.perf_counter() - start
+        stats = index.stats()
+
+    set_bytes = sys.getsizeof(set(loaded.head(1_000_000))) + sum(map(sys.getsizeof, loaded.head(1_000_000)))
+    print(f"{args.ids:,} IDs chargés, fenêtre de {args.batch:,} lignes ({args.overlap:.0%} déjà chargées)")
+    print(f"  construction         : {build:6.2f}s ({args.ids / build:,.0f} IDs/s)")
+    print(f"  test d'appartenance  : {lookup:6.2f}s ({args.batch / lookup:,.0f} IDs/s), "
+          f"{int(mask.sum()):,} lignes écartées (attendu {known:,})")
+    print(f"  faux positifs Bloom  : {stats['measured_fp_rate']:.3%} mesuré, {stats['expected_fp_rate']:.3%} théorique")
+    print(f"  mémoire / million    : {stats['bytes_per_million'] / 1e6:.1f} Mo "
+          f"(Bloom {stats['bloom_bytes'] / stats['count']:.2f} o/ID + empreintes 8 o/ID) ; "
+          f"set Python de str : {set_bytes / 1e6:.1f} Mo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
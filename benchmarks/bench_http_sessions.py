@@ -0,0 +1,59 @@
+"""
+Benchmark des sessions HTTP d'Extract.extract_api contre une doublure locale.
+
+Compare une session neuve par appel (comportement historique de
+fetch_weather sans session) aux sessions partagées par hôte (get_session),
+dont les connexions keep-alive sont réutilisées, en requêtes par seconde.
+
+Exemple : python -m benchmarks.bench_http_sessions --requests 2000 --workers 1 4 8
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from benchmarks.standin_server import JSONStandIn
+from Extract import extract_api
+
+PAYLOAD = {
+    "latitude": 48.86,
+    "longitude": 2.35,
+    "hourly": {"time": [f"2025-11-20T{h:02d}:00" for h in range(24)], "temperature_2m": [12.0] * 24},
+}
+
+
+def _run(url, n, workers, session_factory):
+    def call(_):
+        # Session neuve fermée après l'appel : sockets et descripteurs ne s'accumulent pas pendant la mesure
+        with session_factory() as session:
+            return extract_api.fetch_weather(url, params={"latitude": 48.86}, session=session, cache_ttl=0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, range(n)))
+    return n / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sessions HTTP : session par appel vs pool partagé")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence simulée par requête")
+    args = parser.parse_args(argv)
+
+    with JSONStandIn(PAYLOAD, latency_ms=args.latency_ms) as server:
+        url = f"{server.url}/v1/forecast"
+        for workers in args.workers:
+            extract_api.configure_sessions(pool_connections=4, pool_maxsize=max(workers, extract_api.POOL_MAXSIZE))
+            fresh = _run(url, args.requests, workers, extract_api.create_session)
+            pooled = _run(url, args.requests, workers, nullcontext)
+            print(f"w={workers:<2} session par appel : {fresh:8.0f} req/s   "
+                  f"session partagée : {pooled:8.0f} req/s   (x{pooled / fresh:.1f})")
+        extract_api.close_sessions()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
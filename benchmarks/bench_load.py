@@ -0,0 +1,102 @@
+"""
+Benchmark du chargement PostgreSQL : load_dataframe (COPY texte / binaire
++ upsert via staging UNLOGGED) face à DataFrame.to_sql et aux INSERT ligne
+à ligne, sur des mesures nettoyées générées.
+
+Sans --dsn, seul le temps de construction des buffers COPY est mesuré.
+
+Exemple : python -m benchmarks.bench_load --rows 1000000 --dsn postgresql://localhost/energitech
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.suite import make_dataset
+from Load import load_db
+from Transform.data_cleaning import clean_data
+from Transform.date_normalization import normalize_dates
+from Transform.enrichment import enrich_data
+from Transform.unit_conversion import convert_units
+
+TABLE = "bench_load"
+
+
+def make_cleaned(rows: int) -> pd.DataFrame:
+    """Sortie du pipeline Transform sur `rows` mesures (unique_id par turbine et horodatage)."""
+    df = make_dataset(rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for stage in (normalize_dates, convert_units, enrich_data, clean_data):
+            df = stage(df)
+    return df
+
+
+def _timed(label: str, rows: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:8.2f}s  {rows / elapsed:>12,.0f} lignes/s")
+
+
+def _reset(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}, {TABLE}_staging")
+    conn.commit()
+
+
+def _row_inserts(conn, df: pd.DataFrame) -> None:
+    """INSERT ... ON CONFLICT ligne à ligne (executemany), référence naïve."""
+    types = load_db.column_types(df)
+    with conn.cursor() as cur:
+        cur.execute(load_db.create_table_sql(TABLE, types))
+        columns = ", ".join(df.columns)
+        placeholders = ", ".join(["%s"] * len(df.columns))
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        cur.executemany(f"INSERT INTO {TABLE} ({columns}) VALUES ({placeholders}) ON CONFLICT (unique_id) DO NOTHING", rows)
+    conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="COPY + upsert face à to_sql et aux INSERT ligne à ligne")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--insert-rows", type=int, default=50_000, help="Lignes pour les INSERT ligne à ligne (lents)")
+    parser.add_argument("--dsn", default=None, help="PostgreSQL local ; sans --dsn, buffers COPY seulement")
+    args = parser.parse_args(argv)
+
+    df = load_db.prepare_frame(make_cleaned(args.rows))
+    types = load_db.column_types(df)
+    print(f"{len(df):,} lignes, {len(df.columns)} colonnes")
+    _timed("buffer COPY texte", len(df), lambda: load_db.copy_text_buffer(df))
+    _timed("buffer COPY binaire", len(df), lambda: load_db.copy_binary_buffer(df, types))
+    if not args.dsn:
+        return 0
+
+    from sqlalchemy import create_engine
+
+    conn = load_db.get_connection(args.dsn)
+    engine = create_engine(args.dsn.replace("postgresql://", "postgresql+psycopg2://", 1))
+    try:
+        for fmt in load_db.COPY_FORMATS:
+            _reset(conn)
+            _timed(f"load_dataframe COPY {fmt}", len(df), lambda: load_db.load_dataframe(df, TABLE, conn=conn, fmt=fmt))
+            _timed(f"load_dataframe COPY {fmt} (upsert)", len(df),
+                   lambda: load_db.load_dataframe(df, TABLE, conn=conn, fmt=fmt))
+        _reset(conn)
+        _timed("to_sql (method='multi')", len(df),
+               lambda: df.to_sql(TABLE, engine, if_exists="append", index=False, chunksize=10_000, method="multi"))
+        _reset(conn)
+        subset = df.head(args.insert_rows)
+        _timed("INSERT ligne à ligne", len(subset), lambda: _row_inserts(conn, subset))
+        _reset(conn)
+    finally:
+        conn.close()
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Benchmark de detect_rolling_outliers sur une flotte (turbines x mesures minute).
+
+Exemple : python -m benchmarks.bench_rolling_outliers --rows 10000000 --turbines 300
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Transform.data_cleaning import detect_rolling_outliers
+
+
+def make_frame(n: int, turbines: int) -> pd.DataFrame:
+    per_turbine = n // turbines
+    rng = np.random.default_rng(0)
+    ts = pd.date_range("2025-01-01", periods=per_turbine, freq="min", tz="Europe/Paris")
+    size = per_turbine * turbines
+    return pd.DataFrame({
+        "turbine_id": np.repeat([f"T{i:04d}" for i in range(turbines)], per_turbine),
+        "ts_utc": np.tile(ts, turbines),
+        "wind_speed_ms": rng.gamma(2.0, 4.0, size),
+        "temperature": rng.normal(12.0, 6.0, size),
+        "vibration_mm_s": rng.lognormal(1.5, 0.3, size),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit de la détection glissante par turbine")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--turbines", type=int, default=300)
+    parser.add_argument("--window", default="1h")
+    parser.add_argument("--methods", nargs="+", default=["zscore", "mad"])
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.rows, args.turbines)
+    for method in args.methods:
+        start = time.perf_counter()
+        result = detect_rolling_outliers(df.copy(), window=args.window, method=method)
+        elapsed = time.perf_counter() - start
+        flagged = int(result["vibration_mm_s_anomaly"].sum())
+        print(f"{len(df):>11,} lignes x {args.turbines} turbines | {method:<6} : {elapsed:6.2f}s "
+              f"({len(df) / elapsed:,.0f} lignes/s, {flagged} anomalies vibration)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
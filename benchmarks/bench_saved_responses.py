@@ -0,0 +1,86 @@
+"""
+Benchmark du stockage des réponses Open-Meteo : JSON indenté (save_json)
+contre fichiers Arrow IPC par bloc (save_columnar), en taille disque et en
+temps de relecture de tout le répertoire en DataFrame.
+
+Exemple : python -m benchmarks.bench_saved_responses --days 365 --variables 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Extract.extract_api import load_columnar_dir, save_columnar, save_json
+
+
+def make_forecast(day: pd.Timestamp, variables: int, hours: int, rng) -> dict:
+    """Réponse Open-Meteo synthétique : prévision horaire de `hours` heures à partir de `day`."""
+    times = pd.date_range(day, periods=hours, freq="h").strftime("%Y-%m-%dT%H:%M").tolist()
+    names = ["temperature_2m"] + [f"var_{i}" for i in range(1, variables)]
+    hourly = {"time": times}
+    hourly.update({name: rng.normal(10.0, 5.0, hours).round(1).tolist() for name in names})
+    return {
+        "latitude": 48.86,
+        "longitude": 2.36,
+        "utc_offset_seconds": 3600,
+        "timezone": "Europe/Paris",
+        "hourly_units": {"time": "iso8601", **{name: "°C" for name in names}},
+        "hourly": hourly,
+    }
+
+
+def _dir_size(directory: str, suffix: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory) if f.endswith(suffix))
+
+
+def _load_json_dir(directory: str) -> pd.DataFrame:
+    frames = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as fh:
+                frame = pd.DataFrame(json.load(fh)["hourly"])
+            frame["time"] = pd.to_datetime(frame["time"], format="ISO8601")
+            frames.append(frame.set_index("time"))
+    return pd.concat(frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Réponses sauvegardées : JSON vs Arrow IPC")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--variables", type=int, default=8)
+    parser.add_argument("--hours", type=int, default=168, help="Horizon de chaque prévision")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        start = pd.Timestamp("2025-01-01")
+        for d in range(args.days):
+            day = start + pd.Timedelta(days=d)
+            data = make_forecast(day, args.variables, args.hours, rng)
+            name = f"open-meteo_{day:%Y%m%d}.json"
+            save_json(data, filename=name, directory=directory)
+            save_columnar(data, filename=name, directory=directory)
+
+        t0 = time.perf_counter()
+        from_json = _load_json_dir(directory)
+        t_json = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        from_arrow = load_columnar_dir(directory)
+        t_arrow = time.perf_counter() - t0
+
+        print(f"{args.days} prévisions, {len(from_json):,} lignes horaires x {args.variables} variables")
+        print(f"JSON indenté : {_dir_size(directory, '.json') / 1e6:7.1f} Mo  relecture {t_json * 1000:8.0f} ms")
+        print(f"Arrow IPC    : {_dir_size(directory, '.arrow') / 1e6:7.1f} Mo  relecture {t_arrow * 1000:8.0f} ms"
+              f"  (x{t_json / t_arrow:.0f})")
+        assert len(from_arrow) == len(from_json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Mémoire par million de lignes de raw_measurements selon la lecture :
+dtypes par défaut de pd.read_csv, pages JSON Supabase (liste de dicts),
+puis schéma déclaré (Extract.schema), en sortie d'Extract et après les
+étapes Transform.
+
+Exemple : python -m benchmarks.bench_schema --rows 1000000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.suite import make_dataset
+from Extract.schema import apply_schema, csv_dtypes, memory_per_million
+from Transform.data_cleaning import clean_data
+from Transform.date_normalization import normalize_dates
+from Transform.enrichment import enrich_data
+from Transform.unit_conversion import convert_units
+
+
+def transform(df: pd.DataFrame) -> pd.DataFrame:
+    with contextlib.redirect_stdout(io.StringIO()):
+        for stage in (lambda d: normalize_dates(d, as_string=False), convert_units, enrich_data, clean_data):
+            df = stage(df)
+    return df
+
+
+def _report(label: str, df: pd.DataFrame, seconds: float = None) -> None:
+    timing = f"  lecture {seconds:6.2f}s" if seconds is not None else ""
+    print(f"  {label:<32} {memory_per_million(df) / 1e6:8.1f} Mo / million de lignes{timing}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire par million de lignes, dtypes par défaut vs schéma déclaré")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--json-rows", type=int, default=200_000, help="Lignes converties en pages JSON (lent)")
+    args = parser.parse_args(argv)
+
+    raw = make_dataset(args.rows, typed=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "raw.csv"
+        raw.to_csv(path, index=False)
+
+        start = time.perf_counter()
+        default = pd.read_csv(path)
+        t_default = time.perf_counter() - start
+
+        start = time.perf_counter()
+        typed = apply_schema(pd.read_csv(path, dtype=csv_dtypes()))
+        t_typed = time.perf_counter() - start
+
+    records = raw.head(args.json_rows).astype(object).where(raw.head(args.json_rows).notna(), None).to_dict("records")
+    start = time.perf_counter()
+    json_default = pd.DataFrame(records)
+    t_json = time.perf_counter() - start
+    start = time.perf_counter()
+    json_typed = apply_schema(pd.DataFrame(records))
+    t_json_typed = time.perf_counter() - start
+
+    print(f"{len(raw):,} lignes raw_measurements")
+    print("Extract :")
+    _report("read_csv (dtypes par défaut)", default, t_default)
+    _report("pages JSON (dtypes par défaut)", json_default, t_json)
+    # Chaînes Python (object) : inférence par défaut avant pandas 3
+    _report("  idem, chaînes object (pandas 2)", json_default.astype({"turbine_id": object, "ts_utc": object}))
+    _report("read_csv + schéma", typed, t_typed)
+    _report("pages JSON + schéma", json_typed, t_json_typed)
+    print("Après Transform (normalize, convert, enrich, clean) :")
+    _report("dtypes par défaut", transform(default))
+    _report("schéma", transform(typed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Benchmark des lectures Supabase contre une doublure PostgREST locale.
+
+Compare la requête historique (select("*") unique, DataFrame depuis une
+liste de dicts), la pagination séquentielle par clé et fetch_df
+(pages concurrentes, projection de colonnes, CSV typé).
+
+Exemple : python -m benchmarks.bench_supabase_fetch --rows 200000 --latency-ms 30
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.standin_server import PostgRESTStandIn, make_measurements
+from Extract import extract_db
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lectures Supabase : historique vs paginé parallèle")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latence simulée par requête")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args(argv)
+
+    table = make_measurements(args.rows)
+    with PostgRESTStandIn(table, latency_ms=args.latency_ms) as server:
+        # Le client partagé d'extract_db (créé au premier appel) pointe sur la doublure
+        os.environ["SUPABASE_URL"] = server.url
+        os.environ["SUPABASE_KEY"] = "standin-key"
+
+        since = datetime.now() - timedelta(hours=24)
+
+        start = time.perf_counter()
+        response = extract_db.get_client().table("raw_measurements").select("*").gt("ts_utc", since.isoformat()).execute()
+        legacy = pd.DataFrame(response.data)
+        t_legacy = time.perf_counter() - start
+        print(f"select('*') unique        : {t_legacy:6.2f}s  {len(legacy):,} lignes  "
+              f"{legacy.memory_usage(deep=True).sum() / 1e6:.1f} Mo")
+
+        start = time.perf_counter()
+        keyset = pd.concat(extract_db._iter_pages(since=since), ignore_index=True)
+        t_keyset = time.perf_counter() - start
+        print(f"pages séquentielles (JSON) : {t_keyset:6.2f}s  {len(keyset):,} lignes")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            parallel = extract_db.fetch_df(since=since, max_workers=workers)
+            t_parallel = time.perf_counter() - start
+            print(f"fetch_df w={workers:<2}             : {t_parallel:6.2f}s  {len(parallel):,} lignes  "
+                  f"{parallel.memory_usage(deep=True).sum() / 1e6:.1f} Mo  (x{t_keyset / t_parallel:.1f} vs séquentiel)")
+        extract_db.close_client()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
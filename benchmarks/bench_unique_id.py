@@ -0,0 +1,53 @@
+"""
+Benchmark de génération des unique_id : df.apply(generate_unique_id) vs generate_unique_ids.
+
+Exemple : python -m benchmarks.bench_unique_id --rows 1000000 10000000
+Le chemin ligne à ligne est mesuré sur au plus --rowwise-max lignes puis extrapolé.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Transform.enrichment import generate_unique_id, generate_unique_ids
+
+
+def make_frame(n: int, stations: int = 300) -> pd.DataFrame:
+    ts = pd.date_range("2025-01-01", periods=n, freq="s", tz="UTC").tz_convert("Europe/Paris")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "ts_utc": ts.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "station_id": rng.integers(1, stations + 1, size=n),
+    })
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit de génération des unique_id")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--rowwise-max", type=int, default=200_000, help="Lignes max pour le chemin df.apply")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args(argv)
+
+    for n in args.rows:
+        df = make_frame(n)
+        sample = df.iloc[: min(n, args.rowwise_max)]
+        t_row = timed(sample.apply, generate_unique_id, axis=1)
+        row_rate = len(sample) / t_row
+        print(f"{n:>11,} lignes | apply      : {row_rate:>12,.0f} lignes/s (~{n / row_rate:.1f}s extrapolé)")
+        for w in args.workers:
+            t_batch = timed(generate_unique_ids, df, workers=w)
+            print(f"{n:>11,} lignes | batch w={w:<2} : {n / t_batch:>12,.0f} lignes/s ({t_batch:.2f}s, x{(n / t_batch) / row_rate:.1f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
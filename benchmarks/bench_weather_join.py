@@ -0,0 +1,63 @@
+"""
+Benchmark de join_weather (jointure as-of météo par turbine) face à
+pd.merge_asof(by=...), qui impose un tri global des mesures.
+
+Exemple : python -m benchmarks.bench_weather_join --rows 10000000 --turbines 300
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_rolling_outliers import make_frame
+from Transform.weather_join import join_weather
+
+
+def make_weather(turbines: int, hours: int) -> pd.DataFrame:
+    """Prévisions horaires (heure locale de Paris), un site par turbine."""
+    rng = np.random.default_rng(1)
+    times = pd.date_range("2024-12-31 23:00", periods=hours, freq="h")
+    return pd.DataFrame({
+        "turbine_id": np.repeat([f"T{i:04d}" for i in range(turbines)], hours),
+        "time": np.tile(times, turbines),
+        "temperature_2m": rng.normal(10.0, 5.0, turbines * hours),
+        "wind_speed_10m": rng.gamma(2.0, 3.0, turbines * hours),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit de la jointure météo as-of par turbine")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--turbines", type=int, default=300)
+    parser.add_argument("--methods", nargs="+", default=["backward", "nearest", "linear"])
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.rows, args.turbines)
+    hours = int(np.ceil(args.rows / args.turbines / 60)) + 2
+    weather = make_weather(args.turbines, hours)
+    options = dict(by="turbine_id", weather_by="turbine_id", weather_tz="Europe/Paris")
+
+    for method in args.methods:
+        start = time.perf_counter()
+        join_weather(df.copy(), weather, method=method, **options)
+        elapsed = time.perf_counter() - start
+        print(f"{len(df):>11,} lignes x {args.turbines} turbines | join_weather {method:<8} : {elapsed:6.2f}s "
+              f"({len(df) / elapsed:,.0f} lignes/s)")
+
+    start = time.perf_counter()
+    right = weather.assign(time=weather["time"].dt.tz_localize("Europe/Paris")).sort_values("time")
+    left = df.reset_index().sort_values("ts_utc")
+    merged = pd.merge_asof(left, right, left_on="ts_utc", right_on="time", by="turbine_id",
+                           direction="backward", tolerance=pd.Timedelta("1h"))
+    merged.set_index("index").sort_index()
+    elapsed = time.perf_counter() - start
+    print(f"{len(df):>11,} lignes x {args.turbines} turbines | merge_asof backward   : {elapsed:6.2f}s "
+          f"({len(df) / elapsed:,.0f} lignes/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
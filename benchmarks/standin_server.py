@@ -0,0 +1,179 @@
+"""
+Serveurs HTTP locaux servant de doublures aux API distantes pour les benchmarks.
+
+PostgRESTStandIn reproduit le sous-ensemble de PostgREST (Supabase) utilisé
+par Extract.extract_db : select, filtres gt/gte/lt/lte, order, limit, réponses
+JSON ou CSV (Accept: text/csv), limite de lignes serveur et latence réseau
+simulée. JSONStandIn renvoie un même document JSON à tout GET (API météo).
+Les serveurs tournent dans un processus séparé pour ne pas partager le
+GIL avec le client mesuré.
+"""
+
+import abc
+import io
+import json
+import multiprocessing
+import operator
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+OPERATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+def make_measurements(n: int, turbines: int = 50, start: str = None) -> pd.DataFrame:
+    """Table raw_measurements synthétique (schéma de measurements_last_24hours.csv + une colonne brute)."""
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp(start) if start else pd.Timestamp.now().floor("min") - pd.Timedelta(hours=23)
+    steps = np.arange(n) // turbines
+    ts = start + pd.to_timedelta(steps * (82_800 / max(1, n // turbines)), unit="s")
+    return pd.DataFrame({
+        "meas_id": np.arange(1, n + 1, dtype=np.int64),
+        "turbine_id": np.array([f"T{i:03d}" for i in range(1, turbines + 1)])[np.arange(n) % turbines],
+        "ts_utc": ts.strftime("%Y-%m-%dT%H:%M:%S"),
+        "wind_speed_mps": rng.gamma(2.0, 4.0, n).round(2),
+        "temperature_k": rng.normal(285.0, 6.0, n).round(2),
+        "vibration_mm_s": rng.lognormal(1.5, 0.3, n).round(2),
+        "consumption_kwh": rng.normal(1000.0, 80.0, n).round(2),
+        "raw_payload": ["{\"firmware\": \"2.4.1\", \"status\": \"ok\"}"] * n,
+    })
+
+
+def query_table(table: pd.DataFrame, params, max_rows: int = None) -> pd.DataFrame:
+    """Applique les paramètres PostgREST à `table` (triée sur meas_id)."""
+    ids = table["meas_id"].to_numpy()
+    lo, hi = 0, len(table)
+    columns, descending, limit, filters = list(table.columns), False, None, []
+    for name, value in params:
+        if name == "select":
+            columns = list(table.columns) if value == "*" else value.split(",")
+        elif name == "order":
+            descending = value.endswith(".desc")
+        elif name == "limit":
+            limit = int(value)
+        elif name == "meas_id":
+            # Bornes sur la clé triée : recherche dichotomique plutôt qu'un masque complet
+            op, _, operand = value.partition(".")
+            operand = int(operand)
+            if op in ("gt", "gte"):
+                lo = max(lo, int(np.searchsorted(ids, operand, side="right" if op == "gt" else "left")))
+            else:
+                hi = min(hi, int(np.searchsorted(ids, operand, side="left" if op == "lt" else "right")))
+        elif name in table.columns:
+            op, _, operand = value.partition(".")
+            filters.append((name, OPERATORS[op], operand))
+
+    df = table.iloc[lo:max(lo, hi)]
+    for name, op, operand in filters:
+        column = df[name]
+        df = df[op(column, float(operand)) if pd.api.types.is_numeric_dtype(column) else op(column, operand)]
+    if descending:
+        df = df.iloc[::-1]
+    caps = [x for x in (limit, max_rows) if x is not None]
+    if caps:
+        df = df.iloc[:min(caps)]
+    return df[columns]
+
+
+def _serve_postgrest(table, max_rows, latency, port_queue):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # En-têtes et corps partent en deux écritures : sans TCP_NODELAY, Nagle et
+        # l'ACK retardé ajoutent ~40 ms à chaque requête sur une connexion réutilisée
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            result = query_table(table, parse_qsl(urlsplit(self.path).query), max_rows)
+            if "text/csv" in self.headers.get("Accept", ""):
+                buffer = io.StringIO()
+                result.to_csv(buffer, index=False)
+                body, content_type = buffer.getvalue().encode(), "text/csv"
+            else:
+                body, content_type = result.to_json(orient="records").encode(), "application/json"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _serve_json(body, latency, port_queue):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # En-têtes et corps partent en deux écritures : sans TCP_NODELAY, Nagle et
+        # l'ACK retardé ajoutent ~40 ms à chaque requête sur une connexion réutilisée
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class _StandIn(abc.ABC):
+    """Lance le serveur de `_target_args()` dans un processus fils ; `url` est connue à l'entrée du bloc with."""
+
+    def __init__(self):
+        self.url = None
+        self._process = None
+
+    @abc.abstractmethod
+    def _target_args(self):
+        """(fonction serveur, arguments) : la fonction reçoit en plus la file où publier son port."""
+
+    def __enter__(self):
+        ctx = multiprocessing.get_context("fork")
+        port_queue = ctx.Queue()
+        target, args = self._target_args()
+        self._process = ctx.Process(target=target, args=(*args, port_queue), daemon=True)
+        self._process.start()
+        self.url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+
+class PostgRESTStandIn(_StandIn):
+    def __init__(self, table: pd.DataFrame, max_rows: int = None, latency_ms: float = 0.0):
+        super().__init__()
+        self.table = table.sort_values("meas_id").reset_index(drop=True)
+        self.max_rows = max_rows
+        self.latency = latency_ms / 1000.0
+
+    def _target_args(self):
+        return _serve_postgrest, (self.table, self.max_rows, self.latency)
+
+
+class JSONStandIn(_StandIn):
+    def __init__(self, payload, latency_ms: float = 0.0):
+        super().__init__()
+        self.body = json.dumps(payload).encode()
+        self.latency = latency_ms / 1000.0
+
+    def _target_args(self):
+        return _serve_json, (self.body, self.latency)
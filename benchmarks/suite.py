@@ -0,0 +1,190 @@
+"""
+Suite de benchmarks des étapes Transform et de run_pipeline, avec baselines JSON.
+
+Chaque étape tourne sur des jeux raw_measurements générés
+(Extract.generate_measurements) de 10k à 10M lignes, en entrée la sortie des
+étapes précédentes. Mesures : temps (meilleur de --repeat), lignes/s et pic
+mémoire (tracemalloc, passe séparée pour ne pas fausser le temps).
+
+    python -m benchmarks.suite --sizes 10000 100000 1000000 --save-baseline
+    python -m benchmarks.suite --sizes 10000 100000 1000000 --threshold 0.25
+
+Sans --save-baseline, les résultats sont comparés à la baseline : le code de
+sortie vaut 1 si une étape est plus lente (ou plus gourmande) de plus de
+--threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import run_transform
+from Extract.generate_measurements import simulate_block
+from Extract.schema import apply_schema
+from Transform.data_cleaning import clean_data, detect_outliers, detect_rolling_outliers
+from Transform.date_normalization import normalize_dates
+from Transform.enrichment import enrich_data
+from Transform.unit_conversion import convert_units
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "transform_suite.json"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Écart absolu en dessous duquel une différence de temps est du bruit de mesure
+MIN_DELTA_S = 0.01
+MIN_DELTA_MB = 1.0
+
+# Étapes dans l'ordre du pipeline : chacune reçoit la sortie des précédentes
+STAGES = [
+    ("normalize_dates", normalize_dates),
+    ("convert_units", convert_units),
+    ("enrich_data", enrich_data),
+    ("detect_outliers", detect_outliers),
+    ("detect_rolling_outliers", detect_rolling_outliers),
+    ("clean_data", clean_data),
+]
+
+
+def make_dataset(rows: int, seed: int = 0, typed: bool = True) -> pd.DataFrame:
+    """
+    ~`rows` mesures minute (schéma raw_measurements), blocs d'au plus 1000
+    turbines par jour ; `typed` applique MEASUREMENT_SCHEMA comme les lecteurs Extract.
+    """
+    turbines = max(1, min(1000, math.ceil(rows / 1440)))
+    days = math.ceil(rows / (turbines * 1440))
+    blocks = [simulate_block(date(2025, 1, 1) + timedelta(days=d), d, 0, turbines, turbines, seed) for d in range(days)]
+    df = pd.concat(blocks, ignore_index=True).head(rows)
+    return apply_schema(df) if typed else df
+
+
+def _measure(fn, make_input, rows: int, repeat: int, memory: bool) -> dict:
+    """
+    Meilleur temps de fn(make_input()) sur `repeat` exécutions (préparation
+    de l'entrée hors chrono), puis pic mémoire en passe séparée.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        data = make_input()
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    result = {"rows": rows, "seconds": round(best, 6), "rows_per_s": round(rows / best, 1)}
+    if memory:
+        data = make_input()
+        tracemalloc.start()
+        fn(data)
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes, repeat: int = 3, memory: bool = True, pipeline: bool = True, log=print) -> dict:
+    """Résultats {"<étape>@<lignes>": {...}} pour chaque taille."""
+    results = {}
+    for size in sizes:
+        raw = make_dataset(size)
+        df = raw
+        for name, fn in STAGES:
+            key = f"{name}@{size}"
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[key] = _measure(fn, df.copy, size, repeat, memory)
+                df = fn(df.copy())
+            log(_format(key, results[key]))
+
+        if pipeline:
+            key = f"run_pipeline@{size}"
+            with tempfile.TemporaryDirectory() as tmp:
+                source = Path(tmp) / "raw.parquet"
+                raw.to_parquet(source, index=False)
+                cwd = os.getcwd()
+                os.chdir(tmp)  # dashboard.html et dashboard_files/ sont écrits dans le dossier courant
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results[key] = _measure(lambda _: run_transform.run_pipeline(source=source),
+                                                lambda: None, size, 1, memory)
+                finally:
+                    os.chdir(cwd)
+            log(_format(key, results[key]))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Régressions (clé, métrique, baseline, actuel) au-delà de `threshold` (0.2 = +20 %)."""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, min_delta in (("seconds", MIN_DELTA_S), ("peak_mb", MIN_DELTA_MB)):
+            if metric not in current or metric not in reference:
+                continue
+            old, new = reference[metric], current[metric]
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+
+def _format(key: str, entry: dict) -> str:
+    peak = f"  pic {entry['peak_mb']:8.1f} Mo" if "peak_mb" in entry else ""
+    return f"{key:<34} {entry['seconds']:9.3f}s  {entry['rows_per_s']:>14,.0f} lignes/s{peak}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des étapes Transform avec baselines JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Écrit les résultats comme nouvelle baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression tolérée (0.2 = +20 %%)")
+    parser.add_argument("--output", type=Path, default=None, help="Écrit aussi les résultats dans ce JSON")
+    parser.add_argument("--no-memory", action="store_true", help="Sans passe tracemalloc")
+    parser.add_argument("--no-pipeline", action="store_true", help="Sans run_pipeline complet")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.repeat, memory=not args.no_memory, pipeline=not args.no_pipeline)
+    document = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        print(f"Baseline écrite : {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"Pas de baseline ({args.baseline}) : relancer avec --save-baseline.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for key, metric, old, new in regressions:
+        print(f"RÉGRESSION {key} {metric} : {old} -> {new} (+{(new / old - 1) * 100:.0f} %)")
+    if regressions:
+        return 1
+    print(f"Aucune régression au-delà de {args.threshold:.0%} par rapport à {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
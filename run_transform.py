@@ -1,4 +1,7 @@
 import sys
+import tempfile
+from collections.abc import Mapping
+from functools import partial
 from pathlib import Path
 import pandas as pd
 
@@ -23,16 +26,97 @@ __all__ = [
 from Transform.date_normalization import normalize_dates
 from Transform.unit_conversion import convert_units
 from Transform.enrichment import enrich_data
-from Transform.data_cleaning import clean_data
+from Transform.data_cleaning import clean_data, detect_rolling_outliers
+from Transform.quantile_sketch import QuantileSketches
+from Transform.date_normalization import format_timestamps
+from Transform.weather_join import join_weather
+from Transform.instrumentation import PipelineInstrumentation
+from Transform.dedup_index import DedupIndex, drop_known
 
+from Extract.schema import MEASUREMENT_SCHEMA, apply_schema, concat_frames, csv_dtypes
 from Graphics.dashboard_generator import generate_dashboard
+from Load.load_db import load_dataframe
+
+
+CSV_FALLBACK = Path(__file__).resolve().parent / "Extract" / "energitic_pipeline" / "measurements_last_24hours.csv"
+CHUNK_SIZE = 100_000
+
+# Étapes Transform appliquées chunk par chunk, dans l'ordre : (nom, fonction, accumulateur).
+# Une étape qui a besoin de statistiques globales déclare un accumulateur :
+# une première passe exécute les étapes amont sur tous les chunks et le
+# remplit, puis son résultat est passé à l'étape via `stats=`.
+STREAM_STAGES = [
+    ("normalize_dates", lambda df: normalize_dates(df, as_string=False, source="raw_measurements"), None),
+    ("convert_units", convert_units, None),
+    ("enrich_data", enrich_data, None),
+    ("clean_data", clean_data, QuantileSketches),
+]
+
+
+def _pipeline_stages(weather=None, weather_options=None, dedup: DedupIndex = None, rolling_outliers=None,
+                     turbine_medians: bool = False):
+    """
+    STREAM_STAGES, avec après enrich_data (unique_id et turbine_id
+    disponibles) le retrait des lignes déjà chargées si `dedup` est fourni,
+    la jointure météo si `weather` est fourni, puis la détection glissante
+    par turbine si `rolling_outliers` (arguments de detect_rolling_outliers) est fourni.
+    `turbine_medians` : clean_data impute la médiane de chaque turbine.
+    """
+    stages = STREAM_STAGES
+    if turbine_medians:
+        stages = [
+            (name, fn, partial(QuantileSketches, per_turbine=True) if accumulator is QuantileSketches else accumulator)
+            for name, fn, accumulator in stages
+        ]
+    extra = []
+    if dedup is not None:
+        extra.append(("drop_known", lambda df: drop_known(df, dedup), None))
+    if weather is not None:
+        extra.append(("join_weather", lambda df: join_weather(df, weather, **(weather_options or {})), None))
+    if rolling_outliers is not None:
+        extra.append(("detect_rolling_outliers", lambda df: detect_rolling_outliers(df, **rolling_outliers), None))
+    idx = [name for name, _, _ in stages].index("enrich_data") + 1
+    return stages[:idx] + extra + stages[idx:]
+
+
+def weather_options(weather: pd.DataFrame, sites=None, weather_by: str = "location", **options) -> dict:
+    """
+    Arguments de join_weather pour les prévisions `weather` (load_columnar_dir).
+    `sites` ({turbine_id: site}) associe chaque turbine à un site, comparé à
+    la colonne `weather_by` ("location" ou "source") des prévisions. Sans
+    `sites`, les prévisions doivent couvrir un seul site (mêmes latitude /
+    longitude), commun à toutes les turbines : sinon ValueError, la jointure
+    ne saurait pas quelle météo donner à quelle turbine.
+    """
+    if sites is not None:
+        if weather_by not in weather.columns:
+            raise ValueError(f"Colonne de site '{weather_by}' absente des prévisions")
+        return {**options, "sites": sites, "weather_by": weather_by}
+    coords = [c for c in ("latitude", "longitude") if c in weather.columns]
+    n_sites = len(weather[coords].drop_duplicates()) if coords else 1
+    if n_sites > 1:
+        raise ValueError(f"Prévisions de {n_sites} sites : association turbine -> site requise")
+    return options
+
+
+def _dedup_index(dedup):
+    """DedupIndex depuis un dossier (ou l'index lui-même), None si désactivé."""
+    return DedupIndex(dedup) if dedup is not None and not isinstance(dedup, DedupIndex) else dedup
+
+
+def _report_dedup(dedup: DedupIndex) -> None:
+    stats = dedup.stats()
+    rate = stats["measured_fp_rate"]
+    print(f"♻️ Index de dédoublonnage : {stats['count']:,} IDs, "
+          f"{(stats['bytes_per_million'] or 0) / 1e6:.1f} Mo par million d'IDs, "
+          f"faux positifs du filtre {rate if rate is not None else 0:.3%} (théorique {stats['expected_fp_rate']:.3%})")
 
 
 def _load_df_from_extract():
     """
-    Tente d'importer le module Extract.extract_db depuis la racine du workspace
-    et récupérer la DataFrame déjà construite (variable `df`) ou appeler une
-    fonction publique si elle existe.
+    Importe Extract.extract_db depuis la racine du workspace (import sans effet
+    de bord) et appelle sa fonction d'extraction : fenêtre incrémentale si
+    disponible, sinon fetch_df().
     """
     root = Path(__file__).resolve().parent  # workspace root
     root_str = str(root)
@@ -45,55 +129,339 @@ def _load_df_from_extract():
         print(f"⚠️ Impossible d'importer Extract.extract_db : {e}")
         return None
 
-    # Priorité : variable df, sinon fonctions usuelles si présentes
-    if hasattr(extract_db, "df"):
-        return getattr(extract_db, "df")
-    for fn in ("get_recent_df", "fetch_last_24h", "fetch_df"):
+    for fn in ("fetch_incremental", "fetch_df"):
         if hasattr(extract_db, fn):
             try:
-                return getattr(extract_db, fn)()
+                df = getattr(extract_db, fn)()
             except Exception as e:
                 print(f"⚠️ Appel de {fn}() a échoué : {e}")
                 return None
+            return df if not df.empty else None
     return None
 
 
-def run_pipeline():
-    # --- 0. Obtenir les données (Extract) ---
+def _iter_chunks_from_extract(chunk_size: int, csv_path=None):
+    """
+    Générateur de chunks : pagination Supabase si disponible, sinon lecture
+    du CSV par blocs de `chunk_size` lignes. `csv_path` force la source
+    fichier (CSV ou dossier partitionné).
+    """
+    if csv_path is None:
+        root_str = str(Path(__file__).resolve().parent)
+        if root_str not in sys.path:
+            sys.path.insert(0, root_str)
+        try:
+            import Extract.extract_db as extract_db  # type: ignore
+            chunks = extract_db.iter_df_chunks(chunk_size)
+            # La connexion n'a lieu qu'à la première page : le repli CSV se décide là
+            first = next(chunks, None)
+        except Exception as e:
+            print(f"⚠️ Lecture paginée Extract.extract_db impossible : {e}")
+            first = None
+        if first is not None:
+            yield first
+            yield from chunks
+            return
+        csv_path = CSV_FALLBACK
+
+    if not Path(csv_path).exists():
+        raise FileNotFoundError(f"Aucune source de données disponible ({csv_path} absent).")
+    yield from _iter_file_chunks(Path(csv_path), chunk_size)
+
+
+def _iter_file_chunks(path: Path, chunk_size: int):
+    """
+    Chunks d'un CSV, ou d'un dossier de fichiers partitionnés (.csv /
+    .parquet, ex. Extract.generate_measurements) lus dans l'ordre des noms.
+    Chunks typés selon MEASUREMENT_SCHEMA. Le premier chunk de chaque
+    fichier porte sa taille dans attrs["bytes_read"] (relevée par
+    l'instrumentation).
+    """
+    for file in _source_files(path):
+        if file.suffix == ".parquet":
+            import pyarrow.parquet as pq
+            chunks = (batch.to_pandas() for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size))
+        else:
+            chunks = pd.read_csv(file, chunksize=chunk_size, dtype=csv_dtypes(MEASUREMENT_SCHEMA))
+        for i, chunk in enumerate(chunks):
+            chunk = apply_schema(chunk)
+            if i == 0:
+                chunk.attrs["bytes_read"] = file.stat().st_size
+            yield chunk
+
+
+def _source_files(path: Path):
+    path = Path(path)
+    return sorted(p for p in path.rglob("*") if p.suffix in (".csv", ".parquet")) if path.is_dir() else [path]
+
+
+def _run_stages(df, stages, stats, instrumentation=None):
+    for name, fn, accumulator in stages:
+        kwargs = {"stats": stats[name]} if accumulator is not None else {}
+        df = instrumentation.track(name, fn, df, **kwargs) if instrumentation else fn(df, **kwargs)
+    return df
+
+
+def _read_spilled(paths):
+    """Relit les chunks écrits par _collect_stream_stats, chaque fichier supprimé une fois lu."""
+    for path in paths:
+        chunk = pd.read_pickle(path)
+        path.unlink()
+        yield chunk
+
+
+def _collect_stream_stats(chunks, stages, spill_dir, instrumentation=None):
+    """
+    Passe de statistiques sans seconde extraction : pour chaque étape
+    déclarant un accumulateur, les étapes amont tournent sur les chunks qui
+    remplissent l'accumulateur, puis sont écrits (pickle, dtypes conservés)
+    dans `spill_dir` : la mémoire reste bornée par le chunk.
+    Retourne (stats, lignes, chunks relus, étapes restant à exécuter).
+    """
+    stats, start, rows = {}, 0, 0
+    for idx, (name, _, accumulator) in enumerate(stages):
+        if accumulator is None:
+            continue
+        acc, paths, rows = accumulator(), [], 0
+        for i, chunk in enumerate(chunks):
+            chunk = _run_stages(chunk, stages[start:idx], stats, instrumentation)
+            acc.update(chunk)
+            rows += len(chunk)
+            paths.append(Path(spill_dir) / f"{idx:02d}-{i:06d}.pkl")
+            chunk.to_pickle(paths[-1])
+        stats[name] = acc.result()
+        chunks, start = _read_spilled(paths), idx
+    return stats, rows, chunks, stages[start:]
+
+
+def _stats_summary(stats, rows: int) -> str:
+    """Résumé court des statistiques globales : médianes globales, nombre de turbines sinon."""
+    parts = []
+    for name, values in stats.items():
+        described = [
+            f"{column} ({len(value)} turbines)" if isinstance(value, Mapping) else f"{column}={value:.2f}"
+            for column, value in values.items()
+        ]
+        parts.append(f"{name} : {', '.join(described) or 'aucune'}")
+    return f"{rows} lignes ; " + " ; ".join(parts)
+
+
+def run_pipeline_streaming(
+    chunk_size: int = CHUNK_SIZE,
+    output_csv="transformed_measurements.csv",
+    csv_path=None,
+    weather=None,
+    weather_options=None,
+    instrumentation: PipelineInstrumentation = None,
+    load_table: str = None,
+    dedup=None,
+    rolling_outliers=None,
+    turbine_medians: bool = False,
+):
+    """
+    Mode streaming : chaque étape Transform tourne chunk par chunk et le
+    résultat est ajouté à `output_csv`, la mémoire reste bornée par `chunk_size`.
+    La source n'est lue qu'une fois : les chunks en attente des statistiques
+    globales sont conservés sur disque (dossier temporaire) entre les deux passes.
+    `weather` (et `weather_options`, arguments de join_weather) active la
+    jointure météo. `load_table` charge aussi chaque chunk dans PostgreSQL
+    (upsert sur unique_id). `dedup` (dossier ou DedupIndex) écarte les
+    lignes déjà chargées et reçoit les IDs de chaque chunk une fois son
+    chargement réussi (sans `load_table`, l'index est seulement consulté).
+    `rolling_outliers` ({"window": "1h", ...}) ajoute les drapeaux
+    '<signal>_anomaly' glissants, fenêtres limitées à chaque chunk.
+    `turbine_medians` impute par la médiane de chaque turbine (sketches
+    par turbine) au lieu de la médiane globale.
+    Les métriques de chaque étape sont cumulées sur les chunks.
+    Retourne le chemin du CSV produit.
+    """
+    instrumentation = instrumentation or PipelineInstrumentation()
+    dedup = _dedup_index(dedup)
+    stages = _pipeline_stages(weather, weather_options, dedup, rolling_outliers, turbine_medians)
+
+    rows = 0
+    with tempfile.TemporaryDirectory(prefix="transform_chunks_") as spill_dir:
+        chunks = instrumentation.track_iter("extract", _iter_chunks_from_extract(chunk_size, csv_path))
+        stats, stat_rows, chunks, remaining = _collect_stream_stats(chunks, stages, spill_dir, instrumentation)
+        if stats:
+            print(f"📊 Statistiques globales calculées : {_stats_summary(stats, stat_rows)}")
+
+        for i, chunk in enumerate(chunks):
+            chunk = _run_stages(chunk, remaining, stats, instrumentation)
+            if load_table:
+                instrumentation.track("load", load_dataframe, chunk, table=load_table)
+                if dedup is not None:
+                    dedup.add(chunk["unique_id"])
+            # Formatage texte des dates uniquement à l'export
+            chunk["ts_utc"] = format_timestamps(chunk["ts_utc"])
+            chunk.to_csv(output_csv, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+            rows += len(chunk)
+
+    print(f"✨ Pipeline Transform (streaming) terminé : {rows} lignes -> {output_csv}")
+    print("⚠️ Dashboard non généré en mode streaming.")
+    if dedup is not None:
+        _report_dedup(dedup)
+    instrumentation.finish()
+    return output_csv
+
+
+def _extract_df(source=None):
+    """
+    Données à transformer : fichiers `source` si fournis, sinon Extract puis
+    le CSV local. attrs["bytes_read"] : taille des fichiers lus.
+    """
+    if source is not None:
+        df = concat_frames(_iter_chunks_from_extract(CHUNK_SIZE, source))
+        df.attrs["bytes_read"] = sum(f.stat().st_size for f in _source_files(source))
+        return df
     df = _load_df_from_extract()
     if df is None:
         # fallback : lire le CSV local comme avant
-        csv_path = Path(__file__).resolve().parent / "Extract" / "measurements last 24hours.csv"
+        csv_path = CSV_FALLBACK
         if csv_path.exists():
-            df = pd.read_csv(csv_path)
+            df = apply_schema(pd.read_csv(csv_path, dtype=csv_dtypes(MEASUREMENT_SCHEMA)))
+            df.attrs["bytes_read"] = csv_path.stat().st_size
             print("📥 Données chargées depuis CSV (fallback)")
         else:
             raise FileNotFoundError("Aucune source de données disponible (Extract import failed and CSV absent).")
+    return df
+
+
+def run_pipeline(
+    chunk_size: int = None,
+    weather=None,
+    weather_options=None,
+    source=None,
+    instrumentation: PipelineInstrumentation = None,
+    load_table: str = None,
+    dedup=None,
+    rolling_outliers=None,
+    turbine_medians: bool = False,
+):
+    """
+    Pipeline complet. Chaque étape est mesurée par `instrumentation`
+    (logs JSON sur le logger "energitech.pipeline" par défaut).
+    `load_table` active l'étape Load (PostgreSQL, DATABASE_URL).
+    `dedup` (dossier ou DedupIndex) écarte dès la génération des IDs les
+    lignes déjà chargées, puis enregistre les IDs une fois le chargement
+    réussi (sans `load_table`, l'index est seulement consulté).
+    `rolling_outliers` (arguments de detect_rolling_outliers, ex:
+    {"window": "1h", "method": "mad"}) active la détection glissante par turbine.
+    `turbine_medians` : valeurs aberrantes remplacées par la médiane de leur
+    turbine (médiane globale par défaut, comme les seuils).
+    """
+    instrumentation = instrumentation or PipelineInstrumentation()
+    if chunk_size:
+        return run_pipeline_streaming(chunk_size=chunk_size, csv_path=source, weather=weather,
+                                      weather_options=weather_options, instrumentation=instrumentation,
+                                      load_table=load_table, dedup=dedup, rolling_outliers=rolling_outliers,
+                                      turbine_medians=turbine_medians)
+    dedup = _dedup_index(dedup)
+    track = instrumentation.track
+
+    # --- 0. Obtenir les données (Extract, ou fichiers `source` si fournis) ---
+    df = track("extract", _extract_df, source)
 
     print("📥 Données chargées pour transformation")
 
-    # --- 1. Normalisation des dates ---
-    df = normalize_dates(df)
+    # --- 1. Normalisation des dates (datetime64 conservé jusqu'au Load) ---
+    df = track("normalize_dates", normalize_dates, df, as_string=False, source="raw_measurements")
 
     # --- 2. Harmonisation des unités ---
-    df = convert_units(df)
+    df = track("convert_units", convert_units, df)
 
     # --- 3. Enrichissement (ID turbines, etc.) ---
-    df = enrich_data(df)
+    df = track("enrich_data", enrich_data, df)
+
+    # --- 3a. Lignes déjà chargées (fenêtres qui se recouvrent) ---
+    if dedup is not None:
+        df = track("drop_known", drop_known, df, dedup)
+
+    # --- 3b. Jointure météo (prévisions Open-Meteo du site de chaque turbine) ---
+    if weather is not None:
+        df = track("join_weather", join_weather, df, weather, **(weather_options or {}))
+
+    # --- 3c. Détection glissante par turbine (vibrations, vent, température) ---
+    if rolling_outliers is not None:
+        df = track("detect_rolling_outliers", detect_rolling_outliers, df, **rolling_outliers)
 
     # --- 4. Nettoyage & détection anomalies ---
-    df = clean_data(df)
+    stats = None
+    if turbine_medians:
+        sketches = QuantileSketches(per_turbine=True)
+        sketches.update(df)
+        stats = sketches.result()
+    df = track("clean_data", clean_data, df, stats=stats)
 
     print("✨ Pipeline Transform terminé.")
 
+    # --- 4b. Chargement PostgreSQL (COPY + upsert sur unique_id) ---
+    if load_table:
+        summary = track("load", load_dataframe, df, table=load_table)
+        print(f"🗄️ {summary['rows']} lignes chargées dans {load_table}")
+        if dedup is not None:
+            dedup.add(df["unique_id"])
+    if dedup is not None:
+        _report_dedup(dedup)
+
     # --- 5. Génération du dashboard depuis df ---
     try:
-        generate_dashboard(df)
+        track("generate_dashboard", generate_dashboard, df)
     except Exception as e:
         print(f"⚠️ Génération du dashboard a échoué : {e}")
 
+    instrumentation.finish()
     return df
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pipeline Transform EnergiTech")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Active le mode streaming par chunks")
+    parser.add_argument("--input", default=None, help="CSV ou dossier partitionné à transformer (au lieu de Supabase)")
+    parser.add_argument("--weather-dir", default=None, help="Prévisions Arrow (save_columnar) à joindre aux mesures")
+    parser.add_argument("--weather-tz", default="Europe/Paris", help="Fuseau des heures locales des prévisions")
+    parser.add_argument("--weather-method", choices=("backward", "nearest", "linear"), default="linear")
+    parser.add_argument("--weather-sites", default=None, help="JSON {turbine_id: site} (prévisions de plusieurs sites)")
+    parser.add_argument("--weather-by", choices=("location", "source"), default="location",
+                        help="Colonne des prévisions comparée aux sites de --weather-sites")
+    parser.add_argument("--rolling-window", default=None, help="Active la détection glissante par turbine (ex: 1h)")
+    parser.add_argument("--rolling-method", choices=("zscore", "mad"), default="zscore")
+    parser.add_argument("--turbine-medians", action="store_true", help="Imputation par la médiane de chaque turbine")
+    parser.add_argument("--metrics-log", default=None, help="Ajoute les logs JSON des étapes à ce fichier")
+    parser.add_argument("--prometheus-file", default=None, help="Textfile Prometheus (node_exporter) des métriques")
+    parser.add_argument("--profile-dir", default=None, help="Active cProfile + tracemalloc, un profil par étape")
+    parser.add_argument("--load-table", default=None, help="Charge le résultat dans cette table PostgreSQL (DATABASE_URL)")
+    parser.add_argument("--dedup-index", default=None, help="Dossier de l'index des unique_id déjà chargés")
+    args = parser.parse_args()
+
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    weather, options = None, None
+    if args.weather_dir:
+        import json
+        from Extract.extract_api import load_columnar_dir
+        weather = load_columnar_dir(args.weather_dir)
+        if weather.empty:
+            print(f"⚠️ Aucune prévision dans {args.weather_dir}, jointure météo ignorée.")
+            weather = None
+        else:
+            sites = json.loads(Path(args.weather_sites).read_text(encoding="utf-8")) if args.weather_sites else None
+            try:
+                options = weather_options(weather, sites, args.weather_by,
+                                          weather_tz=args.weather_tz, method=args.weather_method)
+            except ValueError as exc:
+                parser.error(f"{exc} (--weather-sites)")
+    run_pipeline(
+        chunk_size=args.chunk_size,
+        source=args.input,
+        weather=weather,
+        weather_options=options,
+        instrumentation=PipelineInstrumentation(args.metrics_log, args.prometheus_file, args.profile_dir),
+        load_table=args.load_table,
+        dedup=args.dedup_index,
+        rolling_outliers={"window": args.rolling_window, "method": args.rolling_method} if args.rolling_window else None,
+        turbine_medians=args.turbine_medians,
+    )
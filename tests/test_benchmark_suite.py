@@ -0,0 +1,27 @@
+# test_benchmark_suite.py
+from benchmarks.suite import STAGES, compare, make_dataset, run_suite
+
+
+def test_compare_flags_only_significant_regressions():
+    baseline = {
+        "clean_data@10000": {"seconds": 1.0, "peak_mb": 100.0},
+        "enrich_data@10000": {"seconds": 0.002, "peak_mb": 1.0},
+    }
+    results = {
+        "clean_data@10000": {"seconds": 1.3, "peak_mb": 105.0},
+        # +150 % mais sous le bruit de mesure absolu
+        "enrich_data@10000": {"seconds": 0.005, "peak_mb": 1.5},
+        "run_pipeline@10000": {"seconds": 9.0},
+    }
+    assert compare(results, baseline, threshold=0.2) == [("clean_data@10000", "seconds", 1.0, 1.3)]
+    assert compare(results, baseline, threshold=0.5) == []
+
+
+def test_run_suite_records_every_stage():
+    assert len(make_dataset(3000)) == 3000
+    results = run_suite([3000], repeat=1, memory=True, pipeline=False, log=lambda _: None)
+
+    assert list(results) == [f"{name}@3000" for name, _ in STAGES]
+    for entry in results.values():
+        assert entry["rows"] == 3000
+        assert entry["seconds"] > 0 and entry["peak_mb"] >= 0
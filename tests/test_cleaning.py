@@ -72,3 +72,115 @@ def test_clean_data_without_anomalies():
 
     # Vérifie que rien n'est modifié
     assert result.equals(df)
+
+def test_detect_rolling_outliers_per_turbine():
+    from Transform.data_cleaning import detect_rolling_outliers
+
+    # Deux turbines à des niveaux de vibration très différents, une pointe sur T002
+    ts = pd.date_range("2025-11-20T15:00:00", periods=60, freq="min")
+    vib_t1 = [2.0 + 0.1 * (i % 5) for i in range(60)]
+    vib_t2 = [20.0 + 0.1 * (i % 5) for i in range(60)]
+    vib_t2[45] = 60.0
+    df = pd.DataFrame({
+        "turbine_id": ["T001"] * 60 + ["T002"] * 60,
+        "ts_utc": list(ts.strftime("%Y-%m-%dT%H:%M:%S")) * 2,
+        "vibration_mm_s": vib_t1 + vib_t2,
+    }).sample(frac=1.0, random_state=0)  # ordre quelconque en entrée
+
+    for method in ("zscore", "mad"):
+        result = detect_rolling_outliers(df.copy(), window="30min", method=method, min_periods=5)
+        flagged = result[result["vibration_mm_s_anomaly"]]
+        assert flagged["turbine_id"].tolist() == ["T002"]
+        assert flagged["vibration_mm_s"].tolist() == [60.0]
+
+    # Seuils fixes inchangés, détection glissante optionnelle
+    result = detect_outliers(df.copy(), rolling_window="30min", min_periods=5)
+    assert {"wind_anomaly", "temp_anomaly", "vibration_mm_s_anomaly"} <= set(result.columns)
+
+
+def test_clean_data_mutates_in_place_and_imputes_per_turbine():
+    df = pd.DataFrame({
+        "turbine_id": ["T1", "T1", "T2", "T2", "T3"],
+        "wind_speed": [20, 200, 10, 300, 400],
+        "temperature": [10.0, 12.0, -100.0, 14.0, 16.0],
+        "other": list("abcde"),
+    }, index=[10, 11, 12, 13, 14])
+    stats = {"wind_speed": {"T1": 21.5, "T2": 11.0}, "temperature": 5.0}
+
+    result = clean_data(df, stats=stats)
+
+    # Contrat de mutation : même objet, seules les cellules aberrantes réécrites
+    assert result is df
+    assert df["wind_speed"].dtype == "float64"  # médiane par turbine -> float
+    # T3 inconnue des stats -> médiane de la colonne avant correction
+    assert df["wind_speed"].tolist() == [20.0, 21.5, 10.0, 11.0, 200.0]
+    assert df["temperature"].tolist() == [10.0, 12.0, 5.0, 14.0, 16.0]
+    assert df["other"].tolist() == list("abcde")
+
+    dropped = clean_data(df.copy(), drop_anomalies=True)
+    assert dropped["other"].tolist() == ["a"]
+    assert dropped.index.tolist() == [0]
+
+
+def test_clean_data_keeps_integer_column_for_integer_median():
+    df = pd.DataFrame({"wind_speed": [20, 200, 10], "temperature": [10, 20, 30]})
+    result = clean_data(df)
+    assert result["wind_speed"].dtype == "int64"
+    assert result["wind_speed"].tolist() == [20, 20, 10]
+    decimal = clean_data(pd.DataFrame({"wind_speed": [20, 200, 11, 13]}))
+    assert decimal["wind_speed"].dtype == "float64"
+    assert decimal["wind_speed"].tolist() == [20.0, 16.5, 11.0, 13.0]
+
+
+def test_clean_data_per_turbine_medians_on_float32_columns():
+    import numpy as np
+    from Transform.unit_conversion import convert_units
+
+    df = pd.DataFrame({
+        "turbine_id": ["A", "A", "B"],
+        "wind_speed_kmh": np.array([18.0, 250.0, 300.0], dtype=np.float32),
+    })
+    df = convert_units(df)
+    assert df["wind_speed_ms"].dtype == "float32"
+    median = float(np.median(df["wind_speed_ms"]))
+
+    result = clean_data(df, stats={"wind_speed_ms": {"A": 10.3}})
+    assert result["wind_speed_ms"].dtype == "float32"
+    # B inconnue des stats -> médiane de la colonne
+    expected = np.array([5.0, 10.3, median], dtype=np.float32)
+    assert result["wind_speed_ms"].tolist() == pytest.approx(expected.tolist())
+
+
+@pytest.mark.parametrize("dtype, expected", [
+    ("float16", "float16"),
+    ("Float32", "Float32"),
+    ("Int64", "Float64"),
+])
+def test_clean_data_writes_medians_in_column_dtype(dtype, expected):
+    df = pd.DataFrame({
+        "turbine_id": ["A", "A", "B", "B"],
+        "wind_speed": pd.array([20, 200, 11, None], dtype=dtype),
+    })
+    result = clean_data(df, stats={"wind_speed": {"A": 21.5}})
+    assert str(result["wind_speed"].dtype) == expected
+    assert result["wind_speed"].tolist()[:3] == [20.0, 21.5, 11.0]
+    assert pd.isna(result["wind_speed"].iloc[3])
+
+    # Médiane entière : la colonne nullable reste entière
+    ints = clean_data(pd.DataFrame({"wind_speed": pd.array([20, 200, None], dtype="Int64")}), stats={"wind_speed": 30})
+    assert str(ints["wind_speed"].dtype) == "Int64"
+    assert ints["wind_speed"].tolist()[:2] == [20, 30]
+
+
+def test_rolling_outliers_exclude_the_current_point():
+    from Transform.data_cleaning import detect_rolling_outliers
+
+    # Turbine peu bavarde : 6 mesures puis une pointe, fenêtre de 7 points au plus
+    df = pd.DataFrame({
+        "turbine_id": ["T1"] * 7,
+        "ts_utc": pd.date_range("2025-01-01", periods=7, freq="5min", tz="UTC"),
+        "vibration_mm_s": [2.0, 2.1, 1.9, 2.0, 2.2, 1.8, 40.0],
+    })
+    for method in ("zscore", "mad"):
+        result = detect_rolling_outliers(df.copy(), window="1h", method=method, min_periods=5)
+        assert result["vibration_mm_s_anomaly"].tolist() == [False] * 6 + [True]
@@ -0,0 +1,99 @@
+# test_dashboard.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from Graphics import dashboard_generator as dg
+
+
+@pytest.fixture
+def measurements():
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame({
+        "meas_id": np.arange(n),
+        "turbine_id": np.array(["T001", "T002", "T003"])[np.arange(n) % 3],
+        "ts_utc": pd.date_range("2025-01-01", periods=n // 3, freq="min").repeat(3).strftime("%Y-%m-%dT%H:%M:%S+0000"),
+        "wind_speed_mps": np.where(np.arange(n) % 50 == 0, np.nan, rng.uniform(0, 20, n)),
+        "temperature_k": rng.normal(285, 3, n),
+        "wind_anomaly": np.arange(n) % 7 == 0,
+    })
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros(10_000)
+    y[4321] = 100.0
+    keep = dg.lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 9_999
+    assert 4321 in keep
+    assert (np.diff(keep) > 0).all()
+    assert len(dg.lttb(x[:50], y[:50], 100)) == 50
+
+
+def test_minmax_buckets_envelope():
+    x = np.arange(1000)
+    y = np.sin(x / 10.0)
+    bx, low, high = dg.minmax_buckets(x, y, 10)
+    assert len(bx) == 10
+    assert low.min() == y.min() and high.max() == y.max()
+
+
+def test_summarize_matches_groupby(measurements):
+    times = dg._time_axis(measurements["ts_utc"])
+    table, overall = dg.summarize(measurements, "turbine_id", times=times)
+    expected = measurements.groupby("turbine_id")["wind_speed_mps"].agg(["mean", "min", "max"])
+
+    assert table.loc[expected.index, "wind_speed_mps_mean"].tolist() == pytest.approx(expected["mean"].tolist())
+    assert table.loc[expected.index, "wind_speed_mps_max"].tolist() == expected["max"].tolist()
+    assert table["rows"].sum() == len(measurements)
+    assert table["wind_speed_mps_missing"].sum() == measurements["wind_speed_mps"].isna().sum()
+    assert table.loc["T001", "first_ts"] == pd.Timestamp("2025-01-01")
+    assert overall.loc["wind_speed_mps", "std"] == pytest.approx(measurements["wind_speed_mps"].std())
+    assert overall.loc["wind_anomaly", "anomalies"] == measurements["wind_anomaly"].sum()
+
+
+def test_dashboard_size_is_bounded(measurements, tmp_path):
+    big = pd.concat([measurements] * 10, ignore_index=True)
+    out = dg.generate_dashboard(big, tmp_path / "dashboard.html")
+
+    page = (tmp_path / "dashboard.html").read_text(encoding="utf-8")
+    assert out == str(tmp_path / "dashboard.html")
+    assert page.count("<details>") == dg.SAMPLE_ROWS // dg.PAGE_ROWS
+    assert len(page) < 500_000
+    files = sorted(p.name.split("-")[0] for p in (tmp_path / "dashboard_files").iterdir())
+    assert files == ["fleet", "turbine_T001", "turbine_T002", "turbine_T003", "wind_speed_hist"]
+
+
+def test_dashboard_redraws_only_changed_turbines(measurements, tmp_path, capsys):
+    dg.generate_dashboard(measurements, tmp_path / "dashboard.html", workers=1)
+    before = {p.name for p in (tmp_path / "dashboard_files").iterdir()}
+    assert "5 rendues, 0 reprises" in capsys.readouterr().out
+
+    changed = measurements.copy()
+    changed.loc[changed["turbine_id"] == "T002", "temperature_k"] += 1.0
+    dg.generate_dashboard(changed, tmp_path / "dashboard.html", workers=1)
+    after = {p.name for p in (tmp_path / "dashboard_files").iterdir()}
+    # Turbine T002 et moyenne de la flotte redessinées ; l'image périmée est supprimée
+    assert "2 rendues, 3 reprises" in capsys.readouterr().out
+    assert len(after) == 5
+    assert {n.split("-")[0] for n in before - after} == {"fleet", "turbine_T002"}
+
+
+def test_dashboard_without_time_or_turbine(tmp_path):
+    df = pd.DataFrame({"wind_speed": [1.0, 2.0, None], "temperature": [10.0, 11.0, 12.0]})
+    dg.generate_dashboard(df, tmp_path / "dashboard.html")
+    assert "Aucun graphique disponible" in (tmp_path / "dashboard.html").read_text(encoding="utf-8")
+
+
+def test_dashboard_keeps_one_chart_per_turbine_name(measurements, tmp_path):
+    df = measurements.copy()
+    df["turbine_id"] = df["turbine_id"].map({"T001": "T 1", "T002": "T/1", "T003": "T_1"})
+    dg.generate_dashboard(df, tmp_path / "dashboard.html", workers=1)
+
+    charts = [p.name for p in (tmp_path / "dashboard_files").iterdir() if p.name.startswith("turbine_")]
+    assert len(charts) == 3
+    assert dg._slug("T 1") != dg._slug("T/1") and dg._slug("T_1") == "T_1"
+    page = (tmp_path / "dashboard.html").read_text(encoding="utf-8")
+    assert all(name in page for name in charts)
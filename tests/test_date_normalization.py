@@ -1,14 +1,82 @@
-from datetime import datetime
+# test_date_normalization.py
 import pandas as pd
-import pytz
-from typing import Optional
-
-def normalize_timestamp_column(df: pd.DataFrame, column: str = "ts_utc") -> pd.DataFrame:
-    series = pd.to_datetime(df[column], errors="coerce", utc=True)
-    paris_tz = pytz.timezone("Europe/Paris")
-    series = series.dt.tz_convert(paris_tz)
-    df[column] = series.dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-    return df
-
-def normalize_dates(df: pd.DataFrame, column: str = "ts_utc") -> pd.DataFrame:
-    return normalize_timestamp_column(df, column=column)
+import pytest
+from Transform.date_normalization import (
+    normalize_timestamp_column,
+    normalize_dates,
+    format_timestamps,
+    guess_timestamp_format,
+    parse_timestamps,
+)
+
+def test_normalize_timestamp_column():
+    # Test avec des timestamps valides
+    df = pd.DataFrame({
+        "ts_utc": [
+            "2025-01-01T12:00:00Z",
+            "2025-01-01 15:30:00+00:00",
+            "2025-01-01T18:45:00+02:00"
+        ]
+    })
+    result = normalize_timestamp_column(df, "ts_utc")
+
+    # Vérifie que la colonne est bien formatée et convertie en Europe/Paris
+    assert all(isinstance(ts, str) for ts in result["ts_utc"])
+    assert all("+" in ts or ts.endswith("Z") for ts in result["ts_utc"])  # Format ISO avec offset
+    assert all(ts.endswith("0100") or ts.endswith("0200") for ts in result["ts_utc"])  # Offset Europe/Paris
+
+    # Test avec des timestamps invalides
+    df_with_invalid = pd.DataFrame({
+        "ts_utc": [
+            "2025-01-01T12:00:00Z",
+            "invalid date",
+            "2025-01-01 15:30:00+00:00"
+        ]
+    })
+    result_with_invalid = normalize_timestamp_column(df_with_invalid, "ts_utc")
+
+    # Vérifie que les timestamps invalides deviennent NaT (puis sont formatés en chaîne vide ou NaT)
+    assert pd.isna(pd.to_datetime(result_with_invalid["ts_utc"].iloc[1], errors="coerce"))
+
+def test_normalize_dates():
+    # Test que normalize_dates est un wrapper pour normalize_timestamp_column
+    df = pd.DataFrame({
+        "ts_utc": [
+            "2025-01-01T12:00:00Z",
+            "2025-01-01 15:30:00+00:00",
+            "invalid date"
+        ]
+    })
+    result = normalize_dates(df, "ts_utc")
+
+    # Vérifie que les dates valides sont bien formatées et converties en Europe/Paris
+    valid = result["ts_utc"].iloc[:2]
+    assert all(isinstance(ts, str) for ts in valid)
+    assert all("+" in ts or ts.endswith("Z") for ts in valid)  # Format ISO avec offset
+    assert pd.isna(pd.to_datetime(result["ts_utc"].iloc[2], errors="coerce"))  # Timestamp invalide
+
+def test_normalize_dates_keeps_datetime():
+    # Mode natif : colonne datetime64[ns] tz-aware, formatée seulement à l'export
+    df = pd.DataFrame({"ts_utc": ["2025-01-01T12:00:00", "2025-07-01T12:00:00", "invalid date"]})
+    result = normalize_dates(df, "ts_utc", as_string=False, source="test_keeps_datetime")
+
+    assert str(result["ts_utc"].dtype) == "datetime64[ns, Europe/Paris]"
+    assert result["ts_utc"].iloc[0] == pd.Timestamp("2025-01-01T13:00:00+01:00")
+    assert pd.isna(result["ts_utc"].iloc[2])
+
+    # Même texte que le mode chaîne historique
+    exported = format_timestamps(result["ts_utc"])
+    assert exported.iloc[:2].tolist() == ["2025-01-01T13:00:00+0100", "2025-07-01T14:00:00+0200"]
+    assert exported.iloc[:2].tolist() == result["ts_utc"].iloc[:2].dt.strftime("%Y-%m-%dT%H:%M:%S%z").tolist()
+    assert pd.isna(exported.iloc[2])
+
+def test_guess_timestamp_format_is_cached_per_source():
+    values = pd.Series(["2025-11-20T15:05:00", "2025-11-20T15:06:00"])
+    assert guess_timestamp_format(values, source="test_cache") == "%Y-%m-%dT%H:%M:%S"
+    # Le format retenu pour la source est réutilisé, et les lignes hors format sont rattrapées
+    other = pd.Series(["2025-11-20 15:07:00+00:00", "2025-11-20T15:08:00"])
+    assert guess_timestamp_format(other, source="test_cache") == "%Y-%m-%dT%H:%M:%S"
+    parsed = parse_timestamps(other, source="test_cache")
+    assert parsed.notna().all()
+    # Formats mélangés -> parseur ISO générique
+    assert guess_timestamp_format(pd.Series(["2025-01-01T12:00:00Z", "2025-01-01 15:30:00"])) is None
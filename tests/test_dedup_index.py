@@ -0,0 +1,51 @@
+# test_dedup_index.py
+import numpy as np
+import pandas as pd
+
+from Transform import dedup_index
+from Transform.dedup_index import DedupIndex, drop_known
+
+
+def _ids(start, stop):
+    return pd.Series([f"id-{i}" for i in range(start, stop)])
+
+
+def test_contains_after_add_and_reopen(tmp_path):
+    index = DedupIndex(tmp_path, capacity=1000)
+    assert index.add(_ids(0, 500)) == 500
+    assert index.add(_ids(250, 600)) == 100  # seuls les nouveaux IDs sont ajoutés
+    assert len(index) == 600
+
+    reopened = DedupIndex(tmp_path)
+    assert reopened.contains(_ids(0, 600)).all()
+    assert not reopened.contains(_ids(600, 1000)).any()
+
+
+def test_false_positive_rate_matches_parameters(tmp_path):
+    index = DedupIndex(tmp_path, capacity=20_000, fp_rate=0.02)
+    index.add(_ids(0, 20_000))
+    probe = _ids(20_000, 120_000)
+    assert not index.contains(probe).any()  # exact malgré les faux positifs du filtre
+
+    stats = index.stats()
+    assert 0.01 < stats["measured_fp_rate"] < 0.03
+    assert abs(stats["expected_fp_rate"] - 0.02) < 0.005
+    assert stats["bytes_per_million"] == round((stats["bloom_bytes"] + 8 * 20_000) / 20_000 * 1e6)
+
+
+def test_compaction_grows_bloom(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup_index, "MAX_SEGMENTS", 2)
+    index = DedupIndex(tmp_path, capacity=100)
+    for start in range(0, 400, 100):
+        index.add(_ids(start, start + 100))
+    assert index.meta["capacity"] >= 400
+    assert len(index.meta["segments"]) <= 2
+    assert sorted(p.name for p in tmp_path.glob("seg-*.npy")) == sorted(index.meta["segments"])
+    assert DedupIndex(tmp_path).contains(_ids(0, 400)).all()
+
+
+def test_drop_known(tmp_path):
+    index = DedupIndex(tmp_path, capacity=100)
+    index.add(["a", "b"])
+    df = pd.DataFrame({"unique_id": ["a", "c", "b", "d"], "v": np.arange(4)})
+    assert drop_known(df, index)["unique_id"].tolist() == ["c", "d"]
@@ -1,40 +1,144 @@
+# test_enrichment.py
 import pandas as pd
-import hashlib
-
-WIND_DIRECTIONS = {
-    "N": "North",
-    "S": "South",
-    "E": "East",
-    "W": "West",
-    "NE": "Northeast",
-    "NW": "Northwest",
-    "SE": "Southeast",
-    "SW": "Southwest",
-}
-
-def normalize_wind_direction(direction):
-    if pd.isnull(direction):
-        return None
-    direction = str(direction).upper().strip()
-    return WIND_DIRECTIONS.get(direction, direction)
-
-def generate_unique_id(row):
-    base = f"{row.get('ts_utc', '')}-{row.get('station_id', '')}"
-    return hashlib.md5(base.encode()).hexdigest()
-
-def add_turbine_id(df: pd.DataFrame) -> pd.DataFrame:
-    if "station_id" in df.columns:
-        df["turbine_id"] = df["station_id"]
-    else:
-        df["turbine_id"] = df.index + 1
-    return df
-
-def enrich_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    if "wind_direction" in df.columns:
-        df["wind_direction_full"] = df["wind_direction"].apply(normalize_wind_direction)
-    df = add_turbine_id(df)
-    df["unique_id"] = df.apply(generate_unique_id, axis=1)
-    return df
-
-def enrich_data(df: pd.DataFrame) -> pd.DataFrame:
-    return enrich_dataframe(df)
+import pytest
+from Transform.enrichment import (
+    normalize_wind_direction,
+    generate_unique_id,
+    generate_unique_ids,
+    add_turbine_id,
+    enrich_dataframe,
+    enrich_data,
+    WIND_DIRECTIONS,
+)
+
+def test_normalize_wind_direction():
+    # Test avec des directions connues
+    assert normalize_wind_direction("N") == "North"
+    assert normalize_wind_direction("S") == "South"
+    assert normalize_wind_direction("NE") == "Northeast"
+    assert normalize_wind_direction("SW") == "Southwest"
+
+    # Test avec des directions en minuscules
+    assert normalize_wind_direction("ne") == "Northeast"
+    assert normalize_wind_direction(" s ") == "South"
+
+    # Test avec une direction inconnue
+    assert normalize_wind_direction("XYZ") == "XYZ"
+
+    # Test avec une valeur nulle
+    assert normalize_wind_direction(None) is None
+    assert pd.isna(normalize_wind_direction(pd.NA))
+
+def test_generate_unique_id():
+    # Test avec un dictionnaire contenant les clés attendues
+    row = {"ts_utc": "2025-01-01T12:00:00Z", "station_id": 1}
+    unique_id = generate_unique_id(row)
+    assert len(unique_id) == 32  # MD5 produit un hash de 32 caractères
+
+    # Test avec une clé manquante
+    row_missing = {"ts_utc": "2025-01-01T12:00:00Z"}
+    unique_id_missing = generate_unique_id(row_missing)
+    assert len(unique_id_missing) == 32
+
+def test_generate_unique_ids_matches_row_wise():
+    # Les IDs calculés en bloc doivent être identiques à ceux de generate_unique_id
+    df = pd.DataFrame({
+        "ts_utc": ["2025-01-01T12:00:00Z", None, "2025-01-01T14:00:00+01:00", "2025-01-01T15:00:00Z"],
+        "station_id": [1, 2, None, 4],
+    })
+    expected = df.apply(generate_unique_id, axis=1).tolist()
+    assert generate_unique_ids(df).tolist() == expected
+    assert generate_unique_ids(df, workers=3).tolist() == expected
+
+    # Colonne manquante -> même convention que row.get(..., '')
+    df_no_station = pd.DataFrame({"ts_utc": ["2025-01-01T12:00:00Z"]})
+    assert generate_unique_ids(df_no_station).iloc[0] == generate_unique_id({"ts_utc": "2025-01-01T12:00:00Z"})
+
+    # Caractères non ASCII -> repli élément par élément, résultat identique
+    df_utf8 = pd.DataFrame({"ts_utc": ["2025-01-01T12:00:00Z"], "station_id": ["Éole"]})
+    assert generate_unique_ids(df_utf8).tolist() == df_utf8.apply(generate_unique_id, axis=1).tolist()
+
+def test_add_turbine_id():
+    # Test avec un DataFrame contenant 'station_id'
+    df = pd.DataFrame({"station_id": [1, 2, 3]})
+    result = add_turbine_id(df)
+    assert "turbine_id" in result.columns
+    assert result["turbine_id"].tolist() == [1, 2, 3]
+
+    # Test avec un DataFrame sans 'station_id'
+    df_no_id = pd.DataFrame({"other_col": [1, 2, 3]})
+    result_no_id = add_turbine_id(df_no_id)
+    assert "turbine_id" in result_no_id.columns
+    assert result_no_id["turbine_id"].tolist() == [1, 2, 3]  # fallback
+
+    # Test avec un DataFrame déjà porteur de 'turbine_id' (flux raw_measurements)
+    df_turbine = pd.DataFrame({"turbine_id": ["T001", "T002"]})
+    assert add_turbine_id(df_turbine)["turbine_id"].tolist() == ["T001", "T002"]
+
+    # turbine_id catégoriel (schéma Extract.schema) : le dtype est conservé, trous comblés
+    df_cat = pd.DataFrame({"turbine_id": pd.Categorical(["T001", None, "T001"])})
+    result_cat = add_turbine_id(df_cat)
+    assert isinstance(result_cat["turbine_id"].dtype, pd.CategoricalDtype)
+    assert result_cat["turbine_id"].tolist() == ["T001", 2, "T001"]
+
+def test_enrich_dataframe():
+    # Test avec un DataFrame contenant toutes les colonnes attendues
+    df = pd.DataFrame({
+        "ts_utc": ["2025-01-01T12:00:00Z", "2025-01-01T14:00:00Z"],
+        "station_id": [1, 2],
+        "wind_direction": ["NE", "s"]
+    })
+    result = enrich_dataframe(df)
+    assert "wind_direction_full" in result.columns
+    assert "turbine_id" in result.columns
+    assert "unique_id" in result.columns
+    assert result["wind_direction_full"].tolist() == ["Northeast", "South"]
+    assert result["turbine_id"].tolist() == [1, 2]
+    assert len(result["unique_id"].iloc[0]) == 32
+
+    # Test avec un DataFrame contenant des valeurs nulles
+    df_with_nan = pd.DataFrame({
+        "ts_utc": ["2025-01-01T12:00:00Z", None],
+        "station_id": [1, None],
+        "wind_direction": ["NE", None]
+    })
+    result_with_nan = enrich_dataframe(df_with_nan)
+    assert pd.isna(result_with_nan["wind_direction_full"].iloc[1])
+    assert result_with_nan["turbine_id"].tolist() == [1, 2]  # fallback
+    assert len(result_with_nan["unique_id"].iloc[0]) == 32
+
+def test_enrich_data():
+    # Test que la fonction enrich_data est un wrapper pour enrich_dataframe
+    df = pd.DataFrame({
+        "ts_utc": ["2025-01-01T12:00:00Z", "2025-01-01T14:00:00Z"],
+        "station_id": [1, 2],
+        "wind_direction": ["NE", "s"]
+    })
+    result = enrich_data(df)
+    assert "wind_direction_full" in result.columns
+    assert "turbine_id" in result.columns
+    assert "unique_id" in result.columns
+    assert result["wind_direction_full"].tolist() == ["Northeast", "South"]
+    assert result["turbine_id"].tolist() == [1, 2]
+    assert len(result["unique_id"].iloc[0]) == 32
+
+def test_unique_id_stable_with_datetime_ts():
+    # ts_utc gardé en datetime64 (normalize_dates as_string=False) -> mêmes IDs qu'en mode texte
+    ts = pd.to_datetime(pd.Series(["2025-01-01T12:00:00Z", None]), utc=True).dt.tz_convert("Europe/Paris")
+    df_dt = pd.DataFrame({"ts_utc": ts, "station_id": [1, 2]})
+    df_str = pd.DataFrame({"ts_utc": ["2025-01-01T13:00:00+0100", float("nan")], "station_id": [1, 2]})
+    assert generate_unique_ids(df_dt).tolist() == generate_unique_ids(df_str).tolist()
+    assert df_dt.apply(generate_unique_id, axis=1).tolist() == generate_unique_ids(df_str).tolist()
+
+def test_unique_ids_distinguish_turbines_without_station_id():
+    # Flux raw_measurements : turbine_id identifie la source quand station_id est absent
+    df = pd.DataFrame({
+        "ts_utc": ["2025-01-01T12:00:00Z"] * 3,
+        "turbine_id": ["T001", "T002", "T003"],
+    })
+    ids = enrich_data(df.copy())["unique_id"]
+    assert ids.is_unique
+    assert ids.tolist() == df.apply(generate_unique_id, axis=1).tolist()
+    # station_id reste prioritaire (IDs historiques inchangés)
+    with_station = df.assign(station_id=[1, 1, 1])
+    assert generate_unique_ids(with_station).nunique() == 1
@@ -0,0 +1,71 @@
+# test_extract_csv.py
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from Extract.extract_csv import generate_production, read_production, write_production
+
+
+def _generate(**kwargs):
+    return pd.concat(generate_production(date(2025, 1, 1), date(2025, 4, 1), seed=7, **kwargs), ignore_index=True)
+
+
+def test_generate_production_is_reproducible_per_turbine():
+    full = _generate(n_turbines=6, chunk_rows=200)
+    # Deux workers qui génèrent chacun une tranche de la flotte
+    parts = pd.concat([_generate(n_turbines=3), _generate(n_turbines=3, first_turbine=3)], ignore_index=True)
+
+    assert len(full) == 6 * 90
+    pd.testing.assert_frame_equal(full, parts)
+    assert full["turbin_id"].unique().tolist() == ["T001", "T002", "T003", "T004", "T005", "T006"]
+
+
+def test_generate_production_split_fleet_beyond_999_turbines():
+    kwargs = dict(start=date(2025, 1, 1), end=date(2025, 1, 3), seed=7)
+    full = pd.concat(generate_production(n_turbines=1200, **kwargs), ignore_index=True)
+    parts = pd.concat([
+        *generate_production(n_turbines=600, fleet_size=1200, **kwargs),
+        *generate_production(n_turbines=600, first_turbine=600, fleet_size=1200, **kwargs),
+    ], ignore_index=True)
+
+    pd.testing.assert_frame_equal(full, parts)
+    assert full["turbin_id"].iloc[0] == "T0001" and full["turbin_id"].iloc[-1] == "T1200"
+    # Capacités nominales par indice : mêmes tirages quelle que soit la largeur des identifiants
+    small = pd.concat(generate_production(n_turbines=2, **kwargs), ignore_index=True)
+    assert small["energie_kWh"].tolist() == full["energie_kWh"].iloc[:len(small)].tolist()
+
+
+def test_generate_production_flags_and_missing_values():
+    df = _generate(n_turbines=50)
+    both = (df["arret_planifie"] == 1) & (df["arret_non_planifie"] == 1)
+    assert not both.fillna(False).any()
+    stopped = (df["arret_planifie"] == 1) | (df["arret_non_planifie"] == 1)
+    assert (df.loc[stopped.fillna(False), "energie_kWh"].dropna() == 0).all()
+    assert 0.03 < df["energie_kWh"].isna().mean() < 0.07
+
+
+def test_write_production_csv_chunks(tmp_path):
+    out = tmp_path / "production.csv"
+    rows = write_production(generate_production(date(2025, 1, 1), date(2025, 2, 1), n_turbines=4, chunk_rows=40), out)
+
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert rows == 4 * 31 == len(lines) - 1
+    assert lines[0] == "date;turbin_id;energie_kWh;arret_planifie;arret_non_planifie"
+    assert sum(line.startswith("date;") for line in lines) == 1
+
+
+def test_read_production_applies_schema(tmp_path):
+    out = tmp_path / "production.csv"
+    write_production(generate_production(date(2025, 1, 1), date(2025, 2, 1), n_turbines=4, seed=7), out)
+
+    df = read_production(out)
+    assert len(df) == 4 * 31
+    assert str(df["date"].dtype) == "datetime64[ns]"
+    assert isinstance(df["turbin_id"].dtype, pd.CategoricalDtype)
+    assert df["energie_kWh"].dtype == "float32"
+    assert str(df["arret_planifie"].dtype) == "Int8" and str(df["arret_non_planifie"].dtype) == "Int8"
+    # Valeurs manquantes conservées (<NA> / NaN), pas de conversion en 0
+    expected = pd.concat(generate_production(date(2025, 1, 1), date(2025, 2, 1), n_turbines=4, seed=7), ignore_index=True)
+    assert df["arret_planifie"].isna().tolist() == expected["arret_planifie"].isna().tolist()
+    assert df["energie_kWh"].tolist() == pytest.approx(expected["energie_kWh"].astype("float64").tolist(), nan_ok=True)
@@ -0,0 +1,192 @@
+# test_extract_db.py
+import io
+import time
+import types
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import Extract.extract_db as extract_db
+
+
+class FakeQuery:
+    """Sous-ensemble du query builder postgrest utilisé par extract_db."""
+
+    def __init__(self, client):
+        self.client = client
+        self.filters = []
+        self.columns = None
+        self.descending = False
+        self.n = None
+        self.as_csv = False
+
+    def select(self, columns):
+        self.columns = None if columns == "*" else columns.split(",")
+        return self
+
+    def _filter(self, op):
+        def apply(column, value):
+            self.filters.append((column, op, value))
+            return self
+        return apply
+
+    def __getattr__(self, name):
+        ops = {"gt": lambda a, b: a > b, "gte": lambda a, b: a >= b, "lt": lambda a, b: a < b}
+        if name in ops:
+            return self._filter(ops[name])
+        raise AttributeError(name)
+
+    def order(self, column, desc=False):
+        self.descending = desc
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def csv(self):
+        self.as_csv = True
+        return self
+
+    def execute(self):
+        self.client.requests += 1
+        df = self.client.table_df
+        for column, op, value in self.filters:
+            df = df[op(df[column], value)]
+        df = df.sort_values("meas_id", ascending=not self.descending)
+        if self.n is not None:
+            df = df.iloc[: self.n]
+        if self.columns:
+            df = df[self.columns]
+        self.client.rows_sent += len(df)
+        if self.as_csv:
+            buffer = io.StringIO()
+            df.to_csv(buffer, index=False)
+            return types.SimpleNamespace(data=buffer.getvalue() if len(df) else [])
+        return types.SimpleNamespace(data=df.to_dict("records"))
+
+
+class FakeClient:
+    def __init__(self, table_df):
+        self.table_df = table_df
+        self.requests = 0
+        self.rows_sent = 0
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+def make_rows(start_id, n, minutes_ago):
+    now = datetime.now(timezone.utc)
+    return pd.DataFrame({
+        "meas_id": range(start_id, start_id + n),
+        "turbine_id": ["T001", "T002"] * (n // 2),
+        "ts_utc": [(now - timedelta(minutes=minutes_ago - i)).isoformat() for i in range(n)],
+        "wind_speed_mps": [5.0] * n,
+        "temperature_k": [285.0] * n,
+        "vibration_mm_s": [4.0] * n,
+        "consumption_kwh": [1000.0] * n,
+        "raw_payload": ["{}"] * n,
+    })
+
+
+@pytest.fixture
+def local_tz(monkeypatch):
+    # Heure locale décalée de l'UTC : la fenêtre de 24 h ne doit pas en dépendre
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    # 2 000 lignes dont 400 hors de la fenêtre de 24 h
+    client = FakeClient(make_rows(1, 2000, minutes_ago=24 * 60 + 400))
+    monkeypatch.setattr(extract_db, "get_client", lambda: client)
+    return client
+
+
+def test_import_has_no_side_effect():
+    # Aucun client ni requête à l'import ; plus de DataFrame global
+    assert extract_db._client is None
+    assert not hasattr(extract_db, "df")
+
+
+def test_fetch_df_pages_and_projection(fake_client):
+    df = extract_db.fetch_df(page_size=300, max_workers=3)
+
+    assert len(df) == 1599
+    assert df["meas_id"].is_monotonic_increasing
+    assert df["meas_id"].iloc[0] == 402
+    # Projection : colonne brute non demandée, types appliqués au parsing
+    assert "raw_payload" not in df.columns
+    assert df["meas_id"].dtype == "int64"
+    assert df["wind_speed_mps"].dtype == "float32"
+    assert isinstance(df["turbine_id"].dtype, pd.CategoricalDtype)
+    assert str(df["ts_utc"].dtype) == "datetime64[ns, UTC]"
+    # 2 requêtes de bornes + ceil(1599 / 300) pages
+    assert fake_client.requests == 2 + 6
+
+
+def test_fetch_df_sparse_ids_send_no_empty_pages(fake_client):
+    # 1 000 lignes sur une plage de 10 millions d'identifiants (suppressions)
+    rows = make_rows(1, 1000, minutes_ago=60)
+    rows["meas_id"] = [i * 10_000 for i in range(1, 1001)]
+    fake_client.table_df = rows
+
+    df = extract_db.fetch_df(columns=["ts_utc", "wind_speed_mps"], page_size=300, max_workers=3)
+
+    assert len(df) == 1000
+    assert df.columns.tolist() == ["ts_utc", "wind_speed_mps"]
+    # 2 bornes + 3 tranches de ~334 lignes : 2 pages chacune, pas une requête par tranche de 300 ids
+    assert fake_client.requests == 2 + 6
+
+
+def test_fetch_incremental_only_downloads_new_rows(fake_client, tmp_path):
+    paths = dict(cache_path=tmp_path / "cache.csv", watermark_path=tmp_path / "watermark.json")
+    first = extract_db.fetch_incremental(**paths)
+    assert len(first) == 1599
+    assert extract_db.load_watermark(paths["watermark_path"])["meas_id"] == 2000
+
+    # Nouvelles lignes côté serveur : seules celles-ci transitent
+    fake_client.table_df = pd.concat([fake_client.table_df, make_rows(2001, 10, minutes_ago=5)], ignore_index=True)
+    fake_client.rows_sent = 0
+    second = extract_db.fetch_incremental(**paths)
+
+    assert len(second) == 1609
+    assert second["meas_id"].is_unique
+    # Cache relu et pages fusionnés sans perdre le schéma
+    assert isinstance(second["turbine_id"].dtype, pd.CategoricalDtype)
+    assert second["temperature_k"].dtype == "float32"
+    assert fake_client.rows_sent == 2 + 10  # 2 bornes + 10 nouvelles lignes
+    assert extract_db.load_watermark(paths["watermark_path"])["meas_id"] == 2010
+
+
+def test_default_window_is_utc_whatever_the_local_time(fake_client, local_tz):
+    assert len(extract_db.fetch_df(page_size=500)) == 1599
+    assert sum(len(c) for c in extract_db.iter_df_chunks(chunk_size=500)) == 1599
+
+
+def test_fetch_incremental_window_is_utc(fake_client, local_tz, tmp_path):
+    paths = dict(cache_path=tmp_path / "cache.csv", watermark_path=tmp_path / "watermark.json")
+    assert len(extract_db.fetch_incremental(**paths)) == 1599
+    # Relecture du cache : même fenêtre, aucune nouvelle ligne téléchargée
+    fake_client.rows_sent = 0
+    assert len(extract_db.fetch_incremental(**paths)) == 1599
+    assert fake_client.rows_sent == 0
+
+
+def test_utc_timestamp_accepts_naive_and_aware_values():
+    aware = datetime(2025, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert extract_db._utc_timestamp(aware) == pd.Timestamp("2025-01-01T12:00:00Z")
+    assert extract_db._utc_timestamp(datetime(2025, 1, 1, 12, 0)) == pd.Timestamp("2025-01-01T12:00:00Z")
+
+
+def test_watermark_round_trip(tmp_path):
+    path = tmp_path / "state" / "watermark.json"
+    assert extract_db.load_watermark(path) == {}
+    extract_db.save_watermark({"meas_id": 42, "ts_utc": "2025-01-01T00:00:00+00:00"}, path)
+    assert extract_db.load_watermark(path) == {"meas_id": 42, "ts_utc": "2025-01-01T00:00:00+00:00"}
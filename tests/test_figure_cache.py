@@ -0,0 +1,36 @@
+# test_figure_cache.py
+import numpy as np
+
+from Graphics import figure_cache
+
+
+def draw_text(spec, path):
+    with open(path, "wb") as fh:
+        fh.write(repr(spec).encode())
+
+
+def test_digest_depends_on_content_and_dtype():
+    a = {"y": np.arange(3, dtype=np.float64), "title": "T"}
+    assert figure_cache.spec_digest(draw_text, a) == figure_cache.spec_digest(draw_text, dict(a))
+    assert figure_cache.spec_digest(draw_text, a) != figure_cache.spec_digest(draw_text, {**a, "title": "U"})
+    assert figure_cache.spec_digest(draw_text, a) != \
+        figure_cache.spec_digest(draw_text, {**a, "y": np.arange(3, dtype=np.float32)})
+
+
+def test_render_reuses_and_prunes(tmp_path):
+    jobs = [("a", draw_text, {"v": 1}), ("b", draw_text, {"v": 2})]
+    paths, stats = figure_cache.render_figures(jobs, tmp_path, workers=1)
+    assert stats == {"rendered": 2, "cached": 0}
+    assert all(p.endswith(".png") for p in paths.values())
+
+    paths2, stats = figure_cache.render_figures([jobs[0], ("b", draw_text, {"v": 3})], tmp_path, workers=1)
+    assert stats == {"rendered": 1, "cached": 1}
+    assert paths2["a"] == paths["a"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(p.split("/")[-1] for p in paths2.values())
+
+
+def test_render_in_process_pool(tmp_path):
+    jobs = [(f"f{i}", draw_text, {"v": i}) for i in range(4)]
+    paths, stats = figure_cache.render_figures(jobs, tmp_path, workers=2)
+    assert stats["rendered"] == 4
+    assert (tmp_path / paths["f3"].split("/")[-1]).read_bytes() == b"{'v': 3}"
@@ -0,0 +1,46 @@
+# test_generate_measurements.py
+from datetime import date
+
+import pandas as pd
+
+import run_transform
+from Extract.generate_measurements import MEASUREMENT_COLUMNS, generate_measurements, simulate_block
+
+
+def _read_all(directory):
+    files = sorted(directory.rglob("*.parquet"))
+    return files, pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+
+def test_partitions_are_reproducible_across_workers(tmp_path):
+    kwargs = dict(turbines=5, days=2, start="2025-03-01", seed=3, turbines_per_file=2)
+    serial = generate_measurements(tmp_path / "serial", workers=1, **kwargs)
+    parallel = generate_measurements(tmp_path / "parallel", workers=2, **kwargs)
+
+    files, df = _read_all(tmp_path / "serial")
+    assert serial == parallel == {"files": 6, "rows": len(df)}
+    assert [f"{f.parent.name}/{f.name}" for f in files][:3] == [
+        "date=2025-03-01/part-000000.parquet", "date=2025-03-01/part-000002.parquet", "date=2025-03-01/part-000004.parquet",
+    ]
+    pd.testing.assert_frame_equal(df, _read_all(tmp_path / "parallel")[1])
+    assert list(df.columns) == MEASUREMENT_COLUMNS
+    assert df["meas_id"].is_unique
+    assert df["ts_utc"].str.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:00$").all()
+
+
+def test_block_injects_gaps_duplicates_and_anomalies():
+    df = simulate_block(date(2025, 1, 1), 0, 0, 20, 20, seed=1,
+                        anomaly_rate=0.01, gaps_per_day=2, duplicate_rate=0.01)
+
+    assert df["meas_id"].is_monotonic_increasing and df["meas_id"].is_unique
+    keys = df.duplicated(["turbine_id", "ts_utc"])
+    assert 0.005 < keys.mean() < 0.02
+    assert df.drop_duplicates(["turbine_id", "ts_utc"]).shape[0] < 20 * 1440
+    assert (df["vibration_mm_s"] > 30).any()
+    assert df[["wind_speed_mps", "vibration_mm_s"]].corr().iloc[0, 1] > 0.5
+
+
+def test_streaming_pipeline_reads_partitions(tmp_path):
+    summary = generate_measurements(tmp_path / "synth", turbines=3, days=1, workers=1, duplicate_rate=0.0)
+    out = run_transform.run_pipeline_streaming(chunk_size=1000, output_csv=tmp_path / "out.csv", csv_path=tmp_path / "synth")
+    assert len(pd.read_csv(out)) == summary["rows"]
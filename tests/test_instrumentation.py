@@ -0,0 +1,118 @@
+# test_instrumentation.py
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+import run_transform
+from Transform.instrumentation import PipelineInstrumentation
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_track_records_rows_and_totals(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    instr = PipelineInstrumentation(log_path=log, run_id="r1")
+    df = pd.DataFrame({"a": range(10)})
+
+    out = instr.track("filter", lambda d: d[d["a"] > 3], df)
+    instr.track("filter", lambda d: d.head(2), out)
+    stages = instr.finish()
+
+    assert stages["filter"]["calls"] == 2
+    assert stages["filter"]["rows_in"] == 16
+    assert stages["filter"]["rows_out"] == 8
+    records = _lines(log)
+    assert [r["event"] for r in records] == ["stage", "stage", "run"]
+    assert records[0]["run_id"] == "r1"
+    assert records[0]["rows_out"] == 6
+    assert records[0]["status"] == "ok"
+
+
+def test_track_logs_errors(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    instr = PipelineInstrumentation(log_path=log)
+    with pytest.raises(ValueError):
+        instr.track("boom", lambda: (_ for _ in ()).throw(ValueError("x")))
+    assert _lines(log)[0]["status"] == "error"
+
+
+def test_bytes_read_from_attrs():
+    instr = PipelineInstrumentation()
+    df = pd.DataFrame({"a": [1]})
+    df.attrs["bytes_read"] = 123
+    result = instr.track("extract", lambda: df)
+    assert instr.stages["extract"]["bytes_read"] == 123
+    assert "bytes_read" not in result.attrs
+
+
+def test_prometheus_and_profiles(tmp_path):
+    prom = tmp_path / "pipeline.prom"
+    profiles = tmp_path / "profiles"
+    instr = PipelineInstrumentation(prometheus_path=prom, profile_dir=profiles)
+    instr.track("normalize_dates", lambda d: d.copy(), pd.DataFrame({"a": [1, 2]}))
+    instr.finish()
+
+    text = prom.read_text(encoding="utf-8")
+    assert 'energitech_stage_rows_out_total{stage="normalize_dates"} 2' in text
+    assert "# TYPE energitech_stage_duration_seconds gauge" in text
+    assert (profiles / "normalize_dates.prof").exists()
+    assert (profiles / "normalize_dates.tracemalloc.txt").exists()
+
+
+def test_profiling_keeps_an_outer_tracemalloc_trace(tmp_path):
+    instr = PipelineInstrumentation(profile_dir=tmp_path)
+    tracemalloc.start()
+    try:
+        instr.track("normalize_dates", lambda d: d.copy(), pd.DataFrame({"a": [1, 2]}))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert (tmp_path / "normalize_dates.tracemalloc.txt").exists()
+
+    instr.track("normalize_dates", lambda d: d.copy(), pd.DataFrame({"a": [1, 2]}))
+    assert not tracemalloc.is_tracing()
+
+
+def test_track_iter_does_not_count_the_exhausting_read():
+    instr = PipelineInstrumentation()
+    chunks = [pd.DataFrame({"a": range(3)}), pd.DataFrame({"a": range(2)})]
+    assert [len(c) for c in instr.track_iter("extract", chunks)] == [3, 2]
+    assert instr.stages["extract"]["calls"] == 2
+    assert instr.stages["extract"]["rows_out"] == 5
+
+
+def test_streaming_pipeline_is_instrumented(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # transformed_measurements.csv
+    raw = tmp_path / "raw.csv"
+    pd.DataFrame({
+        "ts_utc": [f"2025-01-01T{h:02d}:00:00" for h in range(10)],
+        "wind_speed": range(10),
+        "temperature": range(10),
+    }).to_csv(raw, index=False)
+    instr = PipelineInstrumentation()
+    run_transform.run_pipeline(chunk_size=4, source=raw, instrumentation=instr)
+
+    stages = instr.stages
+    assert stages["extract"]["rows_out"] == 10
+    assert stages["extract"]["calls"] == 3
+    assert stages["extract"]["bytes_read"] == raw.stat().st_size
+    for name in ("normalize_dates", "convert_units", "enrich_data", "clean_data"):
+        assert stages[name]["calls"] == 3
+        assert stages[name]["rows_in"] == 10
+
+
+def test_track_records_interrupts_and_reraises(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    instr = PipelineInstrumentation(log_path=log)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        instr.track("extract", interrupted)
+    record = _lines(log)[0]
+    assert record["status"] == "error" and record["error"] == "KeyboardInterrupt()"
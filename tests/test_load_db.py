@@ -0,0 +1,184 @@
+# test_load_db.py
+import io
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Load import load_db
+
+
+def decode_binary(buffer: bytes, types):
+    """Décodeur de référence du format binaire de COPY (ligne par ligne)."""
+    assert buffer.startswith(load_db.PGCOPY_HEADER)
+    pos, rows = len(load_db.PGCOPY_HEADER), []
+    while True:
+        (count,) = struct.unpack_from(">h", buffer, pos)
+        pos += 2
+        if count == -1:
+            break
+        row = []
+        for kind in types:
+            (length,) = struct.unpack_from(">i", buffer, pos)
+            pos += 4
+            if length == -1:
+                row.append(None)
+                continue
+            raw = buffer[pos:pos + length]
+            pos += length
+            if kind == "text":
+                row.append(raw.decode("utf-8"))
+            else:
+                row.append(np.frombuffer(raw, dtype=load_db.BINARY_CODECS[kind])[0].item())
+        rows.append(row)
+    assert pos == len(buffer)
+    return rows
+
+
+@pytest.fixture
+def cleaned():
+    return pd.DataFrame({
+        "meas_id": [1, 2, 3],
+        "turbine_id": ["T001", None, "T00é"],
+        "ts_utc": ["2025-01-01T01:00:00+0100", "2025-01-01T01:01:00+0100", None],
+        "wind_speed_mps": [1.5, np.nan, 3.25],
+        "wind_anomaly": [False, True, False],
+        "flag": pd.array([1, None, 0], dtype="Int64"),
+        "unique_id": ["a", "b", "c"],
+    })
+
+
+def test_binary_buffer_roundtrip(cleaned):
+    df = load_db.prepare_frame(cleaned)
+    types = load_db.column_types(df)
+    assert types["ts_utc"] == "timestamptz" and types["flag"] == "bigint"
+    rows = decode_binary(load_db.copy_binary_buffer(df, types).getvalue(), list(types.values()))
+
+    assert [r[0] for r in rows] == [1, 2, 3]
+    assert [r[1] for r in rows] == ["T001", None, "T00é"]
+    # 2025-01-01T00:00:00Z en microsecondes depuis 2000-01-01
+    assert rows[0][2] == int((pd.Timestamp("2025-01-01", tz="UTC") - pd.Timestamp("2000-01-01", tz="UTC")).value // 1000)
+    assert rows[2][2] is None
+    assert [r[3] for r in rows] == [1.5, None, 3.25]
+    assert [r[4] for r in rows] == [0, 1, 0]
+    assert [r[5] for r in rows] == [1, None, 0]
+
+
+def test_binary_buffer_empty():
+    df = pd.DataFrame({"unique_id": pd.Series([], dtype=object)})
+    assert load_db.copy_binary_buffer(df).getvalue() == load_db.PGCOPY_HEADER + load_db.PGCOPY_TRAILER
+
+
+def test_text_buffer_escapes():
+    df = pd.DataFrame({"unique_id": ["a\tb", "c\\d\ne", None], "v": [1.0, np.nan, 2.5]})
+    text = load_db.copy_text_buffer(df).getvalue().decode()
+    assert text == "a\\tb\t1.0\nc\\\\d\\ne\t\\N\n\\N\t2.5\n"
+
+
+def test_prepare_keeps_last_duplicate(cleaned, capsys):
+    df = pd.concat([cleaned, cleaned.assign(meas_id=[7, 8, 9]).iloc[:1]], ignore_index=True)
+    prepared = load_db.prepare_frame(df)
+    assert prepared.set_index("unique_id").loc["a", "meas_id"] == 7
+    assert len(prepared) == 3
+    # Lignes écartées signalées, jamais en silence
+    assert "1 lignes sur 4 partagent une clé unique_id" in capsys.readouterr().out
+    with pytest.raises(ValueError, match="1 lignes sur 4"):
+        load_db.prepare_frame(df, duplicates="error")
+
+
+def test_load_keeps_every_turbine_of_a_timestamp():
+    from Transform.enrichment import enrich_data
+
+    # raw_measurements : pas de station_id, plusieurs turbines par minute
+    raw = pd.DataFrame({
+        "meas_id": range(6),
+        "turbine_id": ["T001", "T002", "T003"] * 2,
+        "ts_utc": ["2025-01-01T00:00:00"] * 3 + ["2025-01-01T00:01:00"] * 3,
+        "wind_speed_mps": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    df = enrich_data(raw)
+    assert df["unique_id"].is_unique
+
+    conn = FakeConnection()
+    summary = load_db.load_dataframe(df, "m", conn=conn, duplicates="error")
+    assert summary["rows"] == 6 and summary["duplicates"] == 0
+    copied = conn.log[3][2]
+    assert len(decode_binary(copied, list(load_db.column_types(load_db.prepare_frame(df)).values()))) == 6
+
+
+def test_upsert_sql():
+    sql = load_db.upsert_sql("m", "m_staging", ["unique_id", "v"])
+    assert sql == ('INSERT INTO "m" ("unique_id", "v") SELECT "unique_id", "v" FROM "m_staging" '
+                   'ON CONFLICT ("unique_id") DO UPDATE SET "v" = EXCLUDED."v"')
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.log.append(("execute", sql))
+
+    def copy_expert(self, sql, buffer):
+        self.log.append(("copy", sql, buffer.getvalue()))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+
+@pytest.mark.parametrize("fmt", ["binary", "text"])
+def test_load_dataframe_statements(cleaned, fmt):
+    conn = FakeConnection()
+    summary = load_db.load_dataframe(cleaned, "m", conn=conn, chunk_rows=2, fmt=fmt)
+
+    assert summary["rows"] == 3 and summary["chunks"] == 2
+    kinds = [entry[0] for entry in conn.log]
+    assert kinds == ["execute", "execute", "execute", "copy", "copy", "execute", "execute", "commit"]
+    assert conn.log[1][1].startswith('CREATE UNLOGGED TABLE IF NOT EXISTS "m_staging" (LIKE "m"')
+    assert conn.log[3][1].endswith(f"FROM STDIN WITH (FORMAT {fmt})")
+    assert conn.log[5][1].startswith('INSERT INTO "m"')
+
+
+def test_text_buffer_formats_timestamps_in_utc():
+    df = pd.DataFrame({
+        "unique_id": ["a", "b"],
+        "ts_utc": pd.to_datetime(["2025-01-01T01:00:00+01:00", None], utc=True),
+    })
+    assert load_db.copy_text_buffer(df).getvalue() == b"a\t2025-01-01 00:00:00.000000+00\nb\t\\N\n"
+
+
+def test_buffers_with_declared_schema():
+    # Colonnes typées par Extract.schema : category, float32 (repr court), Int8 nullable
+    df = pd.DataFrame({
+        "unique_id": ["a", "b", "c"],
+        "turbine_id": pd.Categorical(["T\t1", "T002", None]),
+        "temperature_k": np.array([284.3, np.nan, 17.03], dtype=np.float32),
+        "arret": pd.array([1, None, 0], dtype="Int8"),
+    })
+    text = load_db.copy_text_buffer(df).getvalue().decode()
+    assert text == "a\tT\\t1\t284.3\t1\nb\tT002\t\\N\t\\N\nc\t\\N\t17.03\t0\n"
+
+    types = load_db.column_types(df)
+    assert types["temperature_k"] == "real" and types["arret"] == "smallint"
+    rows = decode_binary(load_db.copy_binary_buffer(df, types).getvalue(), list(types.values()))
+    assert [r[1] for r in rows] == ["T\t1", "T002", None]
+    assert [r[2] for r in rows] == [pytest.approx(284.3), None, pytest.approx(17.03)]
+    assert [r[3] for r in rows] == [1, None, 0]
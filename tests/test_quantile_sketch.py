@@ -0,0 +1,77 @@
+# test_quantile_sketch.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from Transform.quantile_sketch import TURBINE_BUFFER_SIZE, TDigest, QuantileSketches
+from Transform.data_cleaning import clean_data
+
+
+def test_tdigest_median_and_quantiles():
+    rng = np.random.default_rng(0)
+    values = rng.normal(10.0, 3.0, size=200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 17):
+        digest.update(chunk)
+
+    assert digest.count == len(values)
+    # Erreur bornée en rang : < 0.5 % de la distribution autour des quantiles usuels
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        rank = (values < digest.quantile(q)).mean()
+        assert abs(rank - q) < 0.005
+    # Mémoire bornée : nombre de centroïdes indépendant du nombre de valeurs
+    assert len(digest.to_dict()["means"]) <= digest.compression
+
+    # Petits volumes : médiane exacte, NaN ignorés
+    small = TDigest()
+    small.update([3.0, np.nan, 1.0, 2.0, 10.0])
+    assert small.median() == 2.5
+
+
+def test_tdigest_merge_and_persistence():
+    rng = np.random.default_rng(1)
+    a, b = rng.exponential(2.0, 50_000), rng.exponential(2.0, 70_000)
+    left, right = TDigest(), TDigest()
+    left.update(a)
+    right.update(b)
+    left.merge(right)
+
+    restored = TDigest.from_dict(left.to_dict())
+    expected = np.median(np.concatenate([a, b]))
+    assert restored.count == 120_000
+    assert restored.median() == pytest.approx(expected, rel=0.01)
+
+
+def test_quantile_sketches_per_turbine(tmp_path):
+    df = pd.DataFrame({
+        "turbine_id": ["T001", "T002"] * 4,
+        "wind_speed": [10, 100, 12, 110, 14, 120, 16, 130],
+    })
+    sketches = QuantileSketches(per_turbine=True)
+    sketches.update(df.iloc[:4])
+    other = QuantileSketches(per_turbine=True)
+    other.update(df.iloc[4:])
+    sketches.merge(other)
+
+    path = sketches.save(tmp_path / "sketches.json")
+    loaded = QuantileSketches.load(path, per_turbine=True)
+    assert loaded.median("wind_speed") == 58.0
+    assert loaded.median("wind_speed", "T001") == 13.0
+    assert loaded.result() == {"wind_speed": {"T001": 13.0, "T002": 115.0}}
+    # Tampon réduit pour les digests par turbine, aucun digest par turbine sans per_turbine
+    assert loaded.groups["wind_speed"]["T001"].buffer_size == TURBINE_BUFFER_SIZE
+    assert sketches.groups["wind_speed"]["T001"].buffer_size == TURBINE_BUFFER_SIZE
+    global_only = QuantileSketches()
+    global_only.update(df)
+    assert global_only.groups == {} and global_only.result() == {"wind_speed": 58.0}
+
+
+def test_clean_data_with_per_turbine_stats():
+    df = pd.DataFrame({
+        "turbine_id": ["T001", "T002", "T003"],
+        "wind_speed": [200, 300, 400],
+        "temperature": [10, 20, 30],
+    })
+    result = clean_data(df, stats={"wind_speed": {"T001": 13.0, "T002": 115.0}})
+    # T003 absente des sketches -> médiane de la colonne
+    assert result["wind_speed"].tolist() == [13.0, 115.0, 300.0]
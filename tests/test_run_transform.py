@@ -0,0 +1,148 @@
+# test_run_transform.py
+import pandas as pd
+import pytest
+
+import run_transform
+from Transform.quantile_sketch import QuantileSketches
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    df = pd.DataFrame({
+        "ts_utc": [f"2025-01-01T{h:02d}:00:00" for h in range(10)],
+        "station_id": [1, 2] * 5,
+        "wind_speed": [20, 200, 10, 30, 40, 300, 25, 15, 35, 45],
+        "temperature": [10, -100, 30, 5, 6, 7, 8, 90, 9, 11],
+    })
+    path = tmp_path / "raw.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_quantile_sketches_merge_chunks():
+    acc_a, acc_b = QuantileSketches(), QuantileSketches()
+    acc_a.update(pd.DataFrame({"wind_speed": [1.0, 2.0], "temperature": [None, 4.0]}))
+    acc_b.update(pd.DataFrame({"wind_speed": [3.0, 10.0]}))
+    acc_a.merge(acc_b)
+    assert acc_a.result() == {"wind_speed": 2.5, "temperature": 4.0}
+
+
+def test_streaming_matches_in_memory(raw_csv, tmp_path):
+    # Résultat en mémoire : clean_data sans stats -> médianes de tout le DataFrame
+    expected = pd.read_csv(raw_csv)
+    for _, fn, _ in run_transform.STREAM_STAGES:
+        expected = fn(expected)
+
+    out = run_transform.run_pipeline_streaming(chunk_size=3, output_csv=tmp_path / "out.csv", csv_path=raw_csv)
+    result = pd.read_csv(out)
+
+    assert len(result) == 10
+    assert result["unique_id"].is_unique
+    # Les anomalies sont remplacées par les médianes globales, pas celles du chunk
+    assert result.loc[1, "wind_speed"] == 32.5
+    assert result.loc[5, "wind_speed"] == 32.5
+    assert result.loc[7, "temperature"] == 8.5
+    for column in ("wind_speed", "wind_speed_ms", "temperature", "temperature_K"):
+        assert result[column].tolist() == pytest.approx(expected[column].tolist())
+    assert result["unique_id"].tolist() == expected["unique_id"].tolist()
+    assert result["ts_utc"].iloc[0] == "2025-01-01T01:00:00+0100"
+
+
+def test_streaming_reads_the_source_once(raw_csv, tmp_path, monkeypatch, capsys):
+    calls = []
+    extract = run_transform._iter_chunks_from_extract
+    monkeypatch.setattr(run_transform, "_iter_chunks_from_extract", lambda *a: calls.append(a) or extract(*a))
+
+    out = run_transform.run_pipeline_streaming(chunk_size=3, output_csv=tmp_path / "out.csv", csv_path=raw_csv)
+    assert len(calls) == 1
+    assert len(pd.read_csv(out)) == 10
+    # Résumé court des statistiques, pas le dict complet
+    summary = next(line for line in capsys.readouterr().out.splitlines() if "Statistiques globales" in line)
+    assert "10 lignes" in summary and "wind_speed=32.50" in summary and "{" not in summary
+
+
+def test_streaming_imputes_turbine_medians(raw_csv, tmp_path):
+    out = run_transform.run_pipeline_streaming(
+        chunk_size=3, output_csv=tmp_path / "out.csv", csv_path=raw_csv, turbine_medians=True,
+    )
+    result = pd.read_csv(out)
+    # Station 2 : vent 200, 30, 300, 15, 45 -> 45 ; température -100, 5, 7, 90, 11 -> 7
+    assert result.loc[[1, 5], "wind_speed"].tolist() == [45.0, 45.0]
+    assert result.loc[[1, 7], "temperature"].tolist() == [7.0, 7.0]
+
+
+def test_streaming_flags_rolling_outliers(raw_csv, tmp_path):
+    out = run_transform.run_pipeline_streaming(
+        chunk_size=100, output_csv=tmp_path / "out.csv", csv_path=raw_csv,
+        rolling_outliers={"window": "6h", "min_periods": 2, "by": "station_id"},
+    )
+    result = pd.read_csv(out)
+    # Station 1 : 40 km/h après 20 et 10 (z = 3.54, mesure exclue de sa fenêtre) ;
+    # station 2 trop dispersée (200, 30) pour que 300 ressorte
+    flagged = result[result["wind_speed_ms_anomaly"]]
+    assert flagged["station_id"].tolist() == [1]
+    assert flagged["wind_speed"].tolist() == [40]
+
+
+def test_streaming_joins_weather(raw_csv, tmp_path):
+    # Prévisions UTC aux demi-heures : chaque mesure tombe entre deux points
+    weather = pd.DataFrame({
+        "time": pd.date_range("2024-12-31 23:30", periods=12, freq="h"),
+        "temperature_2m": [float(i) for i in range(12)],
+    })
+    out = run_transform.run_pipeline_streaming(
+        chunk_size=4, output_csv=tmp_path / "out.csv", csv_path=raw_csv,
+        weather=weather, weather_options={"method": "linear"},
+    )
+    result = pd.read_csv(out)
+    assert result["temperature_2m"].tolist() == [i + 0.5 for i in range(10)]
+
+
+def test_streaming_loads_each_chunk(raw_csv, tmp_path, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(run_transform, "load_dataframe",
+                        lambda df, table: loaded.append((table, len(df))) or {"rows": len(df)})
+    run_transform.run_pipeline_streaming(chunk_size=4, output_csv=tmp_path / "out.csv", csv_path=raw_csv,
+                                         load_table="measurements_clean")
+    assert loaded == [("measurements_clean", 4), ("measurements_clean", 4), ("measurements_clean", 2)]
+
+
+def test_streaming_skips_rows_already_loaded(raw_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(run_transform, "load_dataframe", lambda df, table: {"rows": len(df)})
+    index = tmp_path / "dedup"
+    # Sans chargement, l'index est consulté mais rien n'y est enregistré
+    dry = run_transform.run_pipeline_streaming(chunk_size=4, output_csv=tmp_path / "dry.csv",
+                                               csv_path=raw_csv, dedup=index)
+    assert len(pd.read_csv(dry)) == 10
+
+    first = run_transform.run_pipeline_streaming(chunk_size=4, output_csv=tmp_path / "first.csv",
+                                                 csv_path=raw_csv, dedup=index, load_table="m")
+    assert len(pd.read_csv(first)) == 10
+
+    second = run_transform.run_pipeline_streaming(chunk_size=4, output_csv=tmp_path / "second.csv",
+                                                  csv_path=raw_csv, dedup=index, load_table="m")
+    assert len(pd.read_csv(second)) == 0
+
+
+def test_streaming_dedup_keeps_every_turbine(tmp_path, monkeypatch):
+    from benchmarks.suite import make_dataset
+
+    # Plusieurs turbines par minute, minutes à cheval sur les chunks
+    raw = make_dataset(6000)
+    raw = raw.drop_duplicates(["turbine_id", "ts_utc"], keep="last")  # sans les renvois injectés
+    source = tmp_path / "raw.csv"
+    raw.to_csv(source, index=False)
+    monkeypatch.setattr(run_transform, "load_dataframe", lambda df, table: {"rows": len(df)})
+    monkeypatch.chdir(tmp_path)
+
+    index = tmp_path / "dedup"
+    first = run_transform.run_pipeline_streaming(chunk_size=1000, output_csv=tmp_path / "first.csv",
+                                                 csv_path=source, dedup=index, load_table="m")
+    assert len(pd.read_csv(first)) == len(raw)
+
+    # Turbines suivantes aux mêmes minutes : aucune n'est prise pour une ligne déjà chargée
+    other = raw.assign(turbine_id=raw["turbine_id"].astype(str) + "-B", meas_id=raw["meas_id"] + 10**9)
+    other.to_csv(source, index=False)
+    second = run_transform.run_pipeline_streaming(chunk_size=1000, output_csv=tmp_path / "second.csv",
+                                                  csv_path=source, dedup=index, load_table="m")
+    assert len(pd.read_csv(second)) == len(raw)
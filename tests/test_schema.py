@@ -0,0 +1,83 @@
+# test_schema.py
+import numpy as np
+import pandas as pd
+
+from Extract.schema import MEASUREMENT_SCHEMA, apply_schema, concat_frames, csv_dtypes, memory_per_million
+from Transform.data_cleaning import clean_data
+from Transform.date_normalization import normalize_dates
+from Transform.enrichment import enrich_data
+from Transform.unit_conversion import convert_units
+
+
+def _records():
+    # Forme des pages JSON Supabase : chaînes, None, entiers et flottants mélangés
+    return [
+        {"meas_id": 1, "turbine_id": "T001", "ts_utc": "2025-01-01T00:00:00+00:00", "wind_speed_mps": 4.81,
+         "temperature_k": 284.3, "vibration_mm_s": 5.48, "consumption_kwh": 1026.52},
+        {"meas_id": 2, "turbine_id": "T002", "ts_utc": "2025-01-01T00:00:00+00:00", "wind_speed_mps": None,
+         "temperature_k": 268, "vibration_mm_s": 8.28, "consumption_kwh": 1074.25},
+        {"meas_id": 3, "turbine_id": "T001", "ts_utc": "pas une date", "wind_speed_mps": 2.5,
+         "temperature_k": 270.1, "vibration_mm_s": None, "consumption_kwh": 990.0},
+    ]
+
+
+def test_apply_schema_from_json_records():
+    df = apply_schema(pd.DataFrame(_records()))
+
+    assert df["meas_id"].dtype == "int64"
+    assert isinstance(df["turbine_id"].dtype, pd.CategoricalDtype)
+    assert str(df["ts_utc"].dtype) == "datetime64[ns, UTC]"
+    for column in ("wind_speed_mps", "temperature_k", "vibration_mm_s", "consumption_kwh"):
+        assert df[column].dtype == np.float32
+    assert df["ts_utc"].iloc[0] == pd.Timestamp("2025-01-01", tz="UTC")
+    assert pd.isna(df["ts_utc"].iloc[2]) and pd.isna(df["wind_speed_mps"].iloc[1])
+
+
+def test_apply_schema_is_idempotent_without_copies():
+    df = apply_schema(pd.DataFrame(_records()))
+    before = {c: df[c].to_numpy() for c in df.columns if c not in ("turbine_id", "ts_utc")}
+    before_ts, before_codes = df["ts_utc"].array.asi8, df["turbine_id"].array.codes
+    apply_schema(df)
+    assert all(np.shares_memory(df[c].to_numpy(), values) for c, values in before.items())
+    assert np.shares_memory(df["ts_utc"].array.asi8, before_ts)
+    assert np.shares_memory(df["turbine_id"].array.codes, before_codes)
+
+
+def test_csv_roundtrip_and_chunk_concat(tmp_path):
+    path = tmp_path / "raw.csv"
+    apply_schema(pd.DataFrame(_records())).to_csv(path, index=False)
+
+    chunks = [apply_schema(chunk) for chunk in pd.read_csv(path, dtype=csv_dtypes(), chunksize=1)]
+    df = concat_frames(chunks)
+    # Catégories propres à chaque chunk, réunies sans retomber sur object
+    assert isinstance(df["turbine_id"].dtype, pd.CategoricalDtype)
+    assert df["turbine_id"].tolist() == ["T001", "T002", "T001"]
+    assert df["temperature_k"].dtype == np.float32
+    assert df["ts_utc"].iloc[1] == pd.Timestamp("2025-01-01", tz="UTC")
+
+
+def test_transform_stages_keep_declared_dtypes():
+    n = 1000
+    df = apply_schema(pd.DataFrame({
+        "meas_id": np.arange(n),
+        "turbine_id": np.tile(["T001", "T002"], n // 2),
+        "ts_utc": pd.date_range("2025-01-01", periods=n, freq="min").strftime("%Y-%m-%dT%H:%M:%S"),
+        "wind_speed_mps": np.linspace(0, 20, n),
+        "temperature_k": np.linspace(270, 290, n),
+        "vibration_mm_s": np.linspace(1, 5, n),
+        "consumption_kwh": np.linspace(900, 1100, n),
+    }))
+    raw_bytes = memory_per_million(df)
+
+    for stage in (lambda d: normalize_dates(d, as_string=False), convert_units, enrich_data, clean_data):
+        df = stage(df)
+
+    for column, dtype in MEASUREMENT_SCHEMA.items():
+        if column == "ts_utc":
+            assert str(df[column].dtype) == "datetime64[ns, Europe/Paris]"
+        elif dtype == "category":
+            assert isinstance(df[column].dtype, pd.CategoricalDtype)
+        else:
+            assert df[column].dtype == dtype, column
+    # 8 (meas_id) + 1 (code turbine) + 8 (ts) + 4 x 4 (mesures) octets par ligne
+    assert raw_bytes < 40e6
@@ -1,17 +1,122 @@
+# test_unit_conversion.py
+import numpy as np
 import pandas as pd
+import pytest
+from Transform.unit_conversion import (
+    celsius_to_kelvin,
+    kmh_to_ms,
+    normalize_units,
+    convert_units,
+    convert_array,
+    convert_columns,
+    detect_unit,
+)
 
-def celsius_to_kelvin(c):
-    return c + 273.15 if pd.notnull(c) else None
+def test_celsius_to_kelvin():
+    # Test avec des valeurs normales
+    assert celsius_to_kelvin(20) == 293.15
+    assert celsius_to_kelvin(0) == 273.15
+    assert celsius_to_kelvin(-10) == 263.15
 
-def kmh_to_ms(v):
-    return v / 3.6 if pd.notnull(v) else None
+    # Test avec une valeur nulle (NaN)
+    assert celsius_to_kelvin(None) is None
+    assert celsius_to_kelvin(pd.NA) is None
+    assert pd.isna(celsius_to_kelvin(pd.NA))
 
-def normalize_units(df: pd.DataFrame) -> pd.DataFrame:
-    if "temperature" in df.columns:
-        df["temperature_K"] = df["temperature"].apply(celsius_to_kelvin)
-    if "wind_speed" in df.columns:
-        df["wind_speed_ms"] = df["wind_speed"].apply(kmh_to_ms)
-    return df
+def test_kmh_to_ms():
+    # Test avec des valeurs normales
+    assert kmh_to_ms(36) == 10.0
+    assert kmh_to_ms(10) == pytest.approx(2.777777778)
+    assert kmh_to_ms(90) == 25.0
 
-def convert_units(df: pd.DataFrame) -> pd.DataFrame:
-    return normalize_units(df)
+    # Test avec une valeur nulle (NaN)
+    assert kmh_to_ms(None) is None
+    assert kmh_to_ms(pd.NA) is None
+    assert pd.isna(kmh_to_ms(pd.NA))
+
+def test_normalize_units():
+    # Test avec un DataFrame contenant des valeurs normales
+    df = pd.DataFrame({
+        "temperature": [20, 0, -10],
+        "wind_speed": [36, 10, 90]
+    })
+    result = normalize_units(df)
+    assert "temperature_K" in result.columns
+    assert "wind_speed_ms" in result.columns
+    assert result["temperature_K"].tolist() == [293.15, 273.15, 263.15]
+    assert result["wind_speed_ms"].tolist() == [10.0, pytest.approx(2.777777778), 25.0]
+
+    # Test avec un DataFrame contenant des valeurs nulles
+    df_with_nan = pd.DataFrame({
+        "temperature": [20, None, -10],
+        "wind_speed": [36, pd.NA, 90]
+    })
+    result_with_nan = normalize_units(df_with_nan)
+    assert pd.isna(result_with_nan["temperature_K"].iloc[1])
+    assert pd.isna(result_with_nan["wind_speed_ms"].iloc[1])
+
+def test_convert_units():
+    # Test que la fonction convert_units est un wrapper pour normalize_units
+    df = pd.DataFrame({
+        "temperature": [20, 0, -10],
+        "wind_speed": [36, 10, 90]
+    })
+    result = convert_units(df)
+    assert "temperature_K" in result.columns
+    assert "wind_speed_ms" in result.columns
+    assert result["temperature_K"].tolist() == [293.15, 273.15, 263.15]
+    assert result["wind_speed_ms"].tolist() == [10.0, pytest.approx(2.777777778), 25.0]
+
+def test_detect_unit():
+    # Unités déduites des suffixes de colonnes
+    assert detect_unit("wind_speed_mps") == "m/s"
+    assert detect_unit("temperature_k") == "K"
+    assert detect_unit("temperature_K") == "K"
+    assert detect_unit("consumption_kwh") == "kWh"
+    assert detect_unit("temperature") == "degC"
+    assert detect_unit("vibration_mm_s") is None
+    assert detect_unit("turbine_id") is None
+
+def test_convert_array_out_and_dtype():
+    # Conversion en place dans le buffer d'entrée
+    values = np.array([0.0, 10.0, np.nan])
+    result = convert_array(values, "degC", "K", out=values)
+    assert result is values
+    assert values[:2].tolist() == [273.15, 283.15]
+    assert np.isnan(values[2])
+
+    # Sortie float32 et pd.NA -> NaN
+    series = pd.Series([36, pd.NA, 90], dtype="Float64")
+    result32 = convert_array(series, "km/h", "m/s", dtype=np.float32)
+    assert result32.dtype == np.float32
+    assert result32[0] == pytest.approx(10.0)
+    assert np.isnan(result32[1])
+
+    with pytest.raises(KeyError):
+        convert_array(values, "K", "kWh")
+
+def test_convert_columns_from_suffixes():
+    # Colonnes du flux réel : déjà en unités cibles -> rien à convertir
+    df = pd.DataFrame({
+        "wind_speed_mps": [4.81, 14.23],
+        "temperature_k": [284.3, 268.73],
+        "consumption_kwh": [1026.52, 1074.25],
+    })
+    assert convert_units(df.copy()).columns.tolist() == df.columns.tolist()
+
+    # Conversions explicites de plusieurs colonnes
+    result = convert_columns(df, {"temperature_k": "degC", "wind_speed_mps": "km/h"}, dtype=np.float32)
+    assert result["temperature_c"].dtype == np.float32
+    assert result["temperature_c"].tolist() == pytest.approx([11.15, -4.42], abs=1e-4)
+    assert result["wind_speed_kmh"].tolist() == pytest.approx([17.316, 51.228], abs=1e-3)
+
+
+def test_convert_units_keeps_float32_measures():
+    df = pd.DataFrame({
+        "temperature_c": np.array([10.0, np.nan], dtype=np.float32),
+        "wind_speed_kmh": [36.0, 72.0],
+    })
+    result = convert_units(df)
+    assert result["temperature_K"].dtype == np.float32
+    assert result["wind_speed_ms"].dtype == np.float64
+    assert result["temperature_K"].iloc[0] == pytest.approx(283.15)
@@ -1,5 +1,6 @@
 import requests
 import pytest
+import pandas as pd
 
 from Extract.extract_api import requests
 from unittest.mock import patch, Mock
@@ -28,9 +29,10 @@ def fetch_weather(city, api_key, base_url="https://api.openweathermap.org/data/2
     return {"city": data.get("name"), "temp": main.get("temp"), "description": weather.get("description")}
 
 
-def make_mock_response(status_code=200, json_data=None, raise_for_status_exc=None):
+def make_mock_response(status_code=200, json_data=None, raise_for_status_exc=None, headers=None):
     mock_resp = Mock()
     mock_resp.status_code = status_code
+    mock_resp.headers = headers or {}
     if raise_for_status_exc:
         mock_resp.raise_for_status.side_effect = raise_for_status_exc
     else:
@@ -91,4 +93,273 @@ def test_fetch_weather_missing_fields():
         result = fetch_weather("UnknownCity", "any-key", base_url=EXTRACT_API_URL)
         assert result["city"] is None
         assert result["temp"] is None
-        assert result["description"] is None
\ No newline at end of file
+        assert result["description"] is None
+
+def test_fetch_open_meteo_bulk_batches_sites():
+    from Extract.extract_api import fetch_open_meteo_bulk
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        lats = params["latitude"].split(",")
+        payloads = [
+            {"hourly": {"time": ["2025-11-20T00:00", "2025-11-20T01:00"], "temperature_2m": [float(lat), float(lat) + 1]}}
+            for lat in lats
+        ]
+        # Une seule coordonnée -> objet JSON nu, comme l'API Open-Meteo
+        return make_mock_response(json_data=payloads if len(payloads) > 1 else payloads[0])
+
+    session = Mock()
+    session.get.side_effect = fake_get
+    coords = [(48.0 + i, 2.0) for i in range(5)]
+
+    df = fetch_open_meteo_bulk(coords, batch_size=2, max_concurrency=2, session=session, cache_ttl=0)
+
+    # 5 sites en lots de 2 -> 3 requêtes multi-sites, dont une à un seul site
+    assert session.get.call_count == 3
+    assert len(df) == 10
+    assert df["location"].tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert df.loc[df["location"] == 4, "temperature_2m"].tolist() == [52.0, 53.0]
+    assert list(df.columns) == ["location", "latitude", "longitude", "time", "temperature_2m"]
+
+
+def test_ttl_cache_lru_eviction_and_counters():
+    from Extract.extract_api import TTLCache
+
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get_entry("a")[0] == 1  # "a" devient le plus récemment lu
+    cache.set("c", 3)                    # évince "b"
+
+    assert cache.get_entry("b") is None
+    assert cache.get_entry("c")[0] == 3
+    for outcome in ("hit", "hit", "miss"):
+        cache.record(outcome)
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 2, "stale_hits": 0, "misses": 1, "evictions": 1}
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    from Extract.extract_api import SQLiteCache
+
+    path = tmp_path / "responses.sqlite"
+    writer = SQLiteCache(path, max_entries=2)
+    writer.set("a", {"hourly": {"temperature_2m": [1.5]}})
+    writer.set("b", [1, 2])
+    writer.set("c", [3])
+
+    reader = SQLiteCache(path, max_entries=2)
+    assert reader.get_entry("a") is None
+    assert reader.get_entry("c")[0] == [3]
+    assert len(reader) == 2
+    assert writer.stats()["evictions"] == 1
+    writer.close()
+    reader.close()
+
+
+def test_sqlite_cache_counts_under_lock_from_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from Extract.extract_api import SQLiteCache
+
+    cache = SQLiteCache(tmp_path / "responses.sqlite", max_entries=50)
+
+    def work(worker):
+        for i in range(100):
+            cache.set(f"{worker}-{i}", [i])
+            assert len(cache) <= 50
+            assert cache.stats()["entries"] <= 50
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(work, range(4)))
+    # Éviction par lots d'un dixième du cache
+    assert 45 <= len(cache) <= 50
+    cache.close()
+
+
+def test_sqlite_cache_batches_access_times_and_purges(tmp_path):
+    import sqlite3
+    from Extract.extract_api import SQLiteCache
+
+    path = tmp_path / "responses.sqlite"
+    cache = SQLiteCache(path, max_entries=10, touch_batch=2)
+    cache.set("old", [0])
+    cache.set("new", [1])
+    other = sqlite3.connect(path)
+    other.execute("UPDATE responses SET accessed_at = 0")
+    other.commit()
+    accessed = lambda: dict(other.execute("SELECT key, accessed_at FROM responses").fetchall())
+
+    # Lectures sans écriture tant que le lot (clés distinctes) n'est pas plein
+    cache.get_entry("old")
+    cache.get_entry("old")
+    assert accessed() == {"old": 0, "new": 0}
+    cache.get_entry("new")
+    assert accessed()["old"] > 0 and accessed()["new"] > 0
+
+    other.execute("UPDATE responses SET stored_at = stored_at - 3600 WHERE key = 'old'")
+    other.commit()
+    assert cache.purge(max_age=60) == 1
+    assert cache.get_entry("old") is None and len(cache) == 1
+    other.close()
+    cache.close()
+
+
+def test_cached_call_purges_expired_entries(monkeypatch):
+    from Extract import extract_api
+
+    cache = extract_api.TTLCache()
+    monkeypatch.setattr(extract_api, "_cache", cache)
+    monkeypatch.setattr(extract_api, "_purge_state", {"max_age": 0.0, "last": 0.0})
+    cache.set("dead", {"data": 1, "validators": {}})
+    cache._store["dead"] = (cache._store["dead"][0], cache._store["dead"][1] - 3600)
+
+    assert extract_api._cached_call("live", 60, 60, lambda validators: (2, {})) == 2
+    assert cache.get_entry("dead") is None
+    assert cache.get_entry("live") is not None
+
+
+def test_configure_cache_closes_the_previous_cache(tmp_path, monkeypatch):
+    import sqlite3
+    from Extract import extract_api
+
+    monkeypatch.setattr(extract_api, "_cache", extract_api.TTLCache())
+    previous = extract_api.configure_cache(tmp_path / "responses.sqlite")
+    current = extract_api.configure_cache(max_entries=8)
+
+    assert extract_api._cache is current and current.max_entries == 8
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(previous)
+
+
+def test_fetch_open_meteo_serves_stale_while_revalidating(monkeypatch):
+    import time
+    from Extract import extract_api
+
+    cache = extract_api.TTLCache()
+    monkeypatch.setattr(extract_api, "_cache", cache)
+    session = Mock()
+    session.get.side_effect = [
+        make_mock_response(json_data={"hourly": {"temperature_2m": [1.0]}}),
+        make_mock_response(json_data={"hourly": {"temperature_2m": [2.0]}}),
+    ]
+
+    first = extract_api.fetch_open_meteo(48.8, 2.3, session=session, cache_ttl=60, stale_ttl=600)
+    # Vieillir l'entrée au-delà du TTL mais dans la fenêtre stale
+    key, (value, stored_at) = next(iter(cache._store.items()))
+    cache._store[key] = (value, stored_at - 120)
+
+    stale = extract_api.fetch_open_meteo(48.8, 2.3, session=session, cache_ttl=60, stale_ttl=600)
+    assert stale == first
+
+    deadline = time.time() + 5
+    while extract_api._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+    refreshed = extract_api.fetch_open_meteo(48.8, 2.3, session=session, cache_ttl=60, stale_ttl=600)
+    assert refreshed["hourly"]["temperature_2m"] == [2.0]
+    assert session.get.call_count == 2
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_concurrent_misses_share_one_request(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from Extract import extract_api
+
+    monkeypatch.setattr(extract_api, "_cache", extract_api.TTLCache())
+
+    def slow_get(url, params=None, headers=None, timeout=None):
+        time.sleep(0.3)
+        return make_mock_response(json_data={"hourly": {"temperature_2m": [1.0]}})
+
+    session = Mock()
+    session.get.side_effect = slow_get
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: extract_api.fetch_open_meteo(48.8, 2.3, session=session, cache_ttl=60), range(8)))
+
+    assert session.get.call_count == 1
+    assert all(r == results[0] for r in results)
+
+
+def test_late_miss_reuses_the_previous_leader_result(monkeypatch):
+    from Extract import extract_api
+
+    class LateCache(extract_api.TTLCache):
+        """Premier get_entry manqué : l'entrée est stockée juste après par le leader précédent."""
+        def __init__(self):
+            super().__init__()
+            self.lookups = 0
+
+        def get_entry(self, key):
+            self.lookups += 1
+            if self.lookups == 1:
+                self.set(key, {"data": {"hourly": {"temperature_2m": [1.0]}}, "validators": {}})
+                return None
+            return super().get_entry(key)
+
+    monkeypatch.setattr(extract_api, "_cache", LateCache())
+    session = Mock()
+    data = extract_api.fetch_open_meteo(48.8, 2.3, session=session, cache_ttl=60)
+
+    assert data == {"hourly": {"temperature_2m": [1.0]}}
+    assert session.get.call_count == 0
+
+
+def test_expired_entry_is_revalidated_with_etag(monkeypatch):
+    from Extract import extract_api
+
+    cache = extract_api.TTLCache()
+    monkeypatch.setattr(extract_api, "_cache", cache)
+    payload = {"hourly": {"temperature_2m": [1.0]}}
+    session = Mock()
+    session.get.side_effect = [
+        make_mock_response(json_data=payload, headers={"ETag": '"v1"', "Last-Modified": "Thu, 20 Nov 2025 00:00:00 GMT"}),
+        make_mock_response(status_code=304),
+    ]
+
+    extract_api.fetch_weather("https://example.test/forecast", params={"q": "Paris"}, session=session, cache_ttl=60)
+    key, (value, stored_at) = next(iter(cache._store.items()))
+    cache._store[key] = (value, stored_at - 3600)
+
+    data = extract_api.fetch_weather("https://example.test/forecast", params={"q": "Paris"}, session=session, cache_ttl=60)
+
+    assert data == payload
+    headers = session.get.call_args.kwargs["headers"]
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Thu, 20 Nov 2025 00:00:00 GMT"}
+    # Le 304 renouvelle l'entrée : l'appel suivant est servi par le cache
+    assert extract_api.fetch_weather("https://example.test/forecast", params={"q": "Paris"}, session=session, cache_ttl=60) == payload
+    assert session.get.call_count == 2
+
+
+def test_get_session_is_shared_per_host():
+    from Extract import extract_api
+
+    extract_api.configure_sessions(pool_connections=2, pool_maxsize=16)
+    a = extract_api.get_session("https://api.open-meteo.com/v1/forecast")
+    b = extract_api.get_session("https://api.open-meteo.com/v1/archive")
+    c = extract_api.get_session("https://example.test/weather")
+
+    assert a is b and a is not c
+    assert a.get_adapter("https://api.open-meteo.com")._pool_maxsize == 16
+    extract_api.close_sessions()
+    assert extract_api.get_session("https://api.open-meteo.com/v1/forecast") is not a
+    extract_api.configure_sessions()
+
+
+def test_save_columnar_roundtrip(tmp_path):
+    import json
+    from pathlib import Path
+    from Extract.extract_api import load_columnar, load_columnar_dir, save_columnar
+
+    sample = Path(__file__).resolve().parents[1] / "Extract" / "energitic_pipeline" / "open-meteo_48.8566_2.3522.json"
+    data = json.loads(sample.read_text(encoding="utf-8"))
+
+    paths = save_columnar(data, filename="open-meteo_48.8566_2.3522.json", directory=str(tmp_path))
+    assert [Path(p).name for p in paths] == ["open-meteo_48.8566_2.3522.hourly.arrow"]
+
+    df = load_columnar(paths[0])
+    assert df["temperature_2m"].tolist() == data["hourly"]["temperature_2m"]
+    assert df.index[0] == pd.Timestamp(data["hourly"]["time"][0])
+    assert df.attrs["metadata"]["timezone"] == "Europe/Paris"
+    assert df.attrs["units"]["temperature_2m"] == "°C"
+
+    all_days = load_columnar_dir(str(tmp_path))
+    assert len(all_days) == len(df)
+    assert set(all_days["source"]) == {"open-meteo_48.8566_2.3522"}
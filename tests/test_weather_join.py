@@ -0,0 +1,91 @@
+# test_weather_join.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from Transform.weather_join import join_weather
+
+
+@pytest.fixture
+def weather():
+    # Deux sites, prévisions horaires en heure locale de Paris (UTC+1 en janvier)
+    times = pd.date_range("2025-01-01 01:00", periods=3, freq="h")
+    return pd.DataFrame({
+        "location": [0, 0, 0, 1, 1, 1],
+        "time": list(times) * 2,
+        "latitude": [48.8] * 3 + [43.3] * 3,
+        "temperature_2m": [10.0, 12.0, 14.0, 20.0, 22.0, 24.0],
+    })
+
+
+@pytest.fixture
+def measurements():
+    return pd.DataFrame({
+        "turbine_id": ["T1", "T2", "T1", "T2", "T3"],
+        "ts_utc": pd.to_datetime(
+            ["2025-01-01T00:30:00Z", "2025-01-01T00:15:00Z", "2025-01-01T01:00:00Z", "2025-01-01T05:00:00Z", "2025-01-01T00:30:00Z"],
+            utc=True,
+        ),
+    })
+
+
+def test_join_weather_methods(weather, measurements):
+    sites = {"T1": 0, "T2": 1}
+    kwargs = dict(sites=sites, weather_by="location", weather_tz="Europe/Paris")
+
+    linear = join_weather(measurements.copy(), weather, method="linear", **kwargs)
+    assert linear["temperature_2m"].tolist()[:3] == [11.0, 20.5, 12.0]
+    # Mesure à 4 h du dernier point (hors tolérance) et turbine sans site -> NaN
+    assert linear["temperature_2m"].isna().tolist()[3:] == [True, True]
+    assert "latitude" not in linear.columns
+
+    # À égale distance, le point antérieur l'emporte
+    nearest = join_weather(measurements.copy(), weather, method="nearest", **kwargs)
+    assert nearest["temperature_2m"].tolist()[:3] == [10.0, 20.0, 12.0]
+
+    backward = join_weather(measurements.copy(), weather, method="backward", **kwargs)
+    assert backward["temperature_2m"].tolist()[:3] == [10.0, 20.0, 12.0]
+
+
+def test_join_weather_matches_merge_asof():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        "turbine_id": rng.choice(["T1", "T2", "T3"], n),
+        "ts_utc": pd.Timestamp("2025-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 48 * 60, n), unit="min"),
+    })
+    weather = pd.DataFrame({
+        "turbine_id": np.repeat(["T1", "T2", "T3"], 48),
+        "time": np.tile(pd.date_range("2025-01-01", periods=48, freq="h"), 3),
+        "wind_speed_10m": rng.gamma(2.0, 3.0, 144),
+    })
+
+    result = join_weather(df.copy(), weather, by="turbine_id", weather_by="turbine_id", method="backward")
+
+    right = weather.assign(time=weather["time"].dt.tz_localize("UTC")).sort_values("time")
+    expected = pd.merge_asof(
+        df.reset_index().sort_values("ts_utc"), right, left_on="ts_utc", right_on="time",
+        by="turbine_id", direction="backward", tolerance=pd.Timedelta("1h"),
+    ).set_index("index").sort_index()
+    np.testing.assert_allclose(result["wind_speed_10m"], expected["wind_speed_10m"])
+
+
+def test_saved_multi_site_forecasts_join_per_turbine(tmp_path, measurements):
+    from Extract.extract_api import load_columnar_dir, save_columnar
+    from run_transform import weather_options
+
+    hourly = lambda base: {"time": ["2025-01-01T01:00", "2025-01-01T02:00"], "temperature_2m": [base, base + 2.0]}
+    save_columnar([
+        {"latitude": 48.8, "longitude": 2.3, "timezone": "Europe/Paris", "hourly": hourly(10.0)},
+        {"latitude": 43.3, "longitude": 5.4, "timezone": "Europe/Paris", "hourly": hourly(20.0)},
+    ], filename="bulk", directory=str(tmp_path))
+    weather = load_columnar_dir(str(tmp_path))
+    assert weather.groupby("location")["latitude"].first().tolist() == [48.8, 43.3]
+
+    # Plusieurs sites sans association turbine -> site : refusé
+    with pytest.raises(ValueError, match="2 sites"):
+        weather_options(weather, weather_tz="Europe/Paris")
+
+    options = weather_options(weather, {"T1": 0, "T2": 1}, weather_tz="Europe/Paris", method="backward")
+    joined = join_weather(measurements.copy(), weather, **options)
+    assert joined["temperature_2m"].tolist()[:3] == [10.0, 20.0, 12.0]